@@ -595,4 +595,16 @@ CREATE TABLE "fish_data" (
 	"last_usage_tick" INT NOT NULL
 );
 
+-- Indexes of the columns objects are looked up by when loading, see SavegameAccessor
+CREATE INDEX "storage_object" ON "storage" ("object");
+CREATE INDEX "collector_job_collector" ON "collector_job" ("collector");
+CREATE INDEX "unit_path_unit" ON "unit_path" ("unit");
+CREATE INDEX "concrete_object_id" ON "concrete_object" ("id");
+CREATE INDEX "storage_global_limit_object" ON "storage_global_limit" ("object");
+CREATE INDEX "unit_health_owner_id" ON "unit_health" ("owner_id");
+CREATE INDEX "building_collector_job_history_collector" ON "building_collector_job_history" ("collector", "tick");
+CREATE INDEX "production_owner" ON "production" ("owner", "prod_line_id");
+CREATE INDEX "production_line_for_worldid" ON "production_line" ("for_worldid");
+CREATE INDEX "production_state_history_object_id" ON "production_state_history" ("object_id", "production", "tick");
+
 COMMIT;
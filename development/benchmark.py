@@ -0,0 +1,268 @@
+#!/usr/bin/env python2
+# ###################################################
+# Copyright (C) 2008-2014 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+
+"""
+Runs the game headless for a number of ticks and reports how fast it is as JSON.
+
+Usage: development/benchmark.py [options] [scenario ...]
+
+Without scenarios, all of the fixed SCENARIOS are run, so results can be compared
+across commits. Every scenario is run in a new process to measure its peak memory.
+The report contains the ticks per second (loading excluded), the time spent in
+scheduled calls grouped by the class of their instance and by subsystem, the time
+spent searching paths (it is part of the other numbers) and the peak memory.
+"""
+
+import gettext
+import json
+import os
+import os.path
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from optparse import OptionParser
+
+# make this script work both when started inside development and in the uh root dir
+if not os.path.exists('content'):
+	os.chdir('..')
+assert os.path.exists('content'), 'Content dir not found.'
+sys.path.append('.')
+
+from horizons.util.tickprofiler import get_type_name
+
+# scenario name: (map or savegame, is_map, number of ai players, random map generator or None)
+SCENARIOS = {
+	'development': ('content/maps/development.sqlite', True, 2, None),
+	'fight-for-res': ('content/maps/fight-for-res.sqlite', True, 2, None),
+	'random-1': (1, True, 2, 'generate_map_from_seed'),
+	'huge-random-2': (2, True, 4, 'generate_huge_map_from_seed'),
+}
+
+# module prefix of the class of a scheduled call's instance: subsystem
+SUBSYSTEMS = [
+	('horizons.ai.', 'ai'),
+	('horizons.world.production.', 'production'),
+	('horizons.world.units.', 'units'),
+	('horizons.world.building.', 'buildings'),
+	('horizons.component.', 'components'),
+]
+
+
+def get_subsystem(cls):
+	if 'class_package' in cls.__dict__:
+		cls = cls.__bases__[0]
+	for prefix, subsystem in SUBSYSTEMS:
+		if cls.__module__.startswith(prefix):
+			return subsystem
+	return 'other'
+
+
+class CallTimes(object):
+	"""Sums up the time of scheduled calls, see Scheduler.callback_listener."""
+
+	def __init__(self):
+		self.by_class = {} # { class name: [calls, seconds] }
+		self.by_subsystem = {} # { subsystem: [calls, seconds] }
+
+	def __call__(self, callback_obj, seconds):
+		cls = callback_obj.class_instance.__class__
+		for key, times in ((get_type_name(cls), self.by_class), (get_subsystem(cls), self.by_subsystem)):
+			entry = times.setdefault(key, [0, 0.0])
+			entry[0] += 1
+			entry[1] += seconds
+
+	@classmethod
+	def to_json(cls, times):
+		return dict( (key, {'calls': calls, 'seconds': round(seconds, 4)})
+		             for key, (calls, seconds) in times.iteritems() )
+
+
+def time_pathfinding():
+	"""Measures all calls of FindPath and its subclasses.
+	@return: dict that is updated with 'calls' and 'seconds'"""
+	from horizons.util.pathfinding.pathfinding import FindPath
+	stats = {'calls': 0, 'seconds': 0.0}
+	original_call = FindPath.__call__
+
+	def timed_call(self, *args, **kwargs):
+		start = time.time()
+		try:
+			return original_call(self, *args, **kwargs)
+		finally:
+			stats['calls'] += 1
+			stats['seconds'] += time.time() - start
+
+	FindPath.__call__ = timed_call
+	return stats
+
+
+def run_scenario(name, path, is_map, ai_players, generator, ticks):
+	"""Runs a scenario in this process.
+	@return: dict with the results"""
+	gettext.install('', unicode=True) # no translations here
+	from run_tests import setup_horizons
+	setup_horizons()
+
+	import horizons.globals
+	import tests.game
+	from horizons.scheduler import Scheduler
+	from horizons.util import random_map
+
+	tests.game.setup_package()
+	horizons.globals.db = tests.game.db
+
+	start = time.time()
+	if generator is not None:
+		path = getattr(random_map, generator)(path)
+	if is_map:
+		session = tests.game.new_session(mapgen=lambda: path, human_player=False, ai_players=ai_players)[0]
+	else:
+		session = tests.game.load_session(path)
+	load_time = time.time() - start
+
+	call_times = CallTimes()
+	Scheduler().callback_listener = call_times
+	pathfinding = time_pathfinding()
+
+	start = time.time()
+	session.run(ticks=ticks)
+	run_time = time.time() - start
+
+	session.end(remove_savegame=False)
+	tests.game.SPTestSession.cleanup()
+
+	return {
+		'scenario': name,
+		'ticks': ticks,
+		'load_seconds': round(load_time, 3),
+		'run_seconds': round(run_time, 3),
+		'ticks_per_second': round(ticks / run_time, 2),
+		'calls_by_class': CallTimes.to_json(call_times.by_class),
+		'calls_by_subsystem': CallTimes.to_json(call_times.by_subsystem),
+		'pathfinding': {'calls': pathfinding['calls'], 'seconds': round(pathfinding['seconds'], 4)},
+		'peak_memory_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+	}
+
+
+def add_in_process_option(parser, what):
+	"""Adds the option that run_in_process starts the script with."""
+	parser.add_option('--in-process', dest='in_process', metavar='<file>',
+	                  help='Internal: run {0} here and write its result to <file>'.format(what))
+
+
+def write_result(result_file, result):
+	"""Writes the result of a run with --in-process for run_in_process."""
+	with open(result_file, 'w') as f:
+		json.dump(result, f)
+
+
+def run_in_process(script, args):
+	"""Runs the script with --in-process and args in a new process.
+	@return: the result it wrote or None if it failed"""
+	fd, result_file = tempfile.mkstemp()
+	os.close(fd)
+	command = [sys.executable, os.path.abspath(script), '--in-process', result_file] + list(args)
+	result = None
+	if subprocess.call(command) == 0:
+		with open(result_file) as f:
+			result = json.load(f)
+	os.remove(result_file)
+	return result
+
+
+def run_in_processes(script, runs, name_key):
+	"""Runs the script in a new process per run, see run_in_process.
+	@param runs: [(name, args), ...]
+	@param name_key: key of the name in the result of a failed run
+	@return: list of the results"""
+	results = []
+	for name, args in runs:
+		print >> sys.stderr, 'Running {0}...'.format(name)
+		results.append(run_in_process(script, args) or {name_key: name, 'error': True})
+	return results
+
+
+def format_report(report):
+	return json.dumps(report, indent=2, sort_keys=True)
+
+
+def get_revision():
+	try:
+		return subprocess.check_output(['git', 'rev-parse', 'HEAD'], stderr=open(os.devnull, 'w')).strip()
+	except (OSError, subprocess.CalledProcessError):
+		return None
+
+
+def main():
+	parser = OptionParser(usage='%prog [options] [scenario ...]\nScenarios: ' + ', '.join(sorted(SCENARIOS)))
+	parser.add_option('-t', '--ticks', dest='ticks', type='int', default=2000,
+	                  help='Number of ticks to run each scenario for (default: %default)')
+	parser.add_option('--map', dest='map', metavar='<file>',
+	                  help='Run this map instead of the fixed scenarios')
+	parser.add_option('--savegame', dest='savegame', metavar='<file>',
+	                  help='Run this savegame instead of the fixed scenarios')
+	parser.add_option('--ai-players', dest='ai_players', type='int', default=2,
+	                  help='Number of AI players for --map (default: %default)')
+	parser.add_option('-o', '--output', dest='output', metavar='<file>',
+	                  help='Write the report to this file instead of stdout')
+	add_in_process_option(parser, 'the single scenario')
+	(options, args) = parser.parse_args()
+
+	scenarios = dict(SCENARIOS)
+	if options.map:
+		scenarios['custom'] = (options.map, True, options.ai_players, None)
+		args = ['custom']
+	elif options.savegame:
+		scenarios['custom'] = (options.savegame, False, 0, None)
+		args = ['custom']
+	for name in args:
+		if name not in scenarios:
+			parser.error('unknown scenario: {0}'.format(name))
+
+	if options.in_process:
+		write_result(options.in_process, run_scenario(args[0], *(scenarios[args[0]] + (options.ticks, ))))
+		return
+
+	runs = []
+	for name in (args or sorted(SCENARIOS)):
+		run_args = ['--ticks', str(options.ticks)]
+		if name == 'custom':
+			run_args += ['--map', options.map] if options.map else ['--savegame', options.savegame]
+			run_args += ['--ai-players', str(options.ai_players)]
+		else:
+			run_args.append(name)
+		runs.append((name, run_args))
+	results = run_in_processes(__file__, runs, 'scenario')
+
+	report = format_report({'revision': get_revision(), 'results': results})
+	if options.output:
+		with open(options.output, 'w') as f:
+			f.write(report)
+	else:
+		print report
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python2
+# ###################################################
+# Copyright (C) 2008-2014 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+
+"""
+Compares the memory use and query latency of BuildingIndexer and CompactBuildingIndexer.
+
+Usage: development/benchmark_buildingindexer.py [options]
+
+The tree indexers of all islands and the fish indexer of a random map are built
+with each class in a new process. The memory is the increase of the resident set
+size caused by building them. The queries are the ones of wild animals (number of
+trees and a random tree in range) and of the AI fisher evaluation (all fish in range);
+the checksum shows whether both classes gave the same answers.
+"""
+
+import gc
+import gettext
+import hashlib
+import os
+import os.path
+import random
+import resource
+import sys
+import time
+from optparse import OptionParser
+
+# make this script work both when started inside development and in the uh root dir
+if not os.path.exists('content'):
+	os.chdir('..')
+assert os.path.exists('content'), 'Content dir not found.'
+sys.path.append('.')
+
+from development.benchmark import add_in_process_option, format_report, run_in_processes, write_result
+
+INDEXERS = ('BuildingIndexer', 'CompactBuildingIndexer')
+
+
+def get_memory_kb():
+	"""Returns the current resident set size, the peak where /proc is not available."""
+	try:
+		with open('/proc/self/statm') as f:
+			return int(f.read().split()[1]) * resource.getpagesize() // 1024
+	except IOError:
+		return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def run(indexer_name, seed, num_queries):
+	"""Builds the indexers of a random map and queries them in this process.
+	@return: dict with the results"""
+	gettext.install('', unicode=True) # no translations here
+	from run_tests import setup_horizons
+	setup_horizons()
+
+	import horizons.globals
+	import tests.game
+	from horizons.constants import BUILDINGS, RES
+	from horizons.entities import Entities
+	from horizons.util import buildingindexer, random_map
+	from horizons.world.units.animal import WildAnimal
+
+	tests.game.setup_package()
+	horizons.globals.db = tests.game.db
+	path = random_map.generate_huge_map_from_seed(seed)
+	# an AI game, the plain game tests have no trees and fish
+	session = tests.game.new_session(mapgen=lambda: path, human_player=False, ai_players=1)[0]
+	world = session.world
+	indexer_class = getattr(buildingindexer, indexer_name)
+
+	gc.collect()
+	memory = get_memory_kb()
+	start = time.time()
+	tree_indexers = []
+	for island in world.islands:
+		trees = [b for b in island.buildings if b.id == BUILDINGS.TREE]
+		tree_indexers.append((island, indexer_class(WildAnimal.walking_range, island.ground_map,
+		                                            random.Random(seed), buildings=trees)))
+	fish = world.provider_buildings.provider_by_resources[RES.FISH]
+	fish_indexer = indexer_class(Entities.buildings[BUILDINGS.FISHER].radius, world.full_map, buildings=fish)
+	build_time = time.time() - start
+	gc.collect()
+	memory = get_memory_kb() - memory
+
+	rng = random.Random(seed)
+	checksum = hashlib.md5()
+	start = time.time()
+	for _ in xrange(num_queries):
+		island, indexer = rng.choice(tree_indexers)
+		coords = rng.choice(island.ground_map.keys())
+		# like WildAnimal.get_job
+		for _ in xrange(min(5, indexer.get_num_buildings_in_range(coords))):
+			checksum.update(str(indexer.get_random_building_in_range(coords).worldid))
+	tree_time = time.time() - start
+
+	coast = [coords for island in world.islands for coords in island.terrain_cache.land_or_coast]
+	start = time.time()
+	for _ in xrange(num_queries // 10):
+		coords = rng.choice(coast)
+		# like the AI fisher evaluation
+		for fish_deposit in fish_indexer.get_buildings_in_range(coords):
+			checksum.update(str(fish_deposit.worldid))
+	fish_time = time.time() - start
+
+	return {
+		'indexer': indexer_name,
+		'islands': len(tree_indexers),
+		'trees': sum(len([b for b in island.buildings if b.id == BUILDINGS.TREE]) for island, _ in tree_indexers),
+		'fish_deposits': len(fish),
+		'memory_kb': memory,
+		'build_seconds': round(build_time, 3),
+		'tree_queries_per_second': round(num_queries / tree_time),
+		'fish_queries_per_second': round((num_queries // 10) / fish_time),
+		'checksum': checksum.hexdigest(),
+	}
+
+
+def main():
+	parser = OptionParser(usage='%prog [options]')
+	parser.add_option('--seed', dest='seed', type='int', default=2,
+	                  help='Seed of the random map (default: %default)')
+	parser.add_option('-q', '--queries', dest='queries', type='int', default=20000,
+	                  help='Number of tree queries, a tenth of it are fish queries (default: %default)')
+	add_in_process_option(parser, 'the single indexer given as argument')
+	(options, args) = parser.parse_args()
+
+	if options.in_process:
+		write_result(options.in_process, run(args[0], options.seed, options.queries))
+		return
+
+	runs = [(name, ['--seed', str(options.seed), '--queries', str(options.queries), name]) for name in INDEXERS]
+	results = run_in_processes(__file__, runs, 'indexer')
+	print format_report(results)
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python2
+# ###################################################
+# Copyright (C) 2008-2014 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+
+"""
+Measures how long it takes to save the savegames used by the game tests.
+
+Usage: development/benchmark_save.py [options] [fixture ...]
+
+Every fixture of tests/game/fixtures is loaded headless, run for a few seconds and
+then saved several times, both like a manual save and like an autosave (which
+doesn't wait for the data to reach the disk). The fastest run of each kind is
+reported together with the number of rows that were written. With --unbatched,
+every INSERT is executed on its own like before the rows were batched.
+"""
+
+import bz2
+import gettext
+import json
+import os
+import os.path
+import sqlite3
+import sys
+import tempfile
+import time
+from optparse import OptionParser
+
+# make this script work both when started inside development and in the uh root dir
+if not os.path.exists('content'):
+	os.chdir('..')
+assert os.path.exists('content'), 'Content dir not found.'
+sys.path.append('.')
+
+FIXTURES_DIR = os.path.join('tests', 'game', 'fixtures')
+
+
+def get_fixtures():
+	return sorted(name.split('.')[0] for name in os.listdir(FIXTURES_DIR) if '.sqlite' in name)
+
+
+def copy_fixture(name):
+	"""Returns the path of an uncompressed copy of the fixture."""
+	path = os.path.join(FIXTURES_DIR, name + '.sqlite')
+	if os.path.exists(path):
+		data = open(path, 'rb').read()
+	else:
+		data = bz2.decompress(open(path + '.bz2', 'rb').read())
+	fd, filename = tempfile.mkstemp()
+	os.close(fd)
+	with open(filename, 'wb') as f:
+		f.write(data)
+	return filename
+
+
+def count_rows(savegame):
+	db = sqlite3.connect(savegame)
+	tables = [row[0] for row in db.execute("SELECT name FROM sqlite_master WHERE type = 'table'")]
+	rows = sum(db.execute('SELECT COUNT(*) FROM "{0}"'.format(table)).fetchone()[0] for table in tables)
+	db.close()
+	return rows
+
+
+def run(fixtures, repeat, seconds, batched):
+	"""Saves the fixtures.
+	@return: list of dicts with the results"""
+	gettext.install('', unicode=True) # no translations here
+	from run_tests import setup_horizons
+	setup_horizons()
+
+	import mock
+	import horizons.globals
+	import tests.game
+	from horizons.util.dbreader import DbReader
+
+	tests.game.setup_package()
+	horizons.globals.db = tests.game.db
+	if not batched:
+		DbReader.start_batching_inserts = lambda self: None
+		DbReader.stop_batching_inserts = lambda self: None
+
+	def autosave(session, savegame):
+		# like SPTestSession.save
+		with mock.patch('horizons.session.SavegameManager._write_screenshot'):
+			with tests.game._dbreader_convert_dummy_objects():
+				return session._do_save(savegame, durable=False)
+
+	results = []
+	for name in fixtures:
+		print >> sys.stderr, 'Saving {0}...'.format(name)
+		savegame = copy_fixture(name)
+		session = tests.game.load_session(savegame)
+		session.run(seconds=seconds)
+
+		fd, target = tempfile.mkstemp()
+		os.close(fd)
+		result = {'fixture': name}
+		for kind, save in (('save', lambda: session.save(savegamename=target)),
+		                   ('autosave', lambda: autosave(session, target))):
+			times = []
+			for i in xrange(repeat):
+				os.remove(target)
+				start = time.time()
+				assert save()
+				times.append(time.time() - start)
+			result[kind + '_seconds'] = round(min(times), 3)
+		result['rows'] = count_rows(target)
+		os.remove(target)
+
+		session.end(keep_map=True)
+		tests.game.SPTestSession.cleanup()
+		results.append(result)
+
+	return results
+
+
+def main():
+	parser = OptionParser(usage='%prog [options] [fixture ...]\nFixtures: ' + ', '.join(get_fixtures()))
+	parser.add_option('--repeat', dest='repeat', type='int', default=5,
+	                  help='Number of saves of each kind (default: %default)')
+	parser.add_option('--seconds', dest='seconds', type='int', default=10,
+	                  help='Game seconds to run before saving (default: %default)')
+	parser.add_option('--unbatched', dest='batched', action='store_false', default=True,
+	                  help='Execute every INSERT on its own')
+	(options, args) = parser.parse_args()
+	for name in args:
+		if name not in get_fixtures():
+			parser.error('unknown fixture: {0}'.format(name))
+
+	results = run(args or get_fixtures(), options.repeat, options.seconds, options.batched)
+	print json.dumps(results, indent=2, sort_keys=True)
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python2
+# ###################################################
+# Copyright (C) 2008-2014 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+
+"""
+Measures how long it takes to load the savegames used by the game tests, and how much
+memory that needs, with the rows preloaded by the SavegameAccessor and with lazy loading
+(see SAVEGAME.LAZY_LOADING).
+
+Usage: development/benchmark_savegameload.py [options] [fixture ...]
+
+Every fixture of tests/game/fixtures is first loaded and saved again, so that it has the
+current format and needs no upgrade. That savegame is then loaded headless in a new
+process per mode. accessor_seconds is the time of creating the SavegameAccessor,
+accessor_memory_kb how much the peak memory grew meanwhile.
+"""
+
+import gettext
+import os
+import os.path
+import resource
+import sys
+import tempfile
+import time
+from optparse import OptionParser
+
+# make this script work both when started inside development and in the uh root dir
+if not os.path.exists('content'):
+	os.chdir('..')
+assert os.path.exists('content'), 'Content dir not found.'
+sys.path.append('.')
+
+from development.benchmark import add_in_process_option, format_report, run_in_process, write_result
+from development.benchmark_save import copy_fixture, count_rows, get_fixtures
+
+MODES = ('preload', 'lazy')
+
+
+def setup():
+	gettext.install('', unicode=True) # no translations here
+	from run_tests import setup_horizons
+	setup_horizons()
+
+	import horizons.globals
+	import tests.game
+	tests.game.setup_package()
+	horizons.globals.db = tests.game.db
+
+
+def convert(fixture, savegame):
+	"""Saves the fixture in the current format to savegame."""
+	setup()
+	import tests.game
+
+	original = copy_fixture(fixture)
+	session = tests.game.load_session(original)
+	assert session.save(savegamename=savegame)
+	session.end(keep_map=True) # removes the copy
+	tests.game.SPTestSession.cleanup()
+
+
+def run(savegame, mode):
+	"""Loads the savegame in this process.
+	@return: dict with the results"""
+	setup()
+	import tests.game
+	from horizons.constants import SAVEGAME
+	from horizons.util.savegameaccessor import SavegameAccessor
+
+	SAVEGAME.LAZY_LOADING = (mode == 'lazy')
+
+	accessor = {}
+	original_init = SavegameAccessor.__init__
+	def timed_init(self, *args, **kwargs):
+		memory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+		start = time.time()
+		original_init(self, *args, **kwargs)
+		accessor['seconds'] = time.time() - start
+		accessor['memory_kb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - memory
+	SavegameAccessor.__init__ = timed_init
+
+	start = time.time()
+	session = tests.game.load_session(savegame)
+	end = time.time()
+	SavegameAccessor.__init__ = original_init
+
+	session.end(keep_map=True, remove_savegame=False)
+	tests.game.SPTestSession.cleanup()
+
+	return {
+		'mode': mode,
+		'load_seconds': round(end - start, 3),
+		'accessor_seconds': round(accessor['seconds'], 3),
+		'accessor_memory_kb': accessor['memory_kb'],
+		'peak_memory_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+	}
+
+
+def main():
+	parser = OptionParser(usage='%prog [options] [fixture ...]\nFixtures: ' + ', '.join(get_fixtures()))
+	add_in_process_option(parser, 'the given command')
+	(options, args) = parser.parse_args()
+
+	if options.in_process:
+		if args[0] == 'convert':
+			convert(args[1], args[2])
+			result = True
+		else:
+			result = run(args[1], args[2])
+		write_result(options.in_process, result)
+		return
+
+	for name in args:
+		if name not in get_fixtures():
+			parser.error('unknown fixture: {0}'.format(name))
+
+	results = []
+	for name in (args or get_fixtures()):
+		print >> sys.stderr, 'Loading {0}...'.format(name)
+		fd, savegame = tempfile.mkstemp(suffix='.sqlite')
+		os.close(fd)
+		os.remove(savegame)
+		if run_in_process(__file__, ['convert', name, savegame]) is None:
+			results.append({'fixture': name, 'error': True})
+			continue
+		result = {'fixture': name, 'rows': count_rows(savegame)}
+		for mode in MODES:
+			result[mode] = run_in_process(__file__, ['run', savegame, mode]) or {'error': True}
+		results.append(result)
+		os.remove(savegame)
+
+	print format_report(results)
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python2
+# ###################################################
+# Copyright (C) 2008-2014 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+
+"""
+Measures how long it takes to load a map, split up into the stages of loading.
+
+Usage: development/benchmark_worldload.py [options] [map ...]
+
+Every map is loaded headless in a new process, with AI players like in
+development/benchmark.py. The stages are the ones shown on the loading screen
+(see LoadingProgress); world_load_map includes creating the islands, which is
+also reported on its own, and world_init_water builds the water path nodes and
+water bodies. Random maps are generated before the time is taken. The peak memory
+is the one of the whole process.
+"""
+
+import gettext
+import os
+import os.path
+import resource
+import sys
+import time
+from optparse import OptionParser
+
+# make this script work both when started inside development and in the uh root dir
+if not os.path.exists('content'):
+	os.chdir('..')
+assert os.path.exists('content'), 'Content dir not found.'
+sys.path.append('.')
+
+from development.benchmark import add_in_process_option, format_report, run_in_processes, write_result
+
+# map name: map file or (seed, map size) of a random map
+MAPS = {
+	'development': 'content/maps/development.sqlite',
+	'fight-for-res': 'content/maps/fight-for-res.sqlite',
+	'random-150': (1, 150),
+	'random-250': (2, 250),
+	'random-400': (3, 400),
+}
+
+
+def run(map_name, ai_players):
+	"""Loads the map in this process.
+	@return: dict with the results"""
+	gettext.install('', unicode=True) # no translations here
+	from run_tests import setup_horizons
+	setup_horizons()
+
+	import horizons.globals
+	import tests.game
+	from horizons.messaging import LoadingProgress
+	from horizons.util import random_map
+	from horizons.world.island import Island
+
+	tests.game.setup_package()
+	horizons.globals.db = tests.game.db
+
+	path = MAPS[map_name]
+	if isinstance(path, tuple):
+		seed, map_size = path
+		# like generate_huge_map_from_seed
+		path = random_map.generate_random_map(seed, map_size, 20, 70, 70, 5)
+
+	stages = [] # [(stage, start time), ...]
+	LoadingProgress.subscribe(lambda message: stages.append((message.stage, time.time())))
+
+	islands = {'count': 0, 'seconds': 0.0}
+	original_init = Island.__init__
+	def timed_init(self, *args, **kwargs):
+		start = time.time()
+		original_init(self, *args, **kwargs)
+		islands['count'] += 1
+		islands['seconds'] += time.time() - start
+	Island.__init__ = timed_init
+
+	start = time.time()
+	session = tests.game.new_session(mapgen=lambda: path, human_player=False, ai_players=ai_players)[0]
+	end = time.time()
+	world = session.world
+	map_size = (world.max_x - world.min_x, world.max_y - world.min_y)
+
+	stage_seconds = {}
+	for (stage, stage_start), (_, stage_end) in zip(stages, stages[1:] + [(None, end)]):
+		stage_seconds[stage] = round(stage_seconds.get(stage, 0.0) + stage_end - stage_start, 3)
+
+	session.end(remove_savegame=False)
+	tests.game.SPTestSession.cleanup()
+
+	return {
+		'map': map_name,
+		'map_size': map_size,
+		'islands': islands['count'],
+		'island_seconds': round(islands['seconds'], 3),
+		'load_seconds': round(end - start, 3),
+		'stage_seconds': stage_seconds,
+		'peak_memory_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+	}
+
+
+def main():
+	parser = OptionParser(usage='%prog [options] [map ...]\nMaps: ' + ', '.join(sorted(MAPS)))
+	parser.add_option('--ai-players', dest='ai_players', type='int', default=2,
+	                  help='Number of AI players (default: %default)')
+	add_in_process_option(parser, 'the single map given as argument')
+	(options, args) = parser.parse_args()
+	for name in args:
+		if name not in MAPS:
+			parser.error('unknown map: {0}'.format(name))
+
+	if options.in_process:
+		write_result(options.in_process, run(args[0], options.ai_players))
+		return
+
+	runs = [(name, ['--ai-players', str(options.ai_players), name]) for name in (args or sorted(MAPS))]
+	results = run_in_processes(__file__, runs, 'map')
+	print format_report(results)
+
+
+if __name__ == '__main__':
+	main()
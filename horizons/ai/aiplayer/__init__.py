@@ -42,6 +42,7 @@ from settlementmanager import SettlementManager
 from unitbuilder import UnitBuilder
 from constants import GOAL_RESULT
 from basicbuilder import BasicBuilder
+from buildingevaluator import BuildingEvaluator
 from specialdomestictrademanager import SpecialDomesticTradeManager
 from internationaltrademanager import InternationalTradeManager
 from settlementfounder import SettlementFounder
@@ -83,6 +84,7 @@ from horizons.util.python.callback import Callback
 from horizons.util.worldobject import WorldObject
 from horizons.ext.enum import Enum
 from horizons.ai.generic import GenericAI
+from horizons.constants import AI
 from horizons.component.selectablecomponent import SelectableComponent
 
 class AIPlayer(GenericAI):
@@ -153,6 +155,12 @@ class AIPlayer(GenericAI):
 		self.goals = [DoNothingGoal(self)]
 		self.special_domestic_trade_manager = SpecialDomesticTradeManager(self)
 		self.international_trade_manager = InternationalTradeManager(self)
+		self.tick_budget = AI.TICK_BUDGET # maximum number of tick steps per game tick, None for no limit
+		self._tick_steps = None # steps of the current tick that haven't been run yet
+		self._tick_start = None # game tick in which the current tick started
+		self.deferred_tick_steps = 0 # number of steps that were run in a later game tick than their tick started
+		self.deferred_ticks = 0 # number of ticks that didn't fit into a single game tick
+		self.max_tick_delay = 0 # maximum number of game ticks that a tick took to finish
 		SettlementRangeChanged.subscribe(self._on_settlement_range_changed)
 		NewDisaster.subscribe(self.notify_new_disaster)
 		MineEmpty.subscribe(self.notify_mine_empty)
@@ -198,6 +206,8 @@ class AIPlayer(GenericAI):
 		# save the player
 		db("UPDATE player SET client_id = 'AIPlayer' WHERE rowid = ?", self.worldid)
 
+		# the remaining steps of an unfinished tick (see tick_budget) aren't saved,
+		# a loaded player starts over with its next tick
 		current_callback = Callback(self.tick)
 		calls = Scheduler().get_classinst_calls(self, current_callback)
 		assert len(calls) == 1, "got %s calls for saving %s: %s" % (len(calls), current_callback, calls)
@@ -313,12 +323,62 @@ class AIPlayer(GenericAI):
 
 	def tick(self):
 		Scheduler().add_new_object(Callback(self.tick), self, run_in=self.tick_interval)
+		if self._tick_steps is not None:
+			# the last tick isn't over yet: finish it before starting the next one
+			Scheduler().rem_call(self, Callback(self._continue_tick))
+			self._run_tick_steps(None)
+		self._tick_steps = self._get_tick_steps()
+		self._tick_start = Scheduler().cur_tick
+		self._run_tick_steps(self.tick_budget)
+
+	def _continue_tick(self):
+		self._run_tick_steps(self.tick_budget)
+
+	def _run_tick_steps(self, budget):
+		"""
+		Run the remaining steps of the current tick.
+
+		If there are more than budget steps left then the rest is run in the next game tick.
+		A step is a call of a manager's tick or the update or execution of a single goal.
+		None means no limit which runs the whole tick at once like before the budget existed.
+		"""
+		deferred = Scheduler().cur_tick != self._tick_start
+		steps = 0
+		while budget is None or steps < budget:
+			steps += 1
+			try:
+				next(self._tick_steps)
+			except StopIteration: # this was the last step
+				self._tick_steps = None
+				break
+
+		if deferred:
+			self.deferred_tick_steps += steps
+		if self._tick_steps is not None:
+			if not deferred:
+				self.deferred_ticks += 1
+			Scheduler().add_new_object(Callback(self._continue_tick), self, run_in=1)
+		elif deferred:
+			delay = Scheduler().cur_tick - self._tick_start
+			self.max_tick_delay = max(self.max_tick_delay, delay)
+			self.log.debug('%s finished a tick after %d game ticks (%d deferred steps in %d ticks so far)',
+				self, delay, self.deferred_tick_steps, self.deferred_ticks)
+
+	def _get_tick_steps(self):
+		"""Generator that runs the tick, yielding after every step but the last one.
+		That way, the generator ends together with the last step."""
 		self.settlement_founder.tick()
+		yield
 		self.handle_enemy_expansions()
-		self.handle_settlements()
+		yield
+		for _ in self._get_settlement_steps():
+			yield
 		self.special_domestic_trade_manager.tick()
+		yield
 		self.international_trade_manager.tick()
+		yield
 		self.unit_manager.tick()
+		yield
 		self.combat_manager.tick()
 
 	def tick_long(self):
@@ -328,14 +388,17 @@ class AIPlayer(GenericAI):
 		Scheduler().add_new_object(Callback(self.tick_long), self, run_in=self.tick_long_interval)
 		self.strategy_manager.tick()
 
-	def handle_settlements(self):
+	def _get_settlement_steps(self):
+		"""Generator that handles the settlements' goals, yielding after every step."""
 		goals = []
 		for goal in self.goals:
 			if goal.can_be_activated:
 				goal.update()
 				goals.append(goal)
+				yield
 		for settlement_manager in self.settlement_managers:
-			settlement_manager.tick(goals)
+			for _ in settlement_manager.get_tick_steps(goals):
+				yield
 		goals.sort(reverse=True)
 
 		settlements_blocked = set()  # set([settlement_manager_id, ...])
@@ -345,6 +408,7 @@ class AIPlayer(GenericAI):
 			if isinstance(goal, SettlementGoal) and goal.settlement_manager.worldid in settlements_blocked:
 				continue  # can't build anything in this settlement
 			result = goal.execute()
+			yield
 			if result == GOAL_RESULT.SKIP:
 				self.log.info('%s, skipped goal %s', self, goal)
 			elif result == GOAL_RESULT.BLOCK_SETTLEMENT_RESOURCE_USAGE:
@@ -363,6 +427,7 @@ class AIPlayer(GenericAI):
 		# refresh taxes and upgrade permissions
 		for settlement_manager in self.settlement_managers:
 			settlement_manager.refresh_taxes_and_upgrade_permissions()
+		yield
 
 	def request_ship(self):
 		self.log.info('%s received request for more ships', self)
@@ -475,6 +540,7 @@ class AIPlayer(GenericAI):
 	@classmethod
 	def clear_caches(cls):
 		BasicBuilder.clear_cache()
+		BuildingEvaluator.clear_cache()
 		AbstractFarm.clear_cache()
 
 	def __str__(self):
@@ -484,6 +550,7 @@ class AIPlayer(GenericAI):
 		"""Called to speed up session destruction."""
 		assert self._enabled
 		self._enabled = False
+		self._tick_steps = None
 		SettlementRangeChanged.unsubscribe(self._on_settlement_range_changed)
 		NewDisaster.unsubscribe(self.notify_new_disaster)
 		MineEmpty.unsubscribe(self.notify_mine_empty)
@@ -40,6 +40,7 @@ class AbstractLumberjack(AbstractBuilding):
 class LumberjackEvaluator(BuildingEvaluator):
 	__template_outline = None
 	__radius_offsets = None
+	__radius_runs = None # [(dx, first dy, last dy), ...] covering __radius_offsets
 
 	@classmethod
 	def __init_outline(cls):
@@ -57,6 +58,13 @@ class LumberjackEvaluator(BuildingEvaluator):
 		cls.__template_outline = sorted(list(result))
 		cls.__radius_offsets = sorted(position.get_radius_coordinates(Entities.buildings[BUILDINGS.LUMBERJACK].radius))
 
+		cls.__radius_runs = []
+		for dx, dy in cls.__radius_offsets:
+			if cls.__radius_runs and cls.__radius_runs[-1][0] == dx and cls.__radius_runs[-1][2] == dy - 1:
+				cls.__radius_runs[-1] = (dx, cls.__radius_runs[-1][1], dy)
+			else:
+				cls.__radius_runs.append((dx, dy, dy))
+
 	@classmethod
 	def _get_outline(cls, x, y):
 		result = []
@@ -70,17 +78,10 @@ class LumberjackEvaluator(BuildingEvaluator):
 		if cls.__radius_offsets is None:
 			cls.__init_outline()
 
-		area_value = 0
-		coastline = area_builder.land_manager.coastline
 		personality = area_builder.owner.personality_manager.get('LumberjackEvaluator')
-		for dx, dy in cls.__radius_offsets:
-			coords = (x + dx, y + dy)
-			if coords in area_builder.plan and coords not in coastline:
-				purpose = area_builder.plan[coords][0]
-				if purpose == BUILDING_PURPOSE.NONE:
-					area_value += personality.new_tree
-				elif purpose == BUILDING_PURPOSE.TREE:
-					area_value += personality.shared_tree
+		weights = ((BUILDING_PURPOSE.NONE, personality.new_tree), (BUILDING_PURPOSE.TREE, personality.shared_tree))
+		coords_runs = [(x + dx, y + first_dy, y + last_dy) for dx, first_dy, last_dy in cls.__radius_runs]
+		area_value = cls._get_cache(area_builder).get_plan_value(weights, coords_runs)
 		area_value = min(area_value, personality.max_forest_value) # the lumberjack doesn't actually need all the trees
 		if area_value < personality.min_forest_value:
 			return None # the area is too bad for a lumberjack
@@ -41,17 +41,7 @@ class WeaverEvaluator(BuildingEvaluator):
 	def create(cls, area_builder, x, y, orientation):
 		builder = BasicBuilder.create(BUILDINGS.WEAVER, (x, y), orientation)
 
-		distance_to_farm = None
-		for building in area_builder.settlement.buildings_by_id.get(BUILDINGS.FARM, []):
-			distance = builder.position.distance(building.position)
-			if distance <= Entities.buildings[BUILDINGS.WEAVER].radius:
-				wool_producer = False
-				for provider in building.get_providers():
-					if isinstance(provider, Entities.buildings[BUILDINGS.PASTURE]):
-						wool_producer = True
-						break
-				if wool_producer:
-					distance_to_farm = distance if distance_to_farm is None or distance < distance_to_farm else distance_to_farm
+		distance_to_farm = cls._distance_to_nearest_farm(area_builder, builder, BUILDINGS.PASTURE)
 
 		distance_to_collector = cls._distance_to_nearest_collector(area_builder, builder)
 		if distance_to_collector is None:
@@ -20,11 +20,128 @@
 # ###################################################
 
 import logging
+from collections import defaultdict
 
 from horizons.ai.aiplayer.constants import BUILD_RESULT, BUILDING_PURPOSE
+from horizons.constants import BUILDINGS
 from horizons.util.python import decorators
 from horizons.entities import Entities
 
+class BuildingEvaluatorCache(object):
+	"""
+	Data about the area of an area builder that the evaluation of every position needs.
+
+	All possible positions of a building type are evaluated in a row, so the data is
+	collected once for all of them and kept until the island or the plans change.
+	"""
+
+	collector_cell_size = 16 # size of the squares that the collector buildings are sorted into
+
+	def __init__(self, area_builder):
+		self.area_builder = area_builder
+		self.__alignment = {} # {(x, y): alignment value of the tile}
+		self.__collector_cells = None # {(cell x, cell y): [building, ...]}
+		self.__farms = {} # {field building id: [farm, ...]}
+		self.__plan_column_sums = {} # {weights: {x: (first y, [sum of the weights above the y, ...])}}
+
+	def __get_tile_alignment(self, coords):
+		area_builder = self.area_builder
+		personality = area_builder.owner.personality_manager.get('BuildingEvaluator')
+		if coords in area_builder.land_manager.roads:
+			return personality.alignment_road
+		elif coords in area_builder.plan:
+			if area_builder.plan[coords][0] != BUILDING_PURPOSE.NONE:
+				return personality.alignment_production_building
+		elif coords in area_builder.settlement.ground_map:
+			object = area_builder.settlement.ground_map[coords].object
+			if object is not None and not object.buildable_upon:
+				return personality.alignment_other_building
+		else:
+			return personality.alignment_edge
+		return 0
+
+	def get_alignment(self, outline_coords_list):
+		"""Return the alignment value given the list of coordinates that form the outline of a shape."""
+		alignment_cache = self.__alignment
+		alignment = 0
+		for coords in outline_coords_list:
+			value = alignment_cache.get(coords)
+			if value is None:
+				value = self.__get_tile_alignment(coords)
+				alignment_cache[coords] = value
+			alignment += value
+		return alignment
+
+	def get_distance_to_nearest_collector(self, position, radius):
+		"""Return the shortest distance from the position to a collector building in the radius (None if there is none)."""
+		size = self.collector_cell_size
+		if self.__collector_cells is None:
+			self.__collector_cells = defaultdict(list)
+			for building in self.area_builder.collector_buildings:
+				for cell_x in xrange(building.position.left // size, building.position.right // size + 1):
+					for cell_y in xrange(building.position.top // size, building.position.bottom // size + 1):
+						self.__collector_cells[(cell_x, cell_y)].append(building)
+
+		shortest_distance = None
+		for cell_x in xrange((position.left - radius) // size, (position.right + radius) // size + 1):
+			for cell_y in xrange((position.top - radius) // size, (position.bottom + radius) // size + 1):
+				for building in self.__collector_cells.get((cell_x, cell_y), []):
+					distance = position.distance(building.position)
+					if distance <= radius:
+						shortest_distance = distance if shortest_distance is None or distance < shortest_distance else shortest_distance
+		return shortest_distance
+
+	def get_farms(self, field_building_id):
+		"""Return the farms of the settlement that have a field of the given type."""
+		if field_building_id not in self.__farms:
+			field_class = Entities.buildings[field_building_id]
+			farms = []
+			for building in self.area_builder.settlement.buildings_by_id.get(BUILDINGS.FARM, []):
+				for provider in building.get_providers():
+					if isinstance(provider, field_class):
+						farms.append(building)
+						break
+			self.__farms[field_building_id] = farms
+		return self.__farms[field_building_id]
+
+	def get_plan_value(self, weights, coords_runs):
+		"""
+		Return the sum of the weights of the planned purposes in the given columns except on the coastline.
+
+		@param weights: tuple((BUILDING_PURPOSE constant, weight), ...)
+		@param coords_runs: [(x, first y, last y), ...]
+		"""
+
+		if weights not in self.__plan_column_sums:
+			weight_map = dict(weights)
+			columns = defaultdict(dict) # {x: {y: weight, ...}, ...}
+			coastline = self.area_builder.land_manager.coastline
+			for coords, (purpose, _) in self.area_builder.plan.iteritems():
+				if purpose in weight_map and coords not in coastline:
+					columns[coords[0]][coords[1]] = weight_map[purpose]
+
+			column_sums = {}
+			for x, column in columns.iteritems():
+				first_y = min(column)
+				sums = [0]
+				for y in xrange(first_y, max(column) + 1):
+					sums.append(sums[-1] + column.get(y, 0))
+				column_sums[x] = (first_y, sums)
+			self.__plan_column_sums[weights] = column_sums
+
+		column_sums = self.__plan_column_sums[weights]
+		value = 0
+		for x, y1, y2 in coords_runs:
+			if x not in column_sums:
+				continue
+			first_y, sums = column_sums[x]
+			start = max(y1 - first_y, 0)
+			end = min(y2 - first_y + 1, len(sums) - 1)
+			if start < end:
+				value += sums[end] - sums[start]
+		return value
+
+
 class BuildingEvaluator(object):
 	"""Class representing a set of instructions for building a building complex along with its value."""
 
@@ -34,6 +151,8 @@ class BuildingEvaluator(object):
 
 	__slots__ = ('area_builder', 'builder', 'value')
 
+	__cache = {} # {area builder worldid: (change ids, BuildingEvaluatorCache), ...}
+
 	def __init__(self, area_builder, builder, value):
 		"""
 		@param area_builder: the relevant AreaBuilder instance
@@ -45,6 +164,20 @@ class BuildingEvaluator(object):
 		self.builder = builder
 		self.value = value
 
+	@classmethod
+	def _get_cache(cls, area_builder):
+		"""Return the BuildingEvaluatorCache of the area builder."""
+		current_cache_changes = (area_builder.island.last_change_id, area_builder.land_manager.last_change_id)
+
+		worldid = area_builder.worldid
+		if worldid not in cls.__cache or cls.__cache[worldid][0] != current_cache_changes:
+			cls.__cache[worldid] = (current_cache_changes, BuildingEvaluatorCache(area_builder))
+		return cls.__cache[worldid][1]
+
+	@classmethod
+	def clear_cache(cls):
+		cls.__cache.clear()
+
 	@classmethod
 	def _weighted_distance(cls, main_component, other_components, none_value):
 		"""
@@ -93,10 +226,31 @@ class BuildingEvaluator(object):
 		@param must_be_in_range: whether the building has to be in range of the builder
 		"""
 
+		if must_be_in_range:
+			return cls._get_cache(production_builder).get_distance_to_nearest_collector(builder.position,
+				Entities.buildings[builder.building_id].radius)
+
 		shortest_distance = None
 		for building in production_builder.collector_buildings:
 			distance = builder.position.distance(building.position)
-			if not must_be_in_range or distance <= Entities.buildings[builder.building_id].radius:
+			shortest_distance = distance if shortest_distance is None or distance < shortest_distance else shortest_distance
+		return shortest_distance
+
+	@classmethod
+	def _distance_to_nearest_farm(cls, area_builder, builder, field_building_id):
+		"""
+		Return the shortest distance to a farm with a field of type field_building_id that is in range of the builder.
+
+		@param area_builder: AreaBuilder instance
+		@param builder: Builder instance
+		@param field_building_id: the building type id of the field
+		"""
+
+		shortest_distance = None
+		radius = Entities.buildings[builder.building_id].radius
+		for building in cls._get_cache(area_builder).get_farms(field_building_id):
+			distance = builder.position.distance(building.position)
+			if distance <= radius:
 				shortest_distance = distance if shortest_distance is None or distance < shortest_distance else shortest_distance
 		return shortest_distance
 
@@ -118,22 +272,7 @@ class BuildingEvaluator(object):
 	@classmethod
 	def _get_alignment_from_outline(cls, area_builder, outline_coords_list):
 		"""Return an alignment value given the list of coordinates that form the outline of a shape."""
-		personality = area_builder.owner.personality_manager.get('BuildingEvaluator')
-		alignment = 0
-		for coords in outline_coords_list:
-			if coords in area_builder.land_manager.roads:
-				alignment += personality.alignment_road
-			elif coords in area_builder.plan:
-				purpose = area_builder.plan[coords][0]
-				if purpose != BUILDING_PURPOSE.NONE:
-					alignment += personality.alignment_production_building
-			elif coords in area_builder.settlement.ground_map:
-				object = area_builder.settlement.ground_map[coords].object
-				if object is not None and not object.buildable_upon:
-					alignment += personality.alignment_other_building
-			else:
-				alignment += personality.alignment_edge
-		return alignment
+		return cls._get_cache(area_builder).get_alignment(outline_coords_list)
 
 	@classmethod
 	def _get_alignment(cls, area_builder, coords_list):
@@ -202,4 +341,5 @@ class BuildingEvaluator(object):
 				best_value = evaluators[i].value
 		return evaluators[best_index]
 
+decorators.bind_all(BuildingEvaluatorCache)
 decorators.bind_all(BuildingEvaluator)
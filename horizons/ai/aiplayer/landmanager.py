@@ -71,6 +71,7 @@ class LandManager(WorldObject):
 		self.coastline = self._get_coastline() # set((x, y), ...) of coordinates which coastal buildings could use in the production area
 		self.personality = self.owner.personality_manager.get('LandManager')
 		self.refresh_resource_deposits()
+		self._init_cache()
 
 	def save(self, db):
 		super(LandManager, self).save(db)
@@ -293,6 +294,7 @@ class LandManager(WorldObject):
 		"""Assign a current village tile to the production area."""
 		self.production[coords] = self.village[coords]
 		del self.village[coords]
+		self.register_change()
 
 	def handle_lost_area(self, coords_list):
 		"""Handle losing the potential land in the given coordinates list."""
@@ -304,6 +306,15 @@ class LandManager(WorldObject):
 				del self.production[coords]
 			self.roads.discard(coords)
 			self.coastline.discard(coords)
+		self.register_change()
+
+	def _init_cache(self):
+		"""Initialize the cache that knows the last time the areas or the plans of the settlement may have changed."""
+		self.last_change_id = -1
+
+	def register_change(self):
+		"""Register the possible change of the areas, the roads, or the plan of an area builder."""
+		self.last_change_id += 1
 
 	def display(self):
 		"""Show the plan on the map unless it is disabled in the settings."""
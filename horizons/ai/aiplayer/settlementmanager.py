@@ -391,22 +391,29 @@ class SettlementManager(WorldObject):
 		self.resource_manager.finish_tick()
 
 	def _add_goals(self, goals):
-		"""Add the settlement's goals that can be activated to the goals list."""
+		"""Add the settlement's goals that can be activated to the goals list, yielding after every goal."""
 		for goal in self._goals:
 			if goal.can_be_activated:
 				goal.update()
 				goals.append(goal)
+				yield
 
-	def tick(self, goals):
-		"""Refresh the settlement info and add its goals to the player's goal list."""
+	def get_tick_steps(self, goals):
+		"""Generator that refreshes the settlement info and adds its goals to the player's goal list,
+		yielding after every step."""
 		if self.feeder_island:
 			self._start_feeder_tick()
-			self._add_goals(goals)
+			yield
+			for _ in self._add_goals(goals):
+				yield
 			self._end_feeder_tick()
 		else:
 			self._start_general_tick()
-			self._add_goals(goals)
+			yield
+			for _ in self._add_goals(goals):
+				yield
 			self._end_general_tick()
+		yield
 
 	def add_building(self, building):
 		"""Called when a new building is added to the settlement (the building already exists during the call)."""
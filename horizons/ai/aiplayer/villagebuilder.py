@@ -197,6 +197,7 @@ class VillageBuilder(AreaBuilder):
 		for coords, (purpose, _) in self.plan.iteritems():
 			if purpose == BUILDING_PURPOSE.ROAD:
 				self.land_manager.roads.add(coords)
+		self.land_manager.register_change()
 
 	@classmethod
 	def _remove_unreachable_roads(cls, section_plan, main_square):
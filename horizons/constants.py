@@ -72,7 +72,7 @@ class VERSION:
 	REQUIRED_FIFE_VERSION = (REQUIRED_FIFE_MAJOR_VERSION, REQUIRED_FIFE_MINOR_VERSION, REQUIRED_FIFE_PATCH_VERSION)
 
 	## +=1 this if you changed the savegame "api"
-	SAVEGAMEREVISION = 74
+	SAVEGAMEREVISION = 75
 	SAVEGAME_LEAST_UPGRADABLE_REVISION = 48
 
 	@staticmethod
@@ -404,6 +404,27 @@ class GAME:
 	WORLD_WORLDID = 0 # worldid of World object
 	MAX_TICKS = None # exit after on tick MAX_TICKS (disabled by setting to None)
 
+# Pathfinding; the engine can be overridden on the command line
+class PATHFINDING:
+	ENGINES = ('dict', 'grid')
+	ENGINE = 'grid' # 'dict': search on the path node dicts, 'grid': search on their PathGrids (same paths)
+	# ships use jump point search on grids with uniform costs, whatever the ENGINE. Its paths are as
+	# long as the A* ones, but may take other routes, so all clients of a game must use the same value.
+	JUMP_POINT_SEARCH = True
+	PATH_CACHE_SIZE = 256 # number of road paths cached per island
+
+# Profiling of the scheduled calls per tick, see TickProfiler
+class TICK_PROFILER:
+	ENABLED = False
+	NUM_TICKS = 300 # number of ticks kept
+	SLOW_TICK = 0.05 # seconds; slower ticks are logged
+	OUTPUT = None # file the flame graph data is written to when the session ends
+
+# Loading of savegames, see SavegameAccessor
+class SAVEGAME:
+	LAZY_LOADING = False # fetch the rows of an object when it's loaded instead of all rows at once
+	LAZY_CACHE_SIZE = 1024 # number of values kept per table in lazy loading
+
 # Map related constants
 class MAP:
 	PADDING = 10 # extra usable water around the map edges
@@ -430,6 +451,10 @@ class AI:
 	HIGHLIGHT_PLANS = False # whether to show the AI players' plans on the map
 	HIGHLIGHT_COMBAT = False # whether to show the AI players' combat ranges around each unit
 	HUMAN_AI = False # whether the human player is controlled by the AI
+	# maximum number of steps (manager ticks, goal updates and executions) of an AI player's
+	# tick that are run in one game tick, the rest follows in the next game ticks. None for no limit.
+	# A limit makes the AI decide on a slightly later world state. Can be set per player (tick_budget).
+	TICK_BUDGET = None
 
 class TRADER: # check resource values: ./development/print_db_data.py res
 	TILES_PER_TRADER = 100 # create one ship per 100 tiles
@@ -581,6 +606,7 @@ class PLAYER:
 ## SINGLEPLAYER
 class SINGLEPLAYER:
 	FREEZE_PROTECTION = True
+	BACKGROUND_AUTOSAVE = True # write autosaves in a thread while the game goes on
 	SEED = None
 
 ## MULTIPLAYER
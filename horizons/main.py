@@ -44,7 +44,7 @@ import horizons.globals
 from horizons.savegamemanager import SavegameManager
 from horizons.gui import Gui
 from horizons.extscheduler import ExtScheduler
-from horizons.constants import AI, GAME, PATHS, NETWORK, SINGLEPLAYER, GAME_SPEED, GFX, VERSION
+from horizons.constants import AI, GAME, PATHS, NETWORK, SINGLEPLAYER, GAME_SPEED, GFX, VERSION, PATHFINDING, TICK_PROFILER
 from horizons.messaging import LoadingProgress
 from horizons.network.networkinterface import NetworkInterface
 from horizons.util.loaders.actionsetloader import ActionSetLoader
@@ -129,6 +129,13 @@ def start(_command_line_arguments):
 	if command_line_arguments.max_ticks:
 		GAME.MAX_TICKS = command_line_arguments.max_ticks
 
+	if command_line_arguments.pathfinding_engine:
+		PATHFINDING.ENGINE = command_line_arguments.pathfinding_engine
+
+	if command_line_arguments.profile_ticks:
+		TICK_PROFILER.ENABLED = True
+		TICK_PROFILER.OUTPUT = command_line_arguments.profile_ticks
+
 	preload_lock = threading.Lock()
 
 	if command_line_arguments.atlas_generation and not command_line_arguments.gui_test and \
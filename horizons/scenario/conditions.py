@@ -19,7 +19,11 @@
 # 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
 # ###################################################
 
+from collections import defaultdict
+
 from horizons.constants import RES, BUILDINGS
+from horizons.messaging import (NewSettlement, PlayerInventoryUpdated, SettlementInventoryUpdated,
+                                SettlerInhabitantsChanged)
 from horizons.scheduler import Scheduler
 from horizons.util.pathfinding.pather import StaticPather
 from horizons.util.python.registry import Registry
@@ -35,19 +39,23 @@ class CONDITIONS(object):
 
 	Condition checking is split up in 2 types:
 
-	  1. possible condition change is notified somewhere in the game code
+	  1. possible condition change is notified somewhere in the game code,
+	     either directly or by one of the messages the condition is registered for
 	  2. condition is checked periodically
 	"""
 	__metaclass__ = Registry
 
 	check_periodically = []
+	check_on_message = defaultdict(list) # message class -> names of conditions
 
 	@classmethod
-	def register_function(cls, func, periodically=False):
+	def register_function(cls, func, periodically=False, messages=()):
 		"""Register condition.
 
 		`periodically` means that this condition function will be called periodically
 		by the ScenarioEventHandler.
+		`messages` are the message classes that are sent when the value of the condition
+		may have changed. The ScenarioEventHandler checks the condition after them.
 		"""
 		name = func.__name__
 		cls.registry[name] = func
@@ -57,6 +65,8 @@ class CONDITIONS(object):
 
 		if periodically:
 			cls.check_periodically.append(name)
+		for message in messages:
+			cls.check_on_message[message].append(name)
 
 
 register = CONDITIONS.register
@@ -72,12 +82,12 @@ def settler_level_greater(session, limit):
 	"""Returns whether the highest tier reached in any player settlement is greater than *limit*."""
 	return (session.world.player.settler_level > limit)
 
-@register(periodically=True)
+@register(messages=(PlayerInventoryUpdated, ))
 def player_gold_greater(session, limit):
 	"""Returns whether the player has more gold than *limit*."""
 	return (session.world.player.get_component(StorageComponent).inventory[RES.GOLD] > limit)
 
-@register(periodically=True)
+@register(messages=(PlayerInventoryUpdated, ))
 def player_gold_less(session, limit):
 	"""Returns whether the player has less gold than *limit*."""
 	return (session.world.player.get_component(StorageComponent).inventory[RES.GOLD] < limit)
@@ -93,13 +103,13 @@ def player_balance_greater(session, limit):
 	"""Returns whether the cumulative balance of all player settlements is higher than *limit*."""
 	return (sum(settlement.balance for settlement in _get_player_settlements(session)) > limit)
 
-@register(periodically=True)
+@register(messages=(SettlerInhabitantsChanged, NewSettlement))
 def settlement_inhabitants_greater(session, limit):
 	"""Returns whether at least one player settlement has more than *limit* inhabitants."""
 	return any(settlement for settlement in _get_player_settlements(session) if
 	           settlement.inhabitants > limit)
 
-@register(periodically=True)
+@register(messages=(SettlerInhabitantsChanged, NewSettlement))
 def player_inhabitants_greater(session, limit):
 	"""Returns whether all player settlements combined have more than *limit* inhabitants."""
 	return (sum(settlement.inhabitants for settlement in _get_player_settlements(session)) > limit)
@@ -112,19 +122,19 @@ def building_num_of_type_greater(session, building_class, limit):
 			return True
 	return False
 
-@register(periodically=True)
+@register(messages=(SettlementInventoryUpdated, NewSettlement))
 def player_res_stored_greater(session, resource, limit):
 	"""Returns whether all player settlements combined have more than *limit*
 	of *resource* in their inventories."""
 	return (sum(settlement.get_component(StorageComponent).inventory[resource] for settlement in _get_player_settlements(session)) > limit)
 
-@register(periodically=True)
+@register(messages=(SettlementInventoryUpdated, NewSettlement))
 def player_res_stored_less(session, resource, limit):
 	"""Returns whether all player settlements combined have less than *limit*
 	of *resource* in their inventories."""
 	return (sum(settlement.get_component(StorageComponent).inventory[resource] for settlement in _get_player_settlements(session)) < limit)
 
-@register(periodically=True)
+@register(messages=(SettlementInventoryUpdated, NewSettlement))
 def settlement_res_stored_greater(session, resource, limit):
 	"""Returns whether at least one player settlement has more than *limit*
 	of *resource* in its inventory."""
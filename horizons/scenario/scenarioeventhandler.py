@@ -49,6 +49,8 @@ class ScenarioEventHandler(LivingObject):
 	Whenever the game state changes in a way, that can change the truth value of a condition,
 	the event handler must be notified. It will then check all relevant events.
 	It is imperative for this notification to always be triggered, else the scenario gets stuck.
+	Conditions can also be registered for the messages that are sent when their inputs change,
+	they are then checked once after the messages of a tick.
 	For conditions, where this approach doesn't make sense (e.g. too frequent changes),
 	a periodic check can be used.
 
@@ -73,6 +75,7 @@ class ScenarioEventHandler(LivingObject):
 		# map: condition types -> events
 		self._event_conditions = {}
 		self._scenario_variables = {} # variables for set_var, var_eq ...
+		self._pending_conditions = set() # condition types to check because of messages
 		for cond in CONDITIONS.registry.keys():
 			self._event_conditions[cond] = set()
 		if scenariofile:
@@ -87,6 +90,12 @@ class ScenarioEventHandler(LivingObject):
 		Scheduler().add_new_object(self._scheduled_check, self,
 		                           run_in=Scheduler().get_ticks(self.CHECK_CONDITIONS_INTERVAL),
 		                           loops=-1)
+		if self.inited:
+			for message_class, cond_types in CONDITIONS.check_on_message.iteritems():
+				message_class.subscribe(self._on_condition_message)
+				# the messages of the past are unknown, e.g. when the game was loaded
+				self._pending_conditions.update(cond_types)
+			self._check_pending_conditions()
 
 	def sleep(self, ticks):
 		"""Sleep the ScenarioEventHandler for number of ticks. This delays all
@@ -104,6 +113,8 @@ class ScenarioEventHandler(LivingObject):
 
 	def end(self):
 		Scheduler().rem_all_classinst_calls(self)
+		for message_class in CONDITIONS.check_on_message:
+			message_class.discard(self._on_condition_message)
 		self.session = None
 		self._events = None
 		self._data = None
@@ -206,6 +217,21 @@ class ScenarioEventHandler(LivingObject):
 		for cond_type in CONDITIONS.check_periodically:
 			self.check_events(cond_type)
 
+	def _on_condition_message(self, message):
+		"""Schedule a check of the events with conditions that can be changed by the message."""
+		cond_types = [cond_type for cond_type in CONDITIONS.check_on_message[message.__class__]
+		              if self._event_conditions[cond_type]]
+		if cond_types and not self._pending_conditions:
+			Scheduler().add_new_object(self._check_pending_conditions, self, run_in=self.sleep_ticks_remaining)
+		self._pending_conditions.update(cond_types)
+
+	def _check_pending_conditions(self):
+		"""Check the conditions whose values may have changed since the last check."""
+		cond_types = self._pending_conditions
+		self._pending_conditions = set()
+		for cond_type in cond_types:
+			self.check_events(cond_type)
+
 	def _remove_event(self, event):
 		assert isinstance(event, _Event)
 		for cond in event.conditions:
@@ -20,23 +20,25 @@
 # ###################################################
 
 import logging
-from collections import deque
+import time
 
 import horizons.main
 
 from horizons.util.living import LivingObject
 from horizons.util.python.singleton import ManualConstructionSingleton
+from horizons.util.python.timingwheel import TimingWheel
 from horizons.constants import GAME
 
 class Scheduler(LivingObject):
 	""""Class providing timed callbacks.
 	Master of time.
 
-	TODO:
-	- Refactor to use a data structure that is suitable for iteration (ticking) as well as
-	  searching/deleting by instance, possibly also by callback.
-	  Suggestion: { tick -> { instance -> [callback] }} (basically a k-d tree)
-
+	Scheduled calls are kept in a hierarchical timing wheel, which preserves the order
+	in which calls for the same tick have been added. Additionally, calls are indexed by
+	class instance and callback, so that querying and removing them doesn't require
+	searching through the schedule. Removed calls are only marked as invalid and are
+	skipped when their tick is executed. If they make up too much of the schedule,
+	it is compacted.
 
 	@param timer: Timer instance the schedular registers itself with.
 	"""
@@ -47,15 +49,25 @@ class Scheduler(LivingObject):
 	# the tick with this id is actually executed, and no tick with a smaller number can occur
 	FIRST_TICK_ID = 0
 
+	# the schedule is compacted when more than this share of its calls is invalid
+	COMPACTION_INVALID_SHARE = 0.5
+	# but never for fewer invalid calls than this, it isn't worth the effort
+	COMPACTION_MIN_INVALID = 1024
+
 	def __init__(self, timer):
 		"""
 		@param timer: Timer obj
 		"""
 		super(Scheduler, self).__init__()
-		self.schedule = {}
-		self.additional_cur_tick_schedule = [] # jobs to be executed at the same tick they were added
-		self.calls_by_instance = {} # for get_classinst_calls
 		self.cur_tick = self.__class__.FIRST_TICK_ID-1 # before ticking
+		self.schedule = TimingWheel(self.cur_tick)
+		self.additional_cur_tick_schedule = [] # jobs to be executed at the same tick they were added
+		self.calls_by_instance = {} # { class_instance: { callback: [CallbackObject] } }
+		self.num_invalid_calls = 0 # invalid calls that are still in the schedule
+		self._cur_callback = None # call that is executed right now, it isn't in the schedule
+		self._finish_cur_callback = False # whether _cur_callback was removed, but still finishes
+		# optional callable(callback_obj, seconds), notified after each executed call (for profiling)
+		self.callback_listener = None
 		self.timer = timer
 		self.timer.add_call(self.tick)
 
@@ -77,44 +89,71 @@ class Scheduler(LivingObject):
 			horizons.main.quit()
 			return
 
-		if self.cur_tick in self.schedule:
-			self.log.debug("Scheduler: tick %s, cbs: %s", self.cur_tick, len(self.schedule[self.cur_tick]))
-
-			# use iteration method that works in case the list is altered during iteration
-			# this can happen for e.g. rem_all_classinst_calls
-			cur_schedule = self.schedule[self.cur_tick]
-			while cur_schedule:
-				callback = cur_schedule.popleft()
-				# TODO: some system-level unit tests fail if this list is not processed in the correct order
-				#       (i.e. if e.g. pop() was used here). This is an indication of invalid assumptions
-				#       in the program and should be fixed.
-
-				if hasattr(callback, "invalid"):
+		cur_schedule = self.schedule.advance()
+		assert self.schedule.cur_tick == self.cur_tick
+		if cur_schedule:
+			self.log.debug("Scheduler: tick %s, cbs: %s", self.cur_tick, len(cur_schedule))
+
+			# callbacks are executed in the order they were added, since
+			# some system-level unit tests fail if this list is not processed in the correct order.
+			# This is an indication of invalid assumptions in the program and should be fixed.
+			listener = self.callback_listener
+			for callback in cur_schedule:
+				# calls removed in the meantime (e.g. by rem_all_classinst_calls) are still here
+				if callback.invalid:
+					self.num_invalid_calls -= 1
 					self.log.debug("S(t:%s): %s: INVALID", tick_id, callback)
 					continue
 				self.log.debug("S(t:%s): %s", tick_id, callback)
-				callback.callback()
+				self._cur_callback = callback
+				if listener is None:
+					callback.callback()
+				else:
+					start = time.time()
+					callback.callback()
+					listener(callback, time.time() - start)
+				self._cur_callback = None
+				if callback.invalid:
+					# removed by its own callback. Like before calls were indexed, the last run of a
+					# call still finishes if it was removed by rem_call or rem_object, but not
+					# if all calls of its instance were removed.
+					if callback.loops == 0 and self._finish_cur_callback and \
+					   callback.finish_callback is not None:
+						callback.finish_callback()
+					continue
 				assert callback.loops >= -1
 				if callback.loops != 0:
 					self.add_object(callback, readd=True)
 				else: # gone for good
-					if callback.class_instance in self.calls_by_instance:
-						# this can already be removed by e.g. rem_all_classinst_calls
-						if callback.finish_callback is not None:
-							callback.finish_callback()
-
-						try:
-							self.calls_by_instance[callback.class_instance].remove(callback)
-						except ValueError:
-							pass # also the callback can be deleted by e.g. rem_call
-			del self.schedule[self.cur_tick]
+					if callback.finish_callback is not None:
+						callback.finish_callback()
+					self._unindex(callback)
 
 			self.log.debug("Scheduler: finished tick %s", self.cur_tick)
 
 		# run jobs added in the loop above
 		self._run_additional_jobs()
 
-		assert (not self.schedule) or self.schedule.iterkeys().next() > self.cur_tick
+		if self.num_invalid_calls >= self.COMPACTION_MIN_INVALID and \
+		   self.num_invalid_calls > self.COMPACTION_INVALID_SHARE * len(self.schedule):
+			self._compact()
+
+	def _compact(self):
+		"""Removes all invalid calls from the schedule."""
+		removed = self.schedule.remove_if(lambda callback_obj: callback_obj.invalid)
+		self.log.debug("Scheduler: compacted %s invalid calls at tick %s", removed, self.cur_tick)
+		assert removed == self.num_invalid_calls, "%s, %s" % (removed, self.num_invalid_calls)
+		self.num_invalid_calls = 0
+
+	def _invalidate(self, callback_obj, finish=False):
+		"""Marks a scheduled call as removed. It stays in the schedule until its tick or
+		the next compaction.
+		@param finish: whether the call still gets its finish_callback if it is executed right now"""
+		callback_obj.invalid = True
+		if callback_obj is self._cur_callback:
+			self._finish_cur_callback = finish
+		else:
+			self.num_invalid_calls += 1
 
 	def before_ticking(self):
 		"""Called after game load and before game has started.
@@ -125,9 +164,15 @@ class Scheduler(LivingObject):
 		self._run_additional_jobs()
 
 	def _run_additional_jobs(self):
+		listener = self.callback_listener
 		for callback in self.additional_cur_tick_schedule:
 			assert callback.loops == 0 # can't loop with no delay
-			callback.callback()
+			if listener is None:
+				callback.callback()
+			else:
+				start = time.time()
+				callback.callback()
+				listener(callback, time.time() - start)
 		self.additional_cur_tick_schedule = []
 
 	def add_object(self, callback_obj, readd=False):
@@ -141,15 +186,11 @@ class Scheduler(LivingObject):
 			self.additional_cur_tick_schedule.append(callback_obj)
 		else: # default: run in future tick
 			interval = callback_obj.loop_interval if readd else callback_obj.run_in
-			tick_key = self.cur_tick + interval
-			if not tick_key in self.schedule:
-				self.schedule[tick_key] = deque()
-			callback_obj.tick = tick_key
-			self.schedule[tick_key].append(callback_obj)
-			if not readd:  # readded calls haven't been removed here
-				if not callback_obj.class_instance in self.calls_by_instance:
-					self.calls_by_instance[callback_obj.class_instance] = []
-				self.calls_by_instance[callback_obj.class_instance].append( callback_obj )
+			callback_obj.tick = self.cur_tick + interval
+			self.schedule.add(callback_obj.tick, callback_obj)
+			if not readd:  # readded calls are still indexed
+				calls = self.calls_by_instance.setdefault(callback_obj.class_instance, {})
+				calls.setdefault(self._get_callback_key(callback_obj.callback), []).append(callback_obj)
 
 	def add_new_object(self, callback, class_instance, run_in=1, loops=1, loop_interval=None, finish_callback=None):
 		"""Creates a new CallbackObject instance and calls the self.add_object() function.
@@ -161,37 +202,61 @@ class Scheduler(LivingObject):
 		callback_obj = _CallbackObject(self, callback, class_instance, run_in, loops, loop_interval, finish_callback=finish_callback)
 		self.add_object(callback_obj)
 
+	@staticmethod
+	def _get_callback_key(callback):
+		"""Returns the key of callback in the dicts of calls_by_instance.
+		Callbacks that can't be hashed (e.g. a Callback with a list argument) share one key."""
+		try:
+			hash(callback)
+		except TypeError:
+			return _UNHASHABLE_CALLBACKS
+		return callback
+
+	def _get_indexed_calls(self, instance, callback):
+		"""Returns the list of CallbackObjects of instance that execute callback."""
+		calls = self.calls_by_instance.get(instance)
+		if calls is None:
+			return []
+		key = self._get_callback_key(callback)
+		callback_objs = calls.get(key, [])
+		if key is _UNHASHABLE_CALLBACKS:
+			callback_objs = [obj for obj in callback_objs if obj.callback == callback]
+		return callback_objs
+
+	def _unindex(self, callback_obj):
+		"""Removes callback_obj from calls_by_instance.
+		@return: bool, whether it was indexed"""
+		calls = self.calls_by_instance.get(callback_obj.class_instance)
+		if calls is None:
+			return False
+		key = self._get_callback_key(callback_obj.callback)
+		callback_objs = calls.get(key)
+		if callback_objs is None or callback_obj not in callback_objs:
+			return False
+		callback_objs.remove(callback_obj)
+		if not callback_objs:
+			del calls[key]
+			if not calls:
+				del self.calls_by_instance[callback_obj.class_instance]
+		return True
+
 	def rem_object(self, callback_obj):
 		"""Removes a CallbackObject from all callback lists
 		@param callback_obj: CallbackObject to remove
 		@return: int, number of removed calls
 		"""
-		removed_objs = 0
-		if self.schedule is not None:
-			for key in self.schedule:
-				while callback_obj in self.schedule[key]:
-					self.schedule[key].remove(callback_obj)
-					self.calls_by_instance[callback_obj.class_instance].remove(callback_obj)
-					removed_objs += 1
-
-		if not self.calls_by_instance[callback_obj.class_instance]:
-			del self.calls_by_instance[callback_obj.class_instance]
-
-		return removed_objs
+		if self.schedule is None or not self._unindex(callback_obj):
+			return 0
+		self._invalidate(callback_obj, finish=True)
+		return 1
 
 	def rem_all_classinst_calls(self, class_instance):
 		"""Removes all callbacks from the scheduler that belong to the class instance class_inst."""
-		"""
-		for key in self.schedule:
-			callback_objects = self.schedule[key]
-			for i in xrange(len(callback_objects) - 1, -1, -1):
-				if callback_objects[i].class_instance is class_instance:
-					del callback_objects[i]
-		"""
-		if class_instance in self.calls_by_instance:
-			for callback_obj in self.calls_by_instance[class_instance]:
-				callback_obj.invalid = True # don't remove, finding them all takes too long
-			del self.calls_by_instance[class_instance]
+		calls = self.calls_by_instance.pop(class_instance, None)
+		if calls is not None:
+			for callback_objs in calls.itervalues():
+				for callback_obj in callback_objs:
+					self._invalidate(callback_obj)
 
 		# filter additional callbacks as well
 		self.additional_cur_tick_schedule = \
@@ -206,30 +271,15 @@ class Scheduler(LivingObject):
 		"""
 		assert callable(callback)
 		removed_calls = 0
-		for key in self.schedule:
-			callback_objects = self.schedule[key]
-			for i in xrange(len(callback_objects) - 1, -1, -1):
-				if (callback_objects[i].class_instance is instance
-				    and callback_objects[i].callback == callback
-				    and not hasattr(callback_objects[i], "invalid")):
-					del callback_objects[i]
-					removed_calls += 1
-
-		test = 0
-		if removed_calls > 0: # there also must be calls in the calls_by_instance dict
-			for i in xrange(len(self.calls_by_instance[instance]) - 1, -1, -1):
-				obj = self.calls_by_instance[instance][i]
-				if obj.callback == callback:
-					del self.calls_by_instance[instance][i]
-					test += 1
-			assert test == removed_calls, "%s, %s" % (test, removed_calls)
-			if not self.calls_by_instance[instance]:
-				del self.calls_by_instance[instance]
+		for callback_obj in self._get_indexed_calls(instance, callback)[:]:
+			self._unindex(callback_obj)
+			self._invalidate(callback_obj, finish=True)
+			removed_calls += 1
 
 		for i in xrange(len(self.additional_cur_tick_schedule) - 1, -1, -1):
 			if self.additional_cur_tick_schedule[i].class_instance is instance and \
 				self.additional_cur_tick_schedule[i].callback == callback:
-					del callback_objects[i]
+					del self.additional_cur_tick_schedule[i]
 					removed_calls += 1
 
 		return removed_calls
@@ -242,24 +292,24 @@ class Scheduler(LivingObject):
 		                 else only calls that execute callback.
 		@return: dict, entries: { CallbackObject: remaining_ticks_to_executing }
 		"""
-		calls = {}
-		if instance in self.calls_by_instance:
-			for callback_obj in self.calls_by_instance[instance]:
-				if  callback is None or callback_obj.callback == callback:
-					calls[callback_obj] = callback_obj.tick - self.cur_tick
-		return calls
+		if callback is None:
+			callback_objs = [obj for objs in self.calls_by_instance.get(instance, {}).itervalues()
+			                 for obj in objs]
+		else:
+			callback_objs = self._get_indexed_calls(instance, callback)
+		return dict((callback_obj, callback_obj.tick - self.cur_tick) for callback_obj in callback_objs)
 
 	def get_remaining_ticks(self, instance, callback, assert_present=True):
 		"""Returns in how many ticks a callback is executed. You must specify 1 single call.
 		@param *: just like get_classinst_calls
 		@param assert_present: assert that there must be sucha call
 		@return int or possbile None if not assert_present"""
-		calls = self.get_classinst_calls(instance, callback)
+		callback_objs = self._get_indexed_calls(instance, callback)
 		if assert_present:
-			assert len(calls) == 1, 'got %i calls for %s %s: %s' % (len(calls), instance, callback, [str(i) for i in calls])
-			return calls.itervalues().next()
-		else:
-			return calls.itervalues().next() if calls else None
+			assert len(callback_objs) == 1, 'got %i calls for %s %s: %s' % (len(callback_objs), instance, callback, [str(i) for i in callback_objs])
+		if not callback_objs:
+			return None
+		return callback_objs[0].tick - self.cur_tick
 
 	def get_ticks(self, seconds):
 		"""Call propagated to time instance"""
@@ -269,8 +319,15 @@ class Scheduler(LivingObject):
 		return self.timer.get_ticks(GAME.INGAME_TICK_INTERVAL)
 
 
+# key for callbacks in Scheduler.calls_by_instance that can't be hashed
+_UNHASHABLE_CALLBACKS = object()
+
+
 class _CallbackObject(object):
 	"""Class used by the TimerManager Class to organize callbacks."""
+	__slots__ = ('callback', 'finish_callback', 'run_in', 'loops', 'loop_interval',
+	             'class_instance', 'tick', 'invalid')
+
 	def __init__(self, scheduler, callback, class_instance, run_in, loops, loop_interval, finish_callback=None):
 		"""Creates the CallbackObject instance.
 		@param scheduler: reference to the scheduler, necessary to react properly on weak reference callbacks
@@ -289,6 +346,8 @@ class _CallbackObject(object):
 		self.loops = loops
 		self.loop_interval = loop_interval if loop_interval is not None else run_in
 		self.class_instance = class_instance
+		self.tick = None # set when scheduled
+		self.invalid = False # set when removed from the scheduler
 
 	def __str__(self):
 		cb = str(self.callback)
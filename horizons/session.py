@@ -43,14 +43,16 @@ from horizons.world import World
 from horizons.entities import Entities
 from horizons.util.living import LivingObject, livingProperty
 from horizons.util.savegameaccessor import SavegameAccessor
+from horizons.util.savegamewriterthread import SavegameWriterThread
 from horizons.util.worldobject import WorldObject
+from horizons.util.tickprofiler import TickProfiler
 from horizons.util.uhdbaccessor import read_savegame_template
 from horizons.component.namedcomponent import NamedComponent
 from horizons.component.selectablecomponent import SelectableBuildingComponent
 from horizons.savegamemanager import SavegameManager
 from horizons.scenario import ScenarioEventHandler
 from horizons.component.ambientsoundcomponent import AmbientSoundComponent
-from horizons.constants import GAME_SPEED
+from horizons.constants import GAME_SPEED, TICK_PROFILER
 from horizons.messaging import SettingChanged, MessageBus, SpeedChanged, LoadingProgress
 
 class Session(LivingObject):
@@ -88,6 +90,9 @@ class Session(LivingObject):
 
 	log = logging.getLogger('session')
 
+	# whether nothing is displayed (e.g. in tests), graphics-only work can be skipped then
+	headless = False
+
 	def __init__(self, db, rng_seed=None, ingame_gui_class=IngameGui):
 		super(Session, self).__init__()
 		assert isinstance(db, horizons.util.uhdbaccessor.UhDbAccessor)
@@ -104,6 +109,10 @@ class Session(LivingObject):
 		assert isinstance(self.random, Random)
 		self.timer = self.create_timer()
 		Scheduler.create_instance(self.timer)
+		self.tick_profiler = None
+		if TICK_PROFILER.ENABLED:
+			self.tick_profiler = TickProfiler(Scheduler(), TICK_PROFILER.NUM_TICKS, TICK_PROFILER.SLOW_TICK)
+			self.tick_profiler.start()
 		self.manager = self.create_manager()
 		self.view = View()
 		Entities.load(self.db)
@@ -117,6 +126,7 @@ class Session(LivingObject):
 		self.selection_groups = [set()] * 10
 
 		self._old_autosave_interval = None
+		self._savegame_writer = None # SavegameWriterThread of the last background save
 
 	def start(self):
 		"""Actually starts the game."""
@@ -170,6 +180,13 @@ class Session(LivingObject):
 
 		horizons.globals.fife.sound.end()
 
+		if self._savegame_writer is not None:
+			# let a background save finish, it has nothing to do with the game anymore.
+			# Its done-callback has been removed from the ExtScheduler above, so e.g.
+			# delete_dispensable_savegames isn't run for a save that was still being written.
+			self._savegame_writer.join()
+			self._savegame_writer = None
+
 		# these will call end() if the attribute still exists by the LivingObject magic
 		self.ingame_gui = None # keep this before world
 
@@ -182,6 +199,12 @@ class Session(LivingObject):
 		self.timer = None
 		self.scenario_eventhandler = None
 
+		if self.tick_profiler is not None:
+			self.tick_profiler.stop()
+			if TICK_PROFILER.OUTPUT:
+				self.tick_profiler.export_flamegraph(TICK_PROFILER.OUTPUT)
+			self.tick_profiler = None
+
 		Scheduler().end()
 		Scheduler.destroy_instance()
 
@@ -382,9 +405,12 @@ class Session(LivingObject):
 			else:
 				self.log.error('Unable to remove unknown object %s', instance)
 
-	def _do_save(self, savegame):
+	def _do_save(self, savegame, durable=True):
 		"""Actual save code.
-		@param savegame: absolute path"""
+		@param savegame: absolute path
+		@param durable: whether to wait until the savegame is safely on disk. Without it, the
+		                file may be corrupt if the system crashes while saving, which is
+		                acceptable for autosaves."""
 		assert os.path.isabs(savegame)
 		self.log.debug("Session: Saving to %s", savegame)
 		try:
@@ -411,20 +437,10 @@ class Session(LivingObject):
 			return self.save()
 
 		try:
-			read_savegame_template(db)
-
-			db("BEGIN")
-			self.world.save(db)
-			self.view.save(db)
-			self.ingame_gui.save(db)
-			self.scenario_eventhandler.save(db)
-
-			# Store RNG state
-			rng_state = json.dumps(self.random.getstate())
-			SavegameManager.write_metadata(db, self.savecounter, rng_state)
-
-			# Make sure everything gets written now
-			db("COMMIT")
+			if not durable:
+				db("PRAGMA synchronous = OFF")
+				db("PRAGMA journal_mode = MEMORY")
+			self._write_savegame(db)
 			db.close()
 			return True
 		except Exception:
@@ -434,3 +450,60 @@ class Session(LivingObject):
 			db.close()
 			os.unlink(savegame)
 			return False
+
+	def _do_background_save(self, savegame, callback):
+		"""Saves the game without waiting for the savegame to be written.
+
+		The game is saved into an in-memory database now, which is a consistent snapshot
+		since no tick is running. A SavegameWriterThread writes it to the file while the
+		game goes on. Only one background save can run at a time.
+		@param savegame: absolute path
+		@param callback: called with whether the savegame has been written, when it is done
+		@return: whether saving has been started"""
+		assert os.path.isabs(savegame)
+		if self._savegame_writer is not None and self._savegame_writer.is_alive():
+			self.log.warning("Session: Not saving to %s, the last save isn't written yet", savegame)
+			return False
+		self.log.debug("Session: Saving to %s in the background", savegame)
+		self.savecounter += 1
+
+		# the writer thread takes over the connection
+		snapshot = DbReader(':memory:', check_same_thread=False)
+		try:
+			self._write_savegame(snapshot)
+		except Exception:
+			self.log.error("Save Exception:")
+			traceback.print_exc()
+			snapshot.close()
+			return False
+
+		writer = self._savegame_writer = SavegameWriterThread(snapshot, savegame)
+		writer.start()
+
+		def check_writer():
+			if writer.is_alive():
+				ExtScheduler().add_new_object(check_writer, self, run_in=0.5)
+			else:
+				callback(writer.success)
+		check_writer()
+		return True
+
+	def _write_savegame(self, db):
+		"""Writes the game into the empty database *db*."""
+		read_savegame_template(db)
+
+		db("BEGIN")
+		# the rows are written table by table at the end, not one by one
+		db.start_batching_inserts()
+		self.world.save(db)
+		self.view.save(db)
+		self.ingame_gui.save(db)
+		self.scenario_eventhandler.save(db)
+
+		# Store RNG state
+		rng_state = json.dumps(self.random.getstate())
+		SavegameManager.write_metadata(db, self.savecounter, rng_state)
+		db.stop_batching_inserts()
+
+		# Make sure everything gets written now
+		db("COMMIT")
@@ -47,8 +47,15 @@ class SPSession(Session):
 	def autosave(self):
 		"""Called automatically in an interval"""
 		self.log.debug("Session: autosaving")
-		success = self._do_save(SavegameManager.create_autosave_filename())
+		savegame = SavegameManager.create_autosave_filename()
+		if SINGLEPLAYER.BACKGROUND_AUTOSAVE:
+			self._do_background_save(savegame, self._autosave_done)
+		else:
+			self._autosave_done(self._do_save(savegame, durable=False))
+
+	def _autosave_done(self, success):
 		if success:
+			# only now the new autosave is complete and the oldest can go
 			SavegameManager.delete_dispensable_savegames(autosaves=True)
 			self.ingame_gui.message_widget.add('AUTOSAVE')
 
@@ -20,6 +20,7 @@
 # ###################################################
 
 from horizons.util.python import decorators
+from horizons.util.spatialgrid import SpatialGrid
 
 
 class BuildingIndexer(object):
@@ -196,6 +197,116 @@ class BuildingIndex(object):
 		return len(self._list)
 
 
+class CompactBuildingIndexer(object):
+	"""
+	Answers the same queries as BuildingIndexer, but uses much less memory.
+
+	Instead of a BuildingIndex for every coordinate, the buildings are kept in a
+	SpatialGrid. The sorted list of the buildings in range of a coordinate is only
+	created when it is asked for and kept in a small cache until the buildings change.
+	The lists are sorted like the ones of BuildingIndex, so the random choices are the same.
+	"""
+
+	def __init__(self, radius, coords_list, random=None, buildings=None, cache_size=1024):
+		"""
+		Create a CompactBuildingIndexer
+		@param radius: int, maximum required radius of the buildings
+		@param coords_list: container of the coordinates of the area (e.g. a dict), only
+		                    used for membership tests, so it has to be fast at those
+		@param random: the rng of the session
+		@param buildings: initial list of buildings. Will only be read.
+		@param cache_size: maximum number of coordinates whose buildings are kept sorted
+		"""
+		self.radius = radius
+		self._coords_list = coords_list
+		self._random = random
+		self._grid = SpatialGrid()
+		self._cache = {} # { coords: [(distance squared, top, bottom, left, right, building)] }
+		self._cache_size = cache_size
+
+		if buildings:
+			for building in buildings:
+				self._grid.add(building)
+
+	def add(self, building):
+		self._grid.add(building)
+		self._cache.clear()
+
+	def remove(self, building):
+		self._grid.remove(building)
+		self._cache.clear()
+
+	def _get_list(self, coords):
+		"""Returns the sorted list of the buildings in range of coords, see BuildingIndex."""
+		try:
+			return self._cache[coords]
+		except KeyError:
+			pass
+		if len(self._cache) >= self._cache_size:
+			self._cache.clear()
+
+		x, y = coords
+		radius = self.radius
+		radius_squared = radius * radius
+		elements = []
+		for building in self._grid.get_in_box(x - radius, y - radius, x + radius, y + radius):
+			pos = building.position
+			left = pos.left
+			right = pos.right
+			top = pos.top
+			bottom = pos.bottom
+
+			x_diff = left - x
+			if x_diff < x - right:
+				x_diff = x - right
+			if x_diff < 0:
+				x_diff = 0
+
+			y_diff = top - y
+			if y_diff < y - bottom:
+				y_diff = y - bottom
+			if y_diff < 0:
+				y_diff = 0
+
+			distance_squared = x_diff * x_diff + y_diff * y_diff
+			if distance_squared <= radius_squared:
+				elements.append((distance_squared, top, bottom, left, right, building))
+		elements.sort()
+		self._cache[coords] = elements
+		return elements
+
+	def get_buildings_in_range(self, coords):
+		"""
+		Returns all buildings in range in the form of a Building generator
+		@param coords: tuple, the point around which to get the buildings
+		"""
+		if coords in self._coords_list:
+			return (element[5] for element in self._get_list(coords))
+		return []
+
+	def get_random_building_in_range(self, coords):
+		"""
+		Returns a random building in range or None if one doesn't exist
+		Don't use this for user interactions unless you want to break multiplayer
+		@param coords: tuple, the point around which to get the building
+		"""
+		if coords in self._coords_list:
+			elements = self._get_list(coords)
+			if elements:
+				return self._random.choice(elements)[5]
+		return None
+
+	def get_num_buildings_in_range(self, coords):
+		"""
+		Returns the number of buildings in range of the position
+		@param coords: tuple, the center point
+		"""
+		if coords in self._coords_list:
+			return len(self._get_list(coords))
+		return 0
+
+
 # apply make_constant to classes
 decorators.bind_all(BuildingIndexer)
 decorators.bind_all(BuildingIndex)
+decorators.bind_all(CompactBuildingIndexer)
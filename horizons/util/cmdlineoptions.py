@@ -27,7 +27,7 @@ import re
 
 def get_option_parser():
 	"""Returns inited OptionParser object"""
-	from horizons.constants import VERSION
+	from horizons.constants import PATHFINDING, VERSION
 	p = optparse.OptionParser(usage="%prog [options]", version=VERSION.string())
 	p.add_option("-d", "--debug", dest="debug", action="store_true",
 	             default=False, help="Enable debug output to stderr and a logfile.")
@@ -88,8 +88,14 @@ def get_option_parser():
 	             help="Writes log to <filename> instead of to the uh-userdir")
 	dev_group.add_option("--profile", dest="profile", action="store_true",
 	             default=False, help="Enable profiling (for developing only).")
+	dev_group.add_option("--profile-ticks", dest="profile_ticks", metavar="<filename>",
+	             help="Log slow ticks and write the time of the scheduled calls "
+	                  "as flame graph data to <filename> when the game ends.")
 	dev_group.add_option("--max-ticks", dest="max_ticks", metavar="<max_ticks>", type="int",
 	             help="Run the game for <max_ticks> ticks.")
+	dev_group.add_option("--pathfinding-engine", dest="pathfinding_engine", metavar="<engine>",
+	             type="choice", choices=PATHFINDING.ENGINES,
+	             help="Use this pathfinding implementation (Values: {0})".format(', '.join(PATHFINDING.ENGINES)))
 	dev_group.add_option("--no-freeze-protection", dest="freeze_protection", action="store_false",
 	             default=True, help="Disable freeze protection.")
 	dev_group.add_option("--string-previewer", dest="stringpreview", action="store_true",
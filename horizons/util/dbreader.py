@@ -26,16 +26,20 @@ from horizons.util.python import decorators
 
 class DbReader(object):
 	"""Class that handles connections to sqlite databases
-	@param file: str containing the database file."""
-	def __init__(self, dbfile):
+	@param file: str containing the database file.
+	@param check_same_thread: if False, the connection may be used by another thread
+	                          than the one that created it (one thread at a time)."""
+	def __init__(self, dbfile, check_same_thread=True):
 		self.db_path = dbfile
-		self.connection = sqlite3.connect(dbfile)
+		self.connection = sqlite3.connect(dbfile, check_same_thread=check_same_thread)
 		self.connection.isolation_level = None
 		def regexp(expr, item):
 			r = re.compile(expr)
 			return r.match(item) is not None
 		self.connection.create_function("regexp", 2, regexp)
 		self.cur = self.connection.cursor()
+		self._insert_batches = None # { table: [command, [args, ...]] } while batching inserts
+		self._insert_tables = {} # { INSERT command: table }
 
 	@decorators.make_constants()
 	def __call__(self, command, *args):
@@ -44,6 +48,11 @@ class DbReader(object):
 		@param args: tuple containing the values to add into the command.
 		"""
 		assert not command.endswith(";")
+		if self._insert_batches is not None:
+			if command.startswith('INSERT INTO '):
+				self._add_insert(command, args)
+				return []
+			self._flush_inserts()
 		command = '%s;' % command
 		self.cur.execute(command, args)
 		return self.cur.fetchall()
@@ -61,6 +70,38 @@ class DbReader(object):
 		@param parameters: sequence or iterator"""
 		return self.cur.executemany(command, parameters)
 
+	def start_batching_inserts(self):
+		"""Collects the rows of the following INSERT commands instead of executing each one.
+
+		The rows are written with one executemany per table and command when another kind of
+		command is executed (e.g. COMMIT) and in stop_batching_inserts. The rows of a table
+		are inserted in the same order as without batching, so implicit rowids don't change.
+		INSERT commands return an empty list as usual."""
+		assert self._insert_batches is None
+		self._insert_batches = {}
+
+	def stop_batching_inserts(self):
+		"""Writes the collected rows and executes INSERT commands right away again."""
+		self._flush_inserts()
+		self._insert_batches = None
+
+	def _add_insert(self, command, args):
+		table = self._insert_tables.get(command)
+		if table is None:
+			table = command[len('INSERT INTO '):].split(None, 1)[0].split('(', 1)[0]
+			self._insert_tables[command] = table
+		batch = self._insert_batches.get(table)
+		if batch is None or batch[0] != command:
+			if batch is not None:
+				self.execute_many(batch[0], batch[1])
+			batch = self._insert_batches[table] = [command, []]
+		batch[1].append(args)
+
+	def _flush_inserts(self):
+		for command, rows in self._insert_batches.itervalues():
+			self.execute_many(command, rows)
+		self._insert_batches.clear()
+
 	def execute_script(self, script):
 		"""Executes a multiline script.
 		@param script: multiline str containing an sql script."""
@@ -0,0 +1,157 @@
+# ###################################################
+# Copyright (C) 2008-2014 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+
+from heapq import heappush, heappop
+
+from horizons.util.python import decorators
+from horizons.util.pathfinding.pathfinding import FindPath
+from horizons.util.shapes import distances
+
+
+class GridFindPath(FindPath):
+	"""FindPath on a PathGrid instead of the path nodes dict.
+
+	The search state is kept in the flat arrays of the grid instead of dicts of tuples.
+	The algorithm is exactly the same as in FindPath, including the order in which nodes
+	are expanded (heap entries are compared by estimation, then x, then y), so both return
+	the same paths. The path_nodes dict has to be equivalent to the grid.
+	"""
+
+	def __init__(self, grid):
+		"""
+		@param grid: PathGrid that corresponds to the path_nodes passed on calling
+		"""
+		super(GridFindPath, self).__init__()
+		self.grid = grid
+
+	@decorators.make_constants()
+	def execute(self):
+		"""Executes algorithm"""
+		grid = self.grid
+		left = grid.left
+		top = grid.top
+		width = grid.width
+		height = grid.height
+
+		destination = self.destination
+		destination_to_tuple_distance_func = destination.get_distance_function((0, 0))
+
+		source_coords = self.source.get_coordinates()
+		dest_coords_set = set(destination.get_coordinates())
+		if not self.make_target_walkable:
+			dest_coords_set = set(coords for coords in dest_coords_set if coords in self.path_nodes)
+		if not dest_coords_set:
+			return None
+
+		if not self._grid_contains(source_coords) or not self._grid_contains(dest_coords_set):
+			# the grid can't represent this case, fall back to the dict based search
+			return FindPath.execute(self)
+
+		state = grid.get_search_state()
+		generation = state.next_generation()
+		seen = state.seen
+		passable = state.passable
+		blocked = state.blocked
+		distance = state.distance
+		previous = state.previous
+		cost = grid.cost
+
+		# source and destination nodes are walkable, even if they aren't path nodes
+		for coords in source_coords:
+			passable[(coords[1] - top) * width + (coords[0] - left)] = generation
+		dest_indices = set()
+		for coords in dest_coords_set:
+			index = (coords[1] - top) * width + (coords[0] - left)
+			passable[index] = generation
+			dest_indices.add(index)
+		for coords in self.blocked_coords:
+			index = grid.index(coords)
+			if index is not None:
+				blocked[index] = generation
+
+		heap = []
+		for coords in source_coords:
+			index = (coords[1] - top) * width + (coords[0] - left)
+			if seen[index] == generation:
+				continue # duplicate coords
+			seen[index] = generation
+			distance[index] = 0
+			previous[index] = -1
+			heappush(heap, (destination_to_tuple_distance_func(destination, coords), coords[0], coords[1]))
+
+		# the distance to a point is inlined below, it's by far the most common destination
+		to_point = destination_to_tuple_distance_func is distances.distance_point_tuple
+		if to_point:
+			dest_x = destination.x
+			dest_y = destination.y
+
+		if self.diagonal:
+			offsets = ((-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1))
+		else:
+			offsets = ((-1, 0), (1, 0), (0, -1), (0, 1))
+
+		while heap:
+			(_, x, y) = heappop(heap)
+			cur_index = (y - top) * width + (x - left)
+
+			if cur_index in dest_indices:
+				path = [ (x, y) ]
+				index = previous[cur_index]
+				while index != -1:
+					path.append( (index % width + left, index // width + top) )
+					index = previous[index]
+				path.reverse()
+				return path
+
+			cur_cost = cost[cur_index]
+			dist_to_here = distance[cur_index] + (cur_cost if cur_cost >= 0 else 0)
+
+			for (dx, dy) in offsets:
+				nx = x + dx
+				ny = y + dy
+				rel_x = nx - left
+				rel_y = ny - top
+				if not (0 <= rel_x < width and 0 <= rel_y < height):
+					continue
+				index = rel_y * width + rel_x
+				if seen[index] == generation or blocked[index] == generation:
+					continue
+				if cost[index] < 0 and passable[index] != generation:
+					continue
+				seen[index] = generation
+				distance[index] = dist_to_here
+				previous[index] = cur_index
+				if to_point:
+					# same as distances.distance_point_tuple
+					total_dist_estimation = ((dest_x - nx) ** 2 + (dest_y - ny) ** 2) ** 0.5 + dist_to_here
+				else:
+					total_dist_estimation = destination_to_tuple_distance_func(destination, (nx, ny)) + dist_to_here
+				heappush(heap, (total_dist_estimation, nx, ny))
+
+		return None
+
+	def _grid_contains(self, coords_list):
+		grid = self.grid
+		for coords in coords_list:
+			if grid.index(coords) is None:
+				return False
+		return True
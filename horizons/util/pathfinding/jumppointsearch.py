@@ -0,0 +1,267 @@
+# ###################################################
+# Copyright (C) 2008-2014 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+
+from heapq import heappush, heappop
+
+from horizons.util.pathfinding.pathfinding import FindPath
+from horizons.util.pathfinding.gridpathfinding import GridFindPath
+
+SQRT2 = 2 ** 0.5
+DIAGONAL_EXTRA = SQRT2 - 1
+
+ALL_DIRECTIONS = ((-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1))
+
+
+def _lowest_bit(mask):
+	"""Returns the position of the lowest set bit of mask != 0 (also for negative ones)."""
+	return (mask & -mask).bit_length() - 1
+
+
+class JumpPointSearch(GridFindPath):
+	"""Jump point search (Harabor, Grastien 2011) on a PathGrid with uniform costs.
+
+	On grids where every node costs the same, most paths of equal length are symmetric.
+	Instead of expanding every node, JPS only puts the points where the direction of
+	movement might have to change (jump points) onto the heap, which is a huge win on
+	open water. Straight lines are scanned at once using the bit masks of the PathGrid.
+
+	Only for diagonal movement; diagonal steps may pass blocked tiles, just like in FindPath.
+	The paths minimize the travel distance with sqrt(2) per diagonal step, which is what
+	units actually need for moving. They are returned step by step, like the ones of FindPath.
+
+	Internally, all coordinates are relative to the top left corner of the grid.
+	"""
+
+	def execute(self):
+		"""Executes algorithm"""
+		assert self.diagonal
+		grid = self.grid
+		left = grid.left
+		top = grid.top
+		width = grid.width
+
+		source_coords = self.source.get_coordinates()
+		dest_coords_set = set(self.destination.get_coordinates())
+		if not self.make_target_walkable:
+			dest_coords_set = set(coords for coords in dest_coords_set if coords in self.path_nodes)
+		if not dest_coords_set:
+			return None
+		if not self._grid_contains(source_coords) or not self._grid_contains(dest_coords_set):
+			# the grid can't represent this case, fall back to the dict based search
+			return FindPath.execute(self)
+
+		source_coords = [ (x - left, y - top) for (x, y) in source_coords ]
+		dest_coords_set = set( (x - left, y - top) for (x, y) in dest_coords_set )
+
+		# walkable bits of this search, padded with an empty line on each side,
+		# so rows[y + 1] is row y and columns[x + 1] is column x
+		rows = [0] + grid.rows + [0]
+		columns = [0] + grid.columns + [0]
+		for (x, y) in source_coords:
+			rows[y + 1] |= 1 << x
+			columns[x + 1] |= 1 << y
+		dest_rows = {}
+		dest_columns = {}
+		for (x, y) in dest_coords_set:
+			rows[y + 1] |= 1 << x
+			columns[x + 1] |= 1 << y
+			dest_rows[y] = dest_rows.get(y, 0) | 1 << x
+			dest_columns[x] = dest_columns.get(x, 0) | 1 << y
+		for coords in self.blocked_coords:
+			x = coords[0] - left
+			y = coords[1] - top
+			if 0 <= x < width and 0 <= y < grid.height:
+				rows[y + 1] &= ~(1 << x)
+				columns[x + 1] &= ~(1 << y)
+
+		def walkable(x, y):
+			return x >= 0 and (rows[y + 1] >> x) & 1
+
+		def jump_horizontally(x, y, dx):
+			"""Returns the x coordinate of the next jump point from (x, y) in direction dx or None."""
+			row = rows[y + 1]
+			above = rows[y]
+			below = rows[y + 2]
+			if dx > 0:
+				# a node is forced if the one next to it is blocked, but the one diagonally ahead isn't
+				candidates = (~above & (above >> 1)) | (~below & (below >> 1)) | dest_rows.get(y, 0)
+				obstacle = x + 1 + _lowest_bit(~row >> (x + 1))
+				candidates = (candidates >> (x + 1)) & ((1 << (obstacle - x - 1)) - 1)
+				if candidates:
+					return x + 1 + _lowest_bit(candidates)
+			else:
+				candidates = (~above & (above << 1)) | (~below & (below << 1)) | dest_rows.get(y, 0)
+				obstacle = (~row & ((1 << x) - 1)).bit_length() - 1 # -1 for the border
+				candidates = (candidates & ((1 << x) - 1)) >> (obstacle + 1)
+				if candidates:
+					return obstacle + candidates.bit_length()
+			return None
+
+		def jump_vertically(x, y, dy):
+			"""Returns the y coordinate of the next jump point from (x, y) in direction dy or None."""
+			column = columns[x + 1]
+			before = columns[x]
+			after = columns[x + 2]
+			if dy > 0:
+				candidates = (~before & (before >> 1)) | (~after & (after >> 1)) | dest_columns.get(x, 0)
+				obstacle = y + 1 + _lowest_bit(~column >> (y + 1))
+				candidates = (candidates >> (y + 1)) & ((1 << (obstacle - y - 1)) - 1)
+				if candidates:
+					return y + 1 + _lowest_bit(candidates)
+			else:
+				candidates = (~before & (before << 1)) | (~after & (after << 1)) | dest_columns.get(x, 0)
+				obstacle = (~column & ((1 << y) - 1)).bit_length() - 1
+				candidates = (candidates & ((1 << y) - 1)) >> (obstacle + 1)
+				if candidates:
+					return obstacle + candidates.bit_length()
+			return None
+
+		def jump(x, y, dx, dy):
+			"""Returns the next jump point (x, y) from (x, y) in direction (dx, dy) or None."""
+			if not dy:
+				jump_x = jump_horizontally(x, y, dx)
+				return None if jump_x is None else (jump_x, y)
+			if not dx:
+				jump_y = jump_vertically(x, y, dy)
+				return None if jump_y is None else (x, jump_y)
+			while True:
+				x += dx
+				y += dy
+				if not walkable(x, y):
+					return None
+				if (dest_rows.get(y, 0) >> x) & 1:
+					return (x, y)
+				if (walkable(x - dx, y + dy) and not walkable(x - dx, y)) or \
+				   (walkable(x + dx, y - dy) and not walkable(x, y - dy)):
+					return (x, y)
+				# moving diagonally, there might be jump points in the straight directions
+				if jump_horizontally(x, y, dx) is not None or jump_vertically(x, y, dy) is not None:
+					return (x, y)
+
+		# the octile distance to the bounding box of the destination is a tight lower bound
+		dest_left = min(x for (x, y) in dest_coords_set)
+		dest_right = max(x for (x, y) in dest_coords_set)
+		dest_top = min(y for (x, y) in dest_coords_set)
+		dest_bottom = max(y for (x, y) in dest_coords_set)
+
+		def estimate(x, y):
+			dx = max(dest_left - x, 0, x - dest_right)
+			dy = max(dest_top - y, 0, y - dest_bottom)
+			if dx < dy:
+				return dy + DIAGONAL_EXTRA * dx
+			return dx + DIAGONAL_EXTRA * dy
+
+		state = grid.get_search_state()
+		generation = state.next_generation()
+		seen = state.seen
+		distance = state.distance
+		previous = state.previous
+
+		heap = []
+		for (x, y) in source_coords:
+			index = y * width + x
+			if seen[index] == generation:
+				continue # duplicate coords
+			seen[index] = generation
+			distance[index] = 0.0
+			previous[index] = -1
+			heappush(heap, (estimate(x, y), 0.0, x, y))
+
+		while heap:
+			(_, dist_to_here, x, y) = heappop(heap)
+			cur_index = y * width + x
+			if dist_to_here > distance[cur_index]:
+				continue # outdated entry, the node has been reached on a shorter path later
+
+			if (x, y) in dest_coords_set:
+				return self._expand_path(cur_index)
+
+			# determine the directions that need to be searched, pruning the ones
+			# that can be reached at least as fast without passing this node
+			prev_index = previous[cur_index]
+			if prev_index == -1:
+				directions = ALL_DIRECTIONS
+			else:
+				px = prev_index % width
+				py = prev_index // width
+				dx = (x > px) - (x < px)
+				dy = (y > py) - (y < py)
+				directions = []
+				if dx and dy:
+					directions.append((0, dy))
+					directions.append((dx, 0))
+					directions.append((dx, dy))
+					if not walkable(x - dx, y):
+						directions.append((-dx, dy))
+					if not walkable(x, y - dy):
+						directions.append((dx, -dy))
+				elif dx:
+					directions.append((dx, 0))
+					if not walkable(x, y + 1):
+						directions.append((dx, 1))
+					if not walkable(x, y - 1):
+						directions.append((dx, -1))
+				else:
+					directions.append((0, dy))
+					if not walkable(x + 1, y):
+						directions.append((1, dy))
+					if not walkable(x - 1, y):
+						directions.append((-1, dy))
+
+			for (dx, dy) in directions:
+				jump_point = jump(x, y, dx, dy)
+				if jump_point is None:
+					continue
+				jx, jy = jump_point
+				index = jy * width + jx
+				steps = max(abs(jx - x), abs(jy - y))
+				new_dist = dist_to_here + (steps * SQRT2 if dx and dy else steps)
+				if seen[index] == generation and distance[index] <= new_dist:
+					continue
+				seen[index] = generation
+				distance[index] = new_dist
+				previous[index] = cur_index
+				heappush(heap, (new_dist + estimate(jx, jy), new_dist, jx, jy))
+
+		return None
+
+	def _expand_path(self, index):
+		"""Returns the path of single steps from the source to the node at index."""
+		grid = self.grid
+		previous = grid.get_search_state().previous
+		jump_points = []
+		while index != -1:
+			jump_points.append(grid.coords(index))
+			index = previous[index]
+		jump_points.reverse()
+
+		path = [ jump_points[0] ]
+		for (x, y) in jump_points[1:]:
+			# jump points are connected by straight or diagonal lines
+			cur_x, cur_y = path[-1]
+			dx = (x > cur_x) - (x < cur_x)
+			dy = (y > cur_y) - (y < cur_y)
+			while (cur_x, cur_y) != (x, y):
+				cur_x += dx
+				cur_y += dy
+				path.append( (cur_x, cur_y) )
+		return path
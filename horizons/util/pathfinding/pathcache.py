@@ -0,0 +1,77 @@
+# ###################################################
+# Copyright (C) 2008-2014 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+
+from collections import OrderedDict
+
+from horizons.constants import PATHFINDING
+from horizons.util.shapes import Point
+
+
+class PathCache(object):
+	"""Least recently used cache of search results on one set of path nodes.
+
+	The owner of the path nodes has to call clear whenever they change.
+	Failed searches (None) are cached as well, they are just as expensive.
+	The counters hits and misses show how well the cache works.
+	"""
+
+	def __init__(self, size=PATHFINDING.PATH_CACHE_SIZE):
+		self.size = size
+		self._paths = OrderedDict() # { key: path }, least recently used first
+		self.hits = 0
+		self.misses = 0
+
+	def get_path(self, source, destination, pather_type, find_path):
+		"""Returns the path from source to destination, calls find_path() if it isn't cached.
+		@param source, destination: anything supported by FindPath
+		@param pather_type: identifies the kind of search (e.g. the pather class), paths
+		                    are only shared between searches of the same type
+		@param find_path: callable without arguments doing the search
+		@return: list of tuples or None, like FindPath"""
+		key = (pather_type, self._get_shape_key(source), self._get_shape_key(destination))
+		try:
+			path = self._paths.pop(key)
+		except KeyError:
+			self.misses += 1
+			path = find_path()
+			if len(self._paths) >= self.size:
+				self._paths.popitem(last=False)
+		else:
+			self.hits += 1
+		self._paths[key] = path
+		# callers may modify their path, never hand out the cached one
+		return None if path is None else list(path)
+
+	@classmethod
+	def _get_shape_key(cls, shape):
+		# searches only depend on the coordinates of buildings, so equally placed ones share paths
+		if getattr(shape, 'is_building', False):
+			return shape.position
+		if isinstance(shape, Point):
+			return shape.to_tuple() # points can be changed, don't keep them
+		return shape
+
+	def clear(self):
+		self._paths.clear()
+
+	def __len__(self):
+		return len(self._paths)
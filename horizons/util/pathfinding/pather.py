@@ -27,6 +27,9 @@ from horizons.util.shapes import Point
 
 from horizons.util.pathfinding import PathBlockedError
 from horizons.util.pathfinding.pathfinding import FindPath
+from horizons.util.pathfinding.gridpathfinding import GridFindPath
+from horizons.util.pathfinding.jumppointsearch import JumpPointSearch
+from horizons.constants import PATHFINDING
 
 """
 In this file, you will find an interface to the pathfinding algorithm.
@@ -66,6 +69,24 @@ class AbstractPather(object):
 		Return value type must be supported by FindPath"""
 		raise NotImplementedError
 
+	def _get_path_grid(self):
+		"""Returns the PathGrid equivalent to the path nodes or None if there is none.
+		It is used instead of the path nodes dict, depending on PATHFINDING.ENGINE."""
+		return None
+
+	def _get_path_finder(self):
+		"""Returns the pathfinding algorithm instance to use for the next search."""
+		return get_path_finder(self._get_path_grid())
+
+	def _get_path_cache(self):
+		"""Returns the PathCache for searches of this pather or None if they aren't cached."""
+		return None
+
+	def _get_components(self):
+		"""Returns the ConnectedComponents of the path nodes or None if there are none.
+		They are used to skip searches that can't succeed."""
+		return None
+
 	def _get_blocked_coords(self):
 		"""Returns blocked coordinates
 		Return value type must be supported by FindPath"""
@@ -104,10 +125,19 @@ class AbstractPather(object):
 			source = self._get_position()
 
 		# call algorithm
-		# to use a different pathfinding code, just change the following line
-		path = FindPath()(source, destination, self._get_path_nodes(),
-		                  self._get_blocked_coords(), self.move_diagonal,
-		                  self.make_target_walkable)
+		def find_path():
+			return self._get_path_finder()(source, destination, self._get_path_nodes(),
+			                               self._get_blocked_coords(), self.move_diagonal,
+			                               self.make_target_walkable)
+		components = self._get_components()
+		path_cache = self._get_path_cache()
+		if components is not None and not components.is_reachable(source, destination,
+		                                                           self.make_target_walkable):
+			path = None
+		elif path_cache is not None:
+			path = path_cache.get_path(source, destination, self.__class__, find_path)
+		else:
+			path = find_path()
 
 		if path is None:
 			return False
@@ -217,6 +247,20 @@ class ShipPather(AbstractPather):
 	def _get_path_nodes(self):
 		return self.session.world.water
 
+	def _get_path_grid(self):
+		return self.session.world.water_grid
+
+	def _get_components(self):
+		return self.session.world.water_components
+
+	def _get_path_finder(self):
+		# open water is mostly uniform, where jump point search is a lot faster
+		grid = self._get_path_grid()
+		# independent of PATHFINDING.ENGINE, since its paths differ from the ones of A*
+		if grid is not None and PATHFINDING.JUMP_POINT_SEARCH and grid.has_uniform_cost():
+			return JumpPointSearch(grid)
+		return super(ShipPather, self)._get_path_finder()
+
 	def _get_blocked_coords(self):
 		return self.session.world.ship_map
 
@@ -226,6 +270,12 @@ class FisherShipPather(ShipPather):
 	def _get_path_nodes(self):
 		return self.session.world.water_and_coastline
 
+	def _get_path_grid(self):
+		return self.session.world.water_and_coastline_grid
+
+	def _get_components(self):
+		return self.session.world.shallow_water_components
+
 	def _get_blocked_coords(self):
 		# don't let fisher be blocked by other ships (#1023)
 		return []
@@ -241,6 +291,10 @@ class BuildingCollectorPather(AbstractPather):
 		from horizons.component.collectingcomponent import CollectingComponent
 		return self.unit.home_building.get_component(CollectingComponent).path_nodes.nodes
 
+	def _get_path_grid(self):
+		from horizons.component.collectingcomponent import CollectingComponent
+		return self.unit.home_building.get_component(CollectingComponent).path_nodes.nodes_grid
+
 
 class RoadPather(AbstractPather):
 	"""Pather for collectors, that depend on roads (e.g. the one used for the warehouse)"""
@@ -251,6 +305,15 @@ class RoadPather(AbstractPather):
 	def _get_path_nodes(self):
 		return self.island.path_nodes.road_nodes
 
+	def _get_path_grid(self):
+		return self.island.path_nodes.road_nodes_grid
+
+	def _get_path_cache(self):
+		return self.island.path_nodes.path_cache
+
+	def _get_components(self):
+		return self.island.path_nodes.road_components
+
 
 class SoldierPather(AbstractPather):
 	"""Pather for units, that move absolutely freely (such as soldiers)
@@ -264,6 +327,14 @@ class SoldierPather(AbstractPather):
 		island = self.session.world.get_island(self.unit.position)
 		return island.path_nodes.nodes
 
+	def _get_path_grid(self):
+		island = self.session.world.get_island(self.unit.position)
+		return island.path_nodes.nodes_grid
+
+	def _get_components(self):
+		island = self.session.world.get_island(self.unit.position)
+		return island.path_nodes.components
+
 	def _get_blocked_coords(self):
 		return self.session.world.ground_unit_map
 
@@ -291,7 +362,21 @@ class StaticPather(object):
 		@param island: island to search path on
 		@param source, destination: Point or anything supported by FindPath
 		@return: list of tuples or None in case no path is found"""
-		return FindPath()(source, destination, island.path_nodes.road_nodes)
+		path_nodes = island.path_nodes
+		if not path_nodes.road_components.is_reachable(source, destination):
+			return None
+		def find_path():
+			return get_path_finder(path_nodes.road_nodes_grid)(source, destination, path_nodes.road_nodes)
+		return path_nodes.path_cache.get_path(source, destination, cls, find_path)
+
+
+def get_path_finder(grid=None):
+	"""Returns the pathfinding algorithm configured by PATHFINDING.ENGINE.
+	@param grid: PathGrid equivalent to the path nodes the algorithm will be called with, if any
+	@return: FindPath instance"""
+	if grid is not None and PATHFINDING.ENGINE == 'grid':
+		return GridFindPath(grid)
+	return FindPath()
 
 
 decorators.bind_all(AbstractPather)
@@ -0,0 +1,193 @@
+# ###################################################
+# Copyright (C) 2008-2014 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+
+from array import array
+
+
+def iter_runs(mask):
+	"""Yields (start, end) for every run of consecutive set bits of a non-negative bit mask
+	in ascending order, end is exclusive."""
+	while mask:
+		lowest = mask & -mask
+		start = lowest.bit_length() - 1
+		filled = mask | (lowest - 1)
+		end = ((filled + 1) & ~filled).bit_length() - 1
+		yield (start, end)
+		mask &= ~((1 << end) - 1)
+
+
+class PathGrid(object):
+	"""Path nodes within a rectangle, stored in flat arrays.
+
+	This is the array counterpart to the path node dicts { (x, y): speed }, which
+	GridFindPath uses. The coordinates (x, y) of the rectangle are mapped to the index
+	(y - top) * width + (x - left). Owners of path node dicts keep the grid up to date
+	by calling add and remove along with changing the dict.
+
+	Additionally, the walkable nodes of each row and column are kept as bit masks
+	(bit x - left of rows[y - top] is set iff (x, y) is walkable), which allows
+	scanning whole lines at once (see JumpPointSearch).
+
+	The grid also holds the arrays for the state of a search on it, they are reused
+	for every search to avoid allocating them each time.
+	"""
+
+	NOT_WALKABLE = -1.0
+
+	def __init__(self, rect, nodes=None, rows=None):
+		"""
+		@param rect: Rect, no path node may be outside of it
+		@param nodes: optional dict { (x, y): speed } or iterable of (x, y) (speed 1.0) to fill in
+		@param rows: optional list of bit masks like self.rows of nodes with speed 1.0 to fill in,
+		             this is a lot faster than passing them as nodes
+		"""
+		self.left = rect.left
+		self.top = rect.top
+		self.width = rect.right - rect.left + 1
+		self.height = rect.bottom - rect.top + 1
+		self.cost = array('d', [self.NOT_WALKABLE]) * (self.width * self.height)
+		self.rows = [0] * self.height
+		self.columns = [0] * self.width
+		self.num_nodes = 0
+		self._num_nodes_by_cost = {} # { cost: number of nodes }, to know whether all costs are equal
+		self._search_state = None
+		if rows is not None:
+			self._add_rows(rows)
+		if nodes is not None:
+			if isinstance(nodes, dict):
+				for coords, speed in nodes.iteritems():
+					self.add(coords, speed)
+			else:
+				for coords in nodes:
+					self.add(coords)
+
+	def index(self, coords):
+		"""Returns the index of coords or None if they are outside of the grid."""
+		x = coords[0] - self.left
+		y = coords[1] - self.top
+		if 0 <= x < self.width and 0 <= y < self.height:
+			return y * self.width + x
+		return None
+
+	def coords(self, index):
+		"""Returns the coordinates tuple of index."""
+		return (index % self.width + self.left, index // self.width + self.top)
+
+	def add(self, coords, speed=1.0):
+		index = self.index(coords)
+		assert index is not None, "%s is outside of the grid" % (coords, )
+		if self.cost[index] == self.NOT_WALKABLE:
+			self.num_nodes += 1
+			x = coords[0] - self.left
+			y = coords[1] - self.top
+			self.rows[y] |= 1 << x
+			self.columns[x] |= 1 << y
+		else:
+			self._uncount_cost(self.cost[index])
+		self.cost[index] = speed
+		self._num_nodes_by_cost[speed] = self._num_nodes_by_cost.get(speed, 0) + 1
+
+	def _add_rows(self, rows):
+		"""Adds the nodes of the row bit masks with speed 1.0 to the still empty grid."""
+		assert len(rows) <= self.height
+		cost = self.cost
+		columns = self.columns
+		speed_run = array('d', [1.0])
+		added = 0
+		for y, mask in enumerate(rows):
+			if not mask:
+				continue
+			assert mask >> self.width == 0
+			self.rows[y] = mask
+			base = y * self.width
+			bit = 1 << y
+			for (start, end) in iter_runs(mask):
+				cost[base + start:base + end] = speed_run * (end - start)
+				for x in xrange(start, end):
+					columns[x] |= bit
+				added += end - start
+		self.num_nodes += added
+		if added:
+			self._num_nodes_by_cost[1.0] = added
+
+	def remove(self, coords):
+		index = self.index(coords)
+		if index is not None and self.cost[index] != self.NOT_WALKABLE:
+			self._uncount_cost(self.cost[index])
+			self.cost[index] = self.NOT_WALKABLE
+			self.num_nodes -= 1
+			x = coords[0] - self.left
+			y = coords[1] - self.top
+			self.rows[y] &= ~(1 << x)
+			self.columns[x] &= ~(1 << y)
+
+	def _uncount_cost(self, cost):
+		if self._num_nodes_by_cost[cost] == 1:
+			del self._num_nodes_by_cost[cost]
+		else:
+			self._num_nodes_by_cost[cost] -= 1
+
+	def has_uniform_cost(self):
+		"""Returns whether all nodes have the same cost."""
+		return len(self._num_nodes_by_cost) <= 1
+
+	def __contains__(self, coords):
+		index = self.index(coords)
+		return index is not None and self.cost[index] != self.NOT_WALKABLE
+
+	def get_search_state(self):
+		"""Returns the arrays a search can use, see GridFindPath.
+		@return: GridSearchState"""
+		if self._search_state is None:
+			self._search_state = GridSearchState(self.width * self.height)
+		return self._search_state
+
+
+class GridSearchState(object):
+	"""Per-node arrays for searches on a PathGrid.
+
+	To avoid clearing them before every search, the entries are only valid if the
+	corresponding stamp equals the generation of the current search.
+	"""
+
+	MAX_GENERATION = 2**31 - 1
+
+	def __init__(self, size):
+		self.size = size
+		self._reset()
+
+	def _reset(self):
+		size = self.size
+		self.generation = 0
+		self.seen = array('i', [0]) * size # == generation: node has been reached
+		self.passable = array('i', [0]) * size # == generation: walkable though no path node (source, target)
+		self.blocked = array('i', [0]) * size # == generation: node is blocked temporarily
+		self.distance = array('d', [0.0]) * size # distance from the source
+		self.previous = array('i', [-1]) * size # index of the previous node on the path
+
+	def next_generation(self):
+		"""Invalidates all entries, call before every search.
+		@return: int, the new generation"""
+		if self.generation == self.MAX_GENERATION:
+			self._reset()
+		self.generation += 1
+		return self.generation
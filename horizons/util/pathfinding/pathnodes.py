@@ -21,6 +21,11 @@
 
 import logging
 
+from horizons.util.pathfinding.pathcache import PathCache
+from horizons.util.pathfinding.pathgrid import PathGrid
+from horizons.util.pathfinding.reachability import IncrementalConnectedComponents
+from horizons.util.shapes import Rect
+
 class PathNodes(object):
 	"""
 	Abstract class; used to derive list of path nodes from, which is used for pathfinding.
@@ -40,6 +45,7 @@ class ConsumerBuildingPathNodes(PathNodes):
 	"""List of path nodes for a consumer, that is a building
 	Interface:
 	self.nodes: {(x, y): speed, ...} of the home_building, where the collectors can walk
+	self.nodes_grid: PathGrid of self.nodes
 	"""
 	def __init__(self, consumerbuilding):
 		super(ConsumerBuildingPathNodes, self).__init__()
@@ -48,6 +54,11 @@ class ConsumerBuildingPathNodes(PathNodes):
 		for coords in consumerbuilding.position.get_radius_coordinates(consumerbuilding.radius, include_self=False):
 			if coords in ground_map and not 'coastline' in ground_map[coords].classes:
 				self.nodes[coords] = self.NODE_DEFAULT_SPEED
+		position = consumerbuilding.position
+		radius = consumerbuilding.radius
+		self.nodes_grid = PathGrid(Rect.init_from_borders(position.left - radius, position.top - radius,
+		                                                  position.right + radius, position.bottom + radius),
+		                           self.nodes)
 
 
 class IslandPathNodes(PathNodes):
@@ -55,6 +66,10 @@ class IslandPathNodes(PathNodes):
 	Interface:
 	self.nodes: List of nodes on island, where the terrain allows to be walked on
 	self.road_nodes: dictionary of nodes, where a road is built on
+	self.nodes_grid, self.road_nodes_grid: PathGrids of the above, kept up to date with them
+	self.path_cache: PathCache for searches on the road nodes, cleared when the nodes change
+	self.components, self.road_components: IncrementalConnectedComponents of the nodes and road nodes
+	self.last_change_id: increased whenever self.nodes changes
 
 	(un)register_road has to be called for each coord, where a road is built on (destroyed)
 	reset_tile_walkablity has to be called when the terrain changes the walkability
@@ -74,16 +89,29 @@ class IslandPathNodes(PathNodes):
 			if self.is_walkable(coord):
 				self.nodes[coord] = self.NODE_DEFAULT_SPEED
 
+		self.nodes_grid = PathGrid(island.position, self.nodes)
+		self.components = IncrementalConnectedComponents(self.nodes, diagonal=True)
+		self.last_change_id = -1
+
 		# nodes where a real road is built on.
 		self.road_nodes = {}
+		self.road_nodes_grid = PathGrid(island.position)
+		self.road_components = IncrementalConnectedComponents([], diagonal=False)
+		self.path_cache = PathCache()
 
 	def register_road(self, road):
 		for i in road.position:
 			self.road_nodes[ (i.x, i.y) ] = self.NODE_DEFAULT_SPEED
+			self.road_nodes_grid.add( (i.x, i.y), self.NODE_DEFAULT_SPEED )
+			self.road_components.add( (i.x, i.y) )
+		self.path_cache.clear()
 
 	def unregister_road(self, road):
 		for i in road.position:
 			del self.road_nodes[ (i.x, i.y) ]
+			self.road_nodes_grid.remove( (i.x, i.y) )
+			self.road_components.remove( (i.x, i.y) )
+		self.path_cache.clear()
 
 	def is_road(self, x, y):
 		"""Return if there is a road on (x, y)"""
@@ -122,5 +150,13 @@ class IslandPathNodes(PathNodes):
 		in_list = (coord in self.nodes)
 		if not in_list and actually_walkable:
 			self.nodes[coord] = self.NODE_DEFAULT_SPEED
+			self.nodes_grid.add(coord, self.NODE_DEFAULT_SPEED)
+			self.components.add(coord)
+			self.path_cache.clear()
+			self.last_change_id += 1
 		if in_list and not actually_walkable:
 			del self.nodes[coord]
+			self.nodes_grid.remove(coord)
+			self.components.remove(coord)
+			self.path_cache.clear()
+			self.last_change_id += 1
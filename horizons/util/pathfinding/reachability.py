@@ -0,0 +1,131 @@
+# ###################################################
+# Copyright (C) 2008-2014 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+
+from horizons.world.buildability.connectedareacache import ConnectedAreaCache
+
+
+STRAIGHT_MOVES = [(-1, 0), (0, -1), (0, 1), (1, 0)]
+DIAGONAL_MOVES = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
+
+
+class ConnectedComponents(object):
+	"""Reachability oracle for searches on a set of path nodes.
+
+	Every path node is labeled with the id of its connected component. If no component
+	touching the source is also touching the destination, FindPath won't find a path
+	and doesn't need to be called. Blocked coordinates are not considered, so the other
+	way round isn't guaranteed.
+	"""
+
+	def __init__(self, area_numbers, diagonal):
+		"""
+		@param area_numbers: { (x, y): component id } for every path node
+		@param diagonal: whether the nodes are connected diagonally, like in FindPath
+		"""
+		self.area_numbers = area_numbers
+		self.moves = DIAGONAL_MOVES if diagonal else STRAIGHT_MOVES
+
+	def is_reachable(self, source, destination, make_target_walkable=True):
+		"""Returns False if FindPath certainly can't find a path.
+		@param source, destination: Rect, Point or building, as for FindPath
+		@param make_target_walkable: as for FindPath"""
+		if hasattr(source, 'position'):
+			source = source.position
+		if hasattr(destination, 'position'):
+			destination = destination.position
+		area_numbers = self.area_numbers
+		moves = self.moves
+
+		dest_coords_set = set(destination.get_coordinates())
+		if not make_target_walkable:
+			dest_coords_set = set(coords for coords in dest_coords_set if coords in area_numbers)
+
+		# the source and destination coords are walkable in a search, so
+		# the components next to them can be entered
+		source_areas = set()
+		for (x, y) in source.get_coordinates():
+			if (x, y) in dest_coords_set:
+				return True
+			if (x, y) in area_numbers:
+				source_areas.add(area_numbers[(x, y)])
+			for (dx, dy) in moves:
+				coords = (x + dx, y + dy)
+				if coords in dest_coords_set:
+					return True
+				if coords in area_numbers:
+					source_areas.add(area_numbers[coords])
+
+		for (x, y) in dest_coords_set:
+			if (x, y) in area_numbers:
+				if area_numbers[(x, y)] in source_areas:
+					return True
+			elif make_target_walkable:
+				for (dx, dy) in moves:
+					coords = (x + dx, y + dy)
+					if coords in area_numbers and area_numbers[coords] in source_areas:
+						return True
+		return False
+
+
+class IncrementalConnectedComponents(ConnectedComponents):
+	"""ConnectedComponents of path nodes that change.
+
+	The changes are collected and only applied to the underlying ConnectedAreaCache
+	on the next query, so e.g. building a house only relabels the affected area once.
+	"""
+
+	def __init__(self, coords_list, diagonal):
+		"""
+		@param coords_list: iterable of the current path nodes (x, y)
+		@param diagonal: see ConnectedComponents
+		"""
+		moves = DIAGONAL_MOVES if diagonal else STRAIGHT_MOVES
+		self._cache = ConnectedAreaCache(list(coords_list), moves)
+		super(IncrementalConnectedComponents, self).__init__(self._cache.area_numbers, diagonal)
+		self._added = set()
+		self._removed = set()
+
+	def add(self, coords):
+		"""Has to be called when coords become a path node."""
+		if coords in self._removed:
+			self._removed.discard(coords)
+		else:
+			self._added.add(coords)
+
+	def remove(self, coords):
+		"""Has to be called when coords aren't a path node anymore."""
+		if coords in self._added:
+			self._added.discard(coords)
+		else:
+			self._removed.add(coords)
+
+	def _update(self):
+		if self._removed:
+			self._cache.remove_area([coords for coords in self._removed if coords in self.area_numbers])
+			self._removed.clear()
+		if self._added:
+			self._cache.add_area([coords for coords in self._added if coords not in self.area_numbers])
+			self._added.clear()
+
+	def is_reachable(self, source, destination, make_target_walkable=True):
+		self._update()
+		return super(IncrementalConnectedComponents, self).is_reachable(source, destination, make_target_walkable)
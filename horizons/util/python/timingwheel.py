@@ -0,0 +1,129 @@
+# ###################################################
+# Copyright (C) 2008-2014 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+
+class TimingWheel(object):
+	"""Hierarchical timing wheel mapping integer ticks to lists of items.
+
+	Level 0 has one slot per tick for the ticks that share all but the lowest
+	LEVEL_0_BITS bits with the current tick. Each higher level covers LEVEL_BITS more bits.
+	Items for the far future are moved down level by level (cascaded) when the current
+	tick crosses the respective boundary. All items of one tick always reside in the
+	same slot, so the order in which they were added is preserved.
+
+	Adding an item and advancing by one tick are amortized O(1).
+	Single items can't be removed directly, callers mark them as invalid instead
+	and occasionally drop them all at once with remove_if.
+	"""
+
+	LEVEL_0_BITS = 8
+	LEVEL_BITS = 6
+	LEVELS = 5 # including level 0, covers 2**32 ticks
+
+	def __init__(self, cur_tick):
+		"""
+		@param cur_tick: the tick that is currently executed. Items can only be added for later ticks.
+		"""
+		self.cur_tick = cur_tick
+		# shifts[i] is the number of low bits ignored for the slot index on level i
+		self._shifts = [0] + [self.LEVEL_0_BITS + self.LEVEL_BITS * i for i in xrange(self.LEVELS - 1)]
+		self._overflow_shift = self.LEVEL_0_BITS + self.LEVEL_BITS * (self.LEVELS - 1)
+		self._levels = [ [ [] for i in xrange(1 << self.LEVEL_0_BITS) ] ]
+		for i in xrange(1, self.LEVELS):
+			self._levels.append( [ [] for j in xrange(1 << self.LEVEL_BITS) ] )
+		self._overflow = {} # { tick: [item] } for ticks beyond the range of the levels
+		self._len = 0
+
+	def __len__(self):
+		return self._len
+
+	def add(self, tick, item):
+		"""Adds item to be popped at tick. Items added for the same tick are returned in order."""
+		assert tick > self.cur_tick, "Can't add items for the current or past ticks"
+		self._insert(tick, (tick, item))
+		self._len += 1
+
+	def _insert(self, tick, entry):
+		cur_tick = self.cur_tick
+		shifts = self._shifts
+		for level in xrange(self.LEVELS - 1):
+			# tick belongs to this level if it only differs from cur_tick in the bits covered by it
+			if tick >> shifts[level + 1] == cur_tick >> shifts[level + 1]:
+				mask = len(self._levels[level]) - 1
+				self._levels[level][(tick >> shifts[level]) & mask].append(entry)
+				return
+		if tick >> self._overflow_shift == cur_tick >> self._overflow_shift:
+			mask = len(self._levels[-1]) - 1
+			self._levels[-1][(tick >> shifts[-1]) & mask].append(entry)
+		else:
+			self._overflow.setdefault(tick, []).append(entry)
+
+	def advance(self):
+		"""Moves on to the next tick and returns the list of items scheduled for it.
+		@return: list of items in the order they have been added"""
+		self.cur_tick += 1
+		cur_tick = self.cur_tick
+
+		# cascade higher levels from top to bottom, if their boundaries were crossed
+		if cur_tick & ((1 << self._overflow_shift) - 1) == 0 and self._overflow:
+			for tick in sorted(self._overflow):
+				if tick >> self._overflow_shift == cur_tick >> self._overflow_shift:
+					for entry in self._overflow.pop(tick):
+						self._insert(tick, entry)
+		for level in xrange(self.LEVELS - 1, 0, -1):
+			shift = self._shifts[level]
+			if cur_tick & ((1 << shift) - 1) == 0:
+				slots = self._levels[level]
+				idx = (cur_tick >> shift) & (len(slots) - 1)
+				entries = slots[idx]
+				if entries:
+					slots[idx] = []
+					for entry in entries:
+						self._insert(entry[0], entry)
+
+		slots = self._levels[0]
+		idx = cur_tick & (len(slots) - 1)
+		entries = slots[idx]
+		if not entries:
+			return []
+		slots[idx] = []
+		self._len -= len(entries)
+		return [ entry[1] for entry in entries ]
+
+	def remove_if(self, predicate):
+		"""Removes all items for which predicate returns True, keeping the order of the others.
+		@return: int, number of removed items"""
+		removed = 0
+		for slots in self._levels:
+			for idx, entries in enumerate(slots):
+				if entries:
+					kept = [ entry for entry in entries if not predicate(entry[1]) ]
+					removed += len(entries) - len(kept)
+					slots[idx] = kept
+		for tick, entries in self._overflow.items():
+			kept = [ entry for entry in entries if not predicate(entry[1]) ]
+			removed += len(entries) - len(kept)
+			if kept:
+				self._overflow[tick] = kept
+			else:
+				del self._overflow[tick]
+		self._len -= removed
+		return removed
@@ -24,9 +24,9 @@ import os
 import os.path
 import tempfile
 
-from collections import defaultdict, deque
+from collections import OrderedDict, defaultdict, deque
 
-from horizons.constants import MAP, PATHS
+from horizons.constants import MAP, PATHS, SAVEGAME
 from horizons.savegamemanager import SavegameManager
 from horizons.util.dbreader import DbReader
 from horizons.util.python import decorators
@@ -39,11 +39,66 @@ class MapFileNotFound(Exception):
 			msg = "Map file not found."
 		super(MapFileNotFound, self).__init__(msg)
 
+class _LazyRows(object):
+	"""Replaces the dict of preloaded rows of a table in lazy loading.
+
+	The value of a key is selected from the savegame when it is needed. Only the values of
+	the most recently used keys are kept.
+	"""
+
+	def __init__(self, db, query, convert, size):
+		"""
+		@param db: DbReader
+		@param query: select command with a ? for every part of the key
+		@param convert: function(rows) -> value, gets the result of the query and returns
+		                None if the key has no value
+		@param size: maximum number of values kept
+		"""
+		self._db = db
+		self._query = query
+		self._convert = convert
+		self._size = size
+		self._values = OrderedDict() # { key: value }, least recently used first
+
+	def __getitem__(self, key):
+		value = self._get(key)
+		if value is None:
+			raise KeyError(key)
+		return value
+
+	def get(self, key, default=None):
+		value = self._get(key)
+		return default if value is None else value
+
+	def _get(self, key):
+		try:
+			value = self._values.pop(key)
+		except KeyError:
+			args = key if isinstance(key, tuple) else (key, )
+			value = self._convert(self._db(self._query, *args))
+			if len(self._values) >= self._size:
+				self._values.popitem(last=False)
+		self._values[key] = value
+		return value
+
+
+def _first_row(rows):
+	return rows[0] if rows else None
+
+def _first_value(rows):
+	return rows[0][0] if rows else None
+
+def _all_rows(rows):
+	return rows or None
+
+
 class SavegameAccessor(DbReader):
 	"""
 	SavegameAccessor is the class used for loading saved games.
 
-	Frequent select queries are preloaded for faster access.
+	Frequent select queries are preloaded for faster access. With SAVEGAME.LAZY_LOADING,
+	the rows of an object are instead selected when it is loaded, using the indexes of
+	the savegame, which needs less memory for big savegames.
 	"""
 
 	def __init__(self, game_identifier, is_map, options=None):
@@ -112,7 +167,8 @@ class SavegameAccessor(DbReader):
 	
 		map_padding = self("SELECT value FROM map_properties WHERE name = 'padding'")
 		self.map_padding = int(map_padding[0][0]) if map_padding else MAP.PADDING
-	
+
+		self._lazy = SAVEGAME.LAZY_LOADING
 		self._load_building()
 		self._load_settlement()
 		self._load_concrete_object()
@@ -137,7 +193,13 @@ class SavegameAccessor(DbReader):
 		if hasattr(self, '_temp_path2'):
 			os.unlink(self._temp_path2)
 
+	def _lazy_rows(self, query, convert):
+		return _LazyRows(self, query, convert, SAVEGAME.LAZY_CACHE_SIZE)
+
 	def _load_building(self):
+		if self._lazy:
+			self._building = self._lazy_rows("SELECT x, y, location, rotation, level FROM building WHERE rowid = ?", _first_row)
+			return
 		self._building = {}
 		for row in self("SELECT rowid, x, y, location, rotation, level FROM building"):
 			self._building[int(row[0])] = row[1:]
@@ -151,6 +213,9 @@ class SavegameAccessor(DbReader):
 
 
 	def _load_settlement(self):
+		if self._lazy:
+			self._settlement = self._lazy_rows("SELECT owner, island FROM settlement WHERE rowid = ?", _first_row)
+			return
 		self._settlement = {}
 		for row in self("SELECT rowid, owner, island FROM settlement"):
 			self._settlement[int(row[0])] = row[1:]
@@ -164,6 +229,11 @@ class SavegameAccessor(DbReader):
 
 
 	def _load_concrete_object(self):
+		if self._lazy:
+			def convert(rows):
+				return (int(rows[0][0]), rows[0][1]) if rows else None
+			self._concrete_object = self._lazy_rows("SELECT action_runtime, action_set_id FROM concrete_object WHERE id = ?", convert)
+			return
 		self._concrete_object = {}
 		for row in self("SELECT id, action_runtime, action_set_id FROM concrete_object"):
 			self._concrete_object[int(row[0])] = int(row[1]), row[2]
@@ -173,6 +243,19 @@ class SavegameAccessor(DbReader):
 
 
 	def _load_production(self):
+		if self._lazy:
+			columns = "state, owner, prod_line_id, remaining_ticks, _pause_old_state, creation_tick"
+			self._productions_by_worldid = self._lazy_rows(
+				"SELECT " + columns + " FROM production WHERE rowid = ?", _first_row)
+			self._productions_by_id_and_owner = self._lazy_rows(
+				"SELECT " + columns + " FROM production WHERE prod_line_id = ? AND owner = ?", _first_row)
+			self._production_lines_by_owner = self._lazy_rows(
+				"SELECT prod_line_id FROM production WHERE owner = ? ORDER BY rowid",
+				lambda rows: [int(row[0]) for row in rows])
+			self._production_state_history = self._lazy_rows(
+				"SELECT tick, state FROM production_state_history WHERE object_id = ? AND production = ? ORDER BY tick",
+				deque)
+			return
 		self._productions_by_worldid = {}
 		self._production_lines_by_owner = {}
 		self._productions_by_id_and_owner = {}
@@ -183,10 +266,8 @@ class SavegameAccessor(DbReader):
 			self._productions_by_worldid[rowid] = data
 			owner = int(row[2])
 			line = int(row[3])
-			if not line in self._productions_by_id_and_owner:
-				self._productions_by_id_and_owner[line] = {}
-			# in the line dict, the owners are unique
-			self._productions_by_id_and_owner[line][owner] = data
+			# the owners of a line are unique
+			self._productions_by_id_and_owner[line, owner] = data
 
 			if owner not in self._production_lines_by_owner:
 				self._production_lines_by_owner[owner] = [line]
@@ -201,7 +282,7 @@ class SavegameAccessor(DbReader):
 
 	def get_production_by_id_and_owner(self, id, ownerid):
 		# owner means worldid of entity
-		return self._productions_by_id_and_owner[id][ownerid]
+		return self._productions_by_id_and_owner[id, ownerid]
 
 	def get_production_line_id(self, production_worldid):
 		"""Returns the prod_line_id of the given production"""
@@ -216,6 +297,9 @@ class SavegameAccessor(DbReader):
 
 
 	def _load_storage(self):
+		if self._lazy:
+			self._storage = self._lazy_rows("SELECT resource, amount FROM storage WHERE object = ? ORDER BY rowid", _all_rows)
+			return
 		self._storage = {}
 		for row in self("SELECT object, resource, amount FROM storage"):
 			ownerid = int(row[0])
@@ -230,6 +314,9 @@ class SavegameAccessor(DbReader):
 
 
 	def _load_wildanimal(self):
+		if self._lazy:
+			self._wildanimal = self._lazy_rows("SELECT health, can_reproduce FROM wildanimal WHERE rowid = ?", _first_row)
+			return
 		self._wildanimal = {}
 		for row in self("SELECT rowid, health, can_reproduce FROM wildanimal"):
 			self._wildanimal[int(row[0])] = row[1:]
@@ -240,6 +327,11 @@ class SavegameAccessor(DbReader):
 
 
 	def _load_unit(self):
+		if self._lazy:
+			def convert(rows):
+				return int(rows[0][0]) if rows else None
+			self._unit = self._lazy_rows("SELECT owner FROM unit WHERE rowid = ?", convert)
+			return
 		self._unit = {}
 		for row in self("SELECT rowid, owner FROM unit"):
 			self._unit[int(row[0])] = int(row[1])
@@ -249,6 +341,17 @@ class SavegameAccessor(DbReader):
 
 
 	def _load_building_collector(self):
+		if self._lazy:
+			def convert(rows):
+				if not rows:
+					return None
+				home_building, creation_tick = rows[0]
+				return (int(home_building) if home_building is not None else None, creation_tick)
+			self._building_collector = self._lazy_rows(
+				"SELECT home_building, creation_tick FROM building_collector WHERE rowid = ?", convert)
+			self._building_collector_job_history = self._lazy_rows(
+				"SELECT tick, utilisation FROM building_collector_job_history WHERE collector = ? ORDER BY tick", deque)
+			return
 		self._building_collector = {}
 		for row in self("SELECT rowid, home_building, creation_tick FROM building_collector"):
 			self._building_collector[int(row[0])] = (int(row[1]) if row[1] is not None else None, row[2])
@@ -266,6 +369,10 @@ class SavegameAccessor(DbReader):
 
 
 	def _load_production_line(self):
+		if self._lazy:
+			self._production_line = self._lazy_rows(
+				"SELECT type, res, amount FROM production_line WHERE for_worldid = ? ORDER BY rowid", _all_rows)
+			return
 		self._production_line = {}
 		for row in self("SELECT for_worldid, type, res, amount FROM production_line"):
 			id = int(row[0])
@@ -278,6 +385,9 @@ class SavegameAccessor(DbReader):
 
 
 	def _load_unit_path(self):
+		if self._lazy:
+			self._unit_path = self._lazy_rows("SELECT x, y FROM unit_path WHERE unit = ? ORDER BY rowid", _all_rows)
+			return
 		self._unit_path = {}
 		for row in self("SELECT unit, x, y FROM unit_path ORDER BY 'index'"):
 			id = int(row[0])
@@ -290,6 +400,11 @@ class SavegameAccessor(DbReader):
 
 
 	def _load_storage_global_limit(self):
+		if self._lazy:
+			def convert(rows):
+				return int(rows[0][0]) if rows else None
+			self._storage_global_limit = self._lazy_rows("SELECT value FROM storage_global_limit WHERE object = ?", convert)
+			return
 		self._storage_global_limit = {}
 		for row in self("SELECT object, value FROM storage_global_limit"):
 			self._storage_global_limit[(int(row[0]))] = int(row[1])
@@ -299,6 +414,9 @@ class SavegameAccessor(DbReader):
 
 
 	def _load_health(self):
+		if self._lazy:
+			self._health = self._lazy_rows("SELECT health FROM unit_health WHERE owner_id = ?", _first_value)
+			return
 		self._health = dict( self("SELECT owner_id, health FROM unit_health") )
 
 	def get_health(self, owner):
@@ -306,6 +424,11 @@ class SavegameAccessor(DbReader):
 
 
 	def _load_fish_data(self):
+		if self._lazy:
+			def convert(rows):
+				return int(rows[0][0]) if rows else None
+			self._fish_data = self._lazy_rows("SELECT last_usage_tick FROM fish_data WHERE rowid = ?", convert)
+			return
 		self._fish_data = {}
 		for row in self("SELECT rowid, last_usage_tick FROM fish_data"):
 			self._fish_data[int(row[0])] = int(row[1])
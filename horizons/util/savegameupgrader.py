@@ -396,6 +396,24 @@ class SavegameUpgrader(object):
 	def _upgrade_to_rev74(self, db):
 		db("INSERT INTO metadata VALUES (?, ?)", "selected_tab", None)
 
+	def _upgrade_to_rev75(self, db):
+		# add the indexes of the columns objects are looked up by
+		indexes = [
+			('storage', ('object', )),
+			('collector_job', ('collector', )),
+			('unit_path', ('unit', )),
+			('concrete_object', ('id', )),
+			('storage_global_limit', ('object', )),
+			('unit_health', ('owner_id', )),
+			('building_collector_job_history', ('collector', 'tick')),
+			('production', ('owner', 'prod_line_id')),
+			('production_line', ('for_worldid', )),
+			('production_state_history', ('object_id', 'production', 'tick')),
+		]
+		for table, columns in indexes:
+			db('CREATE INDEX "{0}_{1}" ON "{0}" ({2})'.format(
+			   table, columns[0], ', '.join('"{0}"'.format(column) for column in columns)))
+
 
 	def _upgrade(self):
 		# fix import loop
@@ -464,6 +482,8 @@ class SavegameUpgrader(object):
 				self._upgrade_to_rev73(db)
 			if rev < 74:
 				self._upgrade_to_rev74(db)
+			if rev < 75:
+				self._upgrade_to_rev75(db)
 
 			db('COMMIT')
 			db.close()
@@ -0,0 +1,82 @@
+# ###################################################
+# Copyright (C) 2008-2014 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import logging
+import os
+import threading
+import traceback
+
+from horizons.util.dbreader import DbReader
+from horizons.util.uhdbaccessor import read_savegame_template
+
+
+class SavegameWriterThread(threading.Thread):
+	"""Writes a game that has been saved into an in-memory database to the savegame file.
+
+	The snapshot is copied table by table into a temporary file next to the savegame,
+	which is renamed when everything is on disk. This way, there is never an incomplete
+	file with the name of the savegame. SQLite doesn't hold the GIL while copying, so the
+	game goes on meanwhile.
+	"""
+
+	log = logging.getLogger("util.savegamewriterthread")
+
+	def __init__(self, snapshot, savegame):
+		"""
+		@param snapshot: DbReader of an in-memory savegame, created with check_same_thread=False.
+		                 It must not be used anymore by anyone else, this thread closes it.
+		@param savegame: absolute path of the savegame file
+		"""
+		threading.Thread.__init__(self)
+		self.snapshot = snapshot
+		self.savegame = savegame
+		self.success = False # whether the savegame has been written, valid after run
+
+	def run(self):
+		tmp_savegame = self.savegame + '.part'
+		try:
+			if os.path.exists(tmp_savegame):
+				os.unlink(tmp_savegame)
+			db = DbReader(tmp_savegame)
+			read_savegame_template(db)
+			db.close()
+
+			snapshot = self.snapshot
+			snapshot("ATTACH DATABASE ? AS savegame", tmp_savegame)
+			snapshot("BEGIN")
+			for (table, ) in snapshot("SELECT name FROM sqlite_master WHERE type = 'table'"):
+				columns = ', '.join('"{0}"'.format(row[1]) for row in snapshot('PRAGMA table_info("{0}")'.format(table)))
+				# the rowids are the world ids of many objects
+				snapshot('INSERT INTO savegame."{0}"(rowid, {1}) SELECT rowid, {1} FROM main."{0}"'.format(table, columns))
+			snapshot("COMMIT")
+			snapshot("DETACH DATABASE savegame")
+
+			if os.path.exists(self.savegame):
+				os.unlink(self.savegame) # rename can't replace files on windows
+			os.rename(tmp_savegame, self.savegame)
+			self.success = True
+		except Exception:
+			self.log.error("Failed to write %s:", self.savegame)
+			traceback.print_exc()
+		finally:
+			self.snapshot.close() # also detaches the file
+			if not self.success and os.path.exists(tmp_savegame):
+				os.unlink(tmp_savegame)
@@ -0,0 +1,75 @@
+# ###################################################
+# Copyright (C) 2008-2014 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+
+
+class SpatialGrid(object):
+	"""Uniform grid of objects with a fixed rectangular position, e.g. buildings.
+
+	Every object is stored in the cell of the origin of its position, so looking up the
+	objects in an area only has to visit the cells around the area instead of all objects.
+	The objects must not move while they are in the grid.
+	"""
+
+	def __init__(self, cell_size=16):
+		self.cell_size = cell_size
+		self._cells = {} # { (x, y): [object] }, x and y are the cell coordinates
+		self._num_objects = 0
+		# size of the largest object, the lookup has to extend the area by it
+		self._max_width = 1
+		self._max_height = 1
+
+	def add(self, obj):
+		position = obj.position
+		cell = (position.left // self.cell_size, position.top // self.cell_size)
+		self._cells.setdefault(cell, []).append(obj)
+		self._num_objects += 1
+		self._max_width = max(self._max_width, position.right - position.left + 1)
+		self._max_height = max(self._max_height, position.bottom - position.top + 1)
+
+	def remove(self, obj):
+		position = obj.position
+		cell = (position.left // self.cell_size, position.top // self.cell_size)
+		objects = self._cells[cell]
+		objects.remove(obj)
+		if not objects:
+			del self._cells[cell]
+		self._num_objects -= 1
+
+	def __len__(self):
+		return self._num_objects
+
+	def get_in_box(self, left, top, right, bottom):
+		"""Yields all objects whose position intersects with the box.
+		The borders are inclusive like the ones of a Rect.
+		The objects are yielded ordered by cell and by the time they were added within a cell."""
+		size = self.cell_size
+		cells = self._cells
+		for y in xrange(int((top - self._max_height + 1) // size), int(bottom // size) + 1):
+			for x in xrange(int((left - self._max_width + 1) // size), int(right // size) + 1):
+				objects = cells.get((x, y))
+				if objects is None:
+					continue
+				for obj in objects:
+					position = obj.position
+					if position.left <= right and position.right >= left and \
+					   position.top <= bottom and position.bottom >= top:
+						yield obj
@@ -0,0 +1,145 @@
+# ###################################################
+# Copyright (C) 2008-2014 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+
+import logging
+import types
+from collections import deque
+from functools import partial
+
+from horizons.util.python.callback import Callback
+from horizons.util.python.weakmethod import WeakMethod
+
+
+def get_type_name(cls):
+	"""Returns a readable name of a class.
+	Types of buildings and units are created by IngameType, those are named after their base class."""
+	if 'class_package' in cls.__dict__:
+		return '{0}[{1}]'.format(cls.__bases__[0].__name__, cls.id)
+	return cls.__name__
+
+
+def get_callback_name(callback):
+	"""Returns the qualified name of the function that is called by a scheduled callback."""
+	while True:
+		if isinstance(callback, Callback):
+			callback = callback.callback
+		elif isinstance(callback, partial):
+			callback = callback.func
+		elif isinstance(callback, WeakMethod):
+			callback = callback.function
+		else:
+			break
+	if isinstance(callback, types.MethodType):
+		owner = callback.im_self if callback.im_self is not None else callback.im_class
+		if not isinstance(owner, type):
+			owner = owner.__class__
+		return '{0}.{1}'.format(get_type_name(owner), callback.__name__)
+	if isinstance(callback, types.FunctionType):
+		return '{0}.{1}'.format(callback.__module__, callback.__name__)
+	return get_type_name(callback.__class__)
+
+
+class TickProfiler(object):
+	"""Records the wall time of all calls the Scheduler executes.
+
+	For each of the last num_ticks ticks, the time is summed up per type of the
+	calls' class_instance and per callback. Ticks that take longer than slow_tick
+	seconds are logged with their most expensive callbacks, the recorded ticks
+	can be written as flame graph data with export_flamegraph().
+
+	Usage:
+		profiler = TickProfiler(Scheduler())
+		profiler.start()
+		...
+		profiler.stop()
+	"""
+	log = logging.getLogger("tickprofiler")
+
+	def __init__(self, scheduler, num_ticks=300, slow_tick=0.05):
+		"""
+		@param scheduler: the Scheduler to profile
+		@param num_ticks: number of ticks kept in the ring buffer
+		@param slow_tick: seconds; log ticks that take longer, None to disable logging
+		"""
+		self.scheduler = scheduler
+		self.slow_tick = slow_tick
+		self.ticks = deque(maxlen=num_ticks) # [ (tick, seconds, { (type, callback): seconds }) ]
+		self._cur_tick = None
+		self._cur_times = {}
+
+	def start(self):
+		assert self.scheduler.callback_listener is None, 'Scheduler already has a listener'
+		self.scheduler.callback_listener = self
+
+	def stop(self):
+		"""Stops recording, the recorded ticks are kept."""
+		if self.scheduler.callback_listener is self:
+			self.scheduler.callback_listener = None
+		self._finish_tick()
+
+	def __call__(self, callback_obj, seconds):
+		tick = self.scheduler.cur_tick
+		if tick != self._cur_tick:
+			self._finish_tick()
+			self._cur_tick = tick
+
+		key = (get_type_name(callback_obj.class_instance.__class__), get_callback_name(callback_obj.callback))
+		self._cur_times[key] = self._cur_times.get(key, 0.0) + seconds
+
+	def _finish_tick(self):
+		if not self._cur_times:
+			return
+		total = sum(self._cur_times.itervalues())
+		self.ticks.append((self._cur_tick, total, self._cur_times))
+		if self.slow_tick is not None and total > self.slow_tick:
+			slowest = sorted(self._cur_times.iteritems(), key=lambda item: item[1], reverse=True)[:3]
+			self.log.warning("Tick %s took %.1f ms: %s", self._cur_tick, total * 1000,
+			                 ', '.join('%s (%.1f ms)' % (name, secs * 1000) for (_, name), secs in slowest))
+		self._cur_times = {}
+
+	def get_times(self, by_type=False):
+		"""Sums up the time of the recorded ticks.
+		@param by_type: sum up per class_instance type instead of per callback
+		@return: list of (name, seconds), most expensive first"""
+		times = {}
+		for _tick, _total, tick_times in self.ticks:
+			for (type_name, name), seconds in tick_times.iteritems():
+				key = type_name if by_type else name
+				times[key] = times.get(key, 0.0) + seconds
+		return sorted(times.iteritems(), key=lambda item: item[1], reverse=True)
+
+	def get_slowest_ticks(self, count=10):
+		"""@return: list of (tick, seconds) of the slowest recorded ticks"""
+		return sorted(((tick, total) for tick, total, _ in self.ticks),
+		              key=lambda item: item[1], reverse=True)[:count]
+
+	def export_flamegraph(self, filename):
+		"""Writes the recorded ticks in the folded stack format of flamegraph.pl.
+		A line looks like 'tick;ClassInstanceType;Callback microseconds'."""
+		stacks = {}
+		for _tick, _total, tick_times in self.ticks:
+			for (type_name, name), seconds in tick_times.iteritems():
+				key = ('tick', type_name, name)
+				stacks[key] = stacks.get(key, 0.0) + seconds
+		with open(filename, 'w') as f:
+			for key, seconds in sorted(stacks.iteritems()):
+				f.write('{0} {1}\n'.format(';'.join(key), int(round(seconds * 1000000))))
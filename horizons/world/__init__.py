@@ -24,15 +24,16 @@ import logging
 import json
 import copy
 
-from collections import deque
 from functools import partial
 
 import horizons.globals
 from horizons.world.island import Island
 from horizons.world.player import HumanPlayer
 from horizons.scheduler import Scheduler
-from horizons.util.buildingindexer import BuildingIndexer
+from horizons.util.buildingindexer import CompactBuildingIndexer
 from horizons.util.color import Color
+from horizons.util.pathfinding.pathgrid import PathGrid
+from horizons.util.pathfinding.reachability import ConnectedComponents
 from horizons.util.python import decorators
 from horizons.util.shapes import Circle, Point, Rect
 from horizons.util.worldobject import WorldObject
@@ -43,7 +44,9 @@ from horizons.ai.aiplayer import AIPlayer
 from horizons.entities import Entities
 from horizons.world.buildingowner import BuildingOwner
 from horizons.world.diplomacy import Diplomacy
+from horizons.world.maplayers import MapLayers
 from horizons.world.units.weapon import Weapon
+from horizons.world.units.movementmanager import MovementManager
 from horizons.command.unit import CreateUnit
 from horizons.component.healthcomponent import HealthComponent
 from horizons.component.selectablecomponent import SelectableComponent
@@ -68,6 +71,8 @@ class World(BuildingOwner, WorldObject):
 	   * ground_map - a dictionary that binds tuples of coordinates with a reference to the tile:
 	                  { (x, y): tileref, ...}
 	                 This is important for pathfinding and quick tile fetching.
+	                 The water tiles of a 10x10 big tile share one instance unless they are
+	                 in own_water_tiles.
 	   * island_map - a dictionary that binds tuples of coordinates with a reference to the island
 	   * ships - a list of all the ships ingame - horizons.world.units.ship.Ship instances
 	   * ship_map - same as ground_map, but for ships
@@ -99,6 +104,7 @@ class World(BuildingOwner, WorldObject):
 		self.ground_units = []
 
 		self.islands = []
+		self.movement_manager = None
 
 		super(World, self).__init__(worldid=GAME.WORLD_WORLDID)
 
@@ -124,9 +130,14 @@ class World(BuildingOwner, WorldObject):
 		self.player = None
 		self.ground_map = None
 		self.fake_tile_map = None
+		self.own_water_tiles = None
 		self.full_map = None
 		self.island_map = None
 		self.water = None
+		self.water_grid = None
+		self.water_and_coastline_grid = None
+		self.water_components = None
+		self.shallow_water_components = None
 		self.ships = None
 		self.ship_map = None
 		self.fish_indexer = None
@@ -143,6 +154,10 @@ class World(BuildingOwner, WorldObject):
 		self.islands = None
 		self.diplomacy = None
 
+		if self.movement_manager is not None:
+			self.movement_manager.end()
+			self.movement_manager = None
+
 	def _init(self, savegame_db, force_player_id=None, disasters_enabled=True):
 		"""
 		@param savegame_db: Dbreader with loaded savegame database
@@ -162,6 +177,9 @@ class World(BuildingOwner, WorldObject):
 
 		self._load_players(savegame_db, force_player_id)
 
+		# moves all units, has to exist before the first unit is created
+		self.movement_manager = MovementManager(headless=self.session.headless)
+
 		# all static data
 		LoadingProgress.broadcast(self, 'world_load_map')
 		self.load_raw_map(savegame_db)
@@ -174,8 +192,11 @@ class World(BuildingOwner, WorldObject):
 
 		# use a dict because it's directly supported by the pathfinding algo
 		LoadingProgress.broadcast(self, 'world_init_water')
-		self.water = dict((tile, 1.0) for tile in self.ground_map)
-		self._init_water_bodies()
+		layers = MapLayers(self.min_x, self.min_y, self.max_x - self.min_x, self.max_y - self.min_y, self.islands)
+		self.water_body = layers.get_body_numbers(layers.water_rows)
+		self.water = dict.fromkeys(self.water_body, 1.0)
+		self.water_grid = PathGrid(self.map_dimensions, rows=layers.water_rows)
+		self.water_components = ConnectedComponents(self.water_body, diagonal=True)
 		self.sea_number = self.water_body[(self.min_x, self.min_y)]
 		for island in self.islands:
 			island.terrain_cache.create_sea_cache()
@@ -184,12 +205,10 @@ class World(BuildingOwner, WorldObject):
 		# NOTE: this is rather a temporary fix to make the fisher be able to move
 		# since there are tile between coastline and deep sea, all non-constructible tiles
 		# are added to this list as well, which will contain a few too many
-		self.water_and_coastline = copy.copy(self.water)
-		for island in self.islands:
-			for coord, tile in island.ground_map.iteritems():
-				if 'coastline' in tile.classes or 'constructible' not in tile.classes:
-					self.water_and_coastline[coord] = 1.0
-		self._init_shallow_water_bodies()
+		self.shallow_water_body = layers.get_body_numbers(layers.shallow_water_rows)
+		self.water_and_coastline = dict.fromkeys(self.shallow_water_body, 1.0)
+		self.water_and_coastline_grid = PathGrid(self.map_dimensions, rows=layers.shallow_water_rows)
+		self.shallow_water_components = ConnectedComponents(self.shallow_water_body, diagonal=True)
 		self.shallow_sea_number = self.shallow_water_body[(self.min_x, self.min_y)]
 
 		# create ship position list. entries: ship_map[(x, y)] = ship
@@ -290,31 +309,37 @@ class World(BuildingOwner, WorldObject):
 		if not preview:
 			default_grounds = Entities.grounds[self.properties.get('default_ground', '%d-straight' % GROUND.WATER[0])]
 
+		ground_map = self.ground_map
+		session = self.session
 		fake_tile_class = Entities.grounds['-1-special']
 		fake_tile_size = 10
 		for x in xrange(self.min_x-MAP.BORDER, self.max_x+MAP.BORDER, fake_tile_size):
+			# the part of the big tile's columns and rows that is inside of the map
+			x_range = xrange(max(x, self.min_x), min(x + fake_tile_size, self.max_x))
 			for y in xrange(self.min_y-MAP.BORDER, self.max_y+MAP.BORDER, fake_tile_size):
 				fake_tile_x = x - 1
 				fake_tile_y = y + fake_tile_size - 1
 				if not preview:
 					# we don't need no references, we don't need no mem control
-					default_grounds(self.session, fake_tile_x, fake_tile_y)
-				for x_offset in xrange(fake_tile_size):
-					if self.min_x <= x + x_offset < self.max_x:
-						for y_offset in xrange(fake_tile_size):
-							if self.min_y <= y + y_offset < self.max_y:
-								self.ground_map[(x+x_offset, y+y_offset)] = fake_tile_class(self.session, fake_tile_x, fake_tile_y)
-		self.fake_tile_map = copy.copy(self.ground_map)
+					default_grounds(session, fake_tile_x, fake_tile_y)
+				# all of the big tile's coordinates share one tile instance, see add_building
+				fake_tile = fake_tile_class(session, fake_tile_x, fake_tile_y)
+				y_range = xrange(max(y, self.min_y), min(y + fake_tile_size, self.max_y))
+				for tile_x in x_range:
+					for tile_y in y_range:
+						ground_map[(tile_x, tile_y)] = fake_tile
+		self.fake_tile_map = copy.copy(ground_map)
+		self.own_water_tiles = {}
 
 		# Remove parts that are occupied by islands, create the island map and the full map.
 		self.island_map = {}
-		self.full_map = copy.copy(self.ground_map)
+		self.full_map = copy.copy(ground_map)
 		for island in self.islands:
-			for coords in island.ground_map:
-				if coords in self.ground_map:
-					self.full_map[coords] = island.ground_map[coords]
-					del self.ground_map[coords]
-					self.island_map[coords] = island
+			island_coords = [coords for coords in island.ground_map if coords in ground_map]
+			for coords in island_coords:
+				del ground_map[coords]
+			self.full_map.update((coords, island.ground_map[coords]) for coords in island_coords)
+			self.island_map.update(dict.fromkeys(island_coords, island))
 
 
 	def _load_players(self, savegame_db, force_player_id):
@@ -361,44 +386,10 @@ class World(BuildingOwner, WorldObject):
 			self.log.warning('WARNING: Cannot autoselect a player because there '
 			                 'are no or multiple candidates.')
 
-	@classmethod
-	def _recognize_water_bodies(cls, map_dict):
-		"""This function runs the flood fill algorithm on the water to make it easy
-		to recognize different water bodies."""
-		moves = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
-
-		n = 0
-		for coords, num in map_dict.iteritems():
-			if num is not None:
-				continue
-
-			map_dict[coords] = n
-			queue = deque([coords])
-			while queue:
-				x, y = queue.popleft()
-				for dx, dy in moves:
-					coords2 = (x + dx, y + dy)
-					if coords2 in map_dict and map_dict[coords2] is None:
-						map_dict[coords2] = n
-						queue.append(coords2)
-			n += 1
-
-	def _init_water_bodies(self):
-		"""This function runs the flood fill algorithm on the water to make it easy
-		to recognize different water bodies."""
-		self.water_body = dict.fromkeys(self.water)
-		self._recognize_water_bodies(self.water_body)
-
-	def _init_shallow_water_bodies(self):
-		"""This function runs the flood fill algorithm on the water and the coast to
-		make it easy to recognise different water bodies for fishers."""
-		self.shallow_water_body = dict.fromkeys(self.water_and_coastline)
-		self._recognize_water_bodies(self.shallow_water_body)
-
 	def init_fish_indexer(self):
 		radius = Entities.buildings[ BUILDINGS.FISHER ].radius
 		buildings = self.provider_buildings.provider_by_resources[RES.FISH]
-		self.fish_indexer = BuildingIndexer(radius, self.full_map, buildings=buildings)
+		self.fish_indexer = CompactBuildingIndexer(radius, self.full_map, buildings=buildings)
 
 	def init_new_world(self, trader_enabled, pirate_enabled, natural_resource_multiplier):
 		"""
@@ -534,6 +525,31 @@ class World(BuildingOwner, WorldObject):
 			self.player = player
 		self.players.append(player)
 
+	def add_building(self, building, player, load=False):
+		# the tiles of the building are changed, so they can't be shared with other coordinates
+		for coords in building.position.tuple_iter():
+			self._get_own_water_tile(coords)
+		return super(World, self).add_building(building, player, load)
+
+	def _get_own_water_tile(self, coords):
+		"""Returns the water tile at coords after giving it a tile instance of its own.
+
+		The water tiles of a 10x10 big tile share one instance. The few water tiles whose
+		state is changed (e.g. by fish deposits) get their own instance when it's needed.
+		@return: tile or None if there is no water at coords"""
+		if coords in self.own_water_tiles:
+			return self.own_water_tiles[coords]
+		shared_tile = self.ground_map.get(coords)
+		if shared_tile is None:
+			return None
+		tile = shared_tile.__class__(self.session, shared_tile.x, shared_tile.y)
+		self.own_water_tiles[coords] = tile
+		self.ground_map[coords] = tile
+		self.fake_tile_map[coords] = tile
+		if self.full_map[coords] is shared_tile:
+			self.full_map[coords] = tile
+		return tile
+
 	def get_tile(self, point):
 		"""Returns the ground at x, y.
 		@param point: coords as Point
@@ -622,8 +638,9 @@ class World(BuildingOwner, WorldObject):
 		buildings = []
 		if position is not None and radius is not None:
 			circle = Circle(position, radius)
+			box = (position.x - radius, position.y - radius, position.x + radius, position.y + radius)
 			for island in self.islands:
-				for building in island.buildings:
+				for building in island.building_grid.get_in_box(*box):
 					if circle.contains(building.position.center):
 						buildings.append(building)
 			return buildings
@@ -19,53 +19,8 @@
 # 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
 # ###################################################
 
-from horizons.world.buildability.terraincache import TerrainBuildabilityCache
-
-class LazyBinaryBuildabilityCacheElement(object):
-	"""
-	Lazily computed cache element of a BinaryBuildabilityCache instance.
-
-	Instances of this class are used to make less frequently needed caches of the
-	BinaryBuildabilityCache class instances get computed lazily just when it is needed.
-	"""
-
-	def __init__(self, buildability_cache, width):
-		self._buildability_cache = buildability_cache
-		self._width = width
-		self._cache = None
-
-	def _init_size_cache(self):
-		if self._cache is not None:
-			return
-
-		r3x3 = self._buildability_cache.cache[(3, 3)]
-		offset = self._width - 3
-
-		usable = set()
-		for coords in r3x3:
-			x, y = coords
-			if (x + offset, y) in r3x3 and (x, y + offset) in r3x3 and (x + offset, y + offset) in r3x3:
-				usable.add(coords)
-
-		self._cache = usable
-		size = (self._width, self._width)
-		# Replace the reference to this instance with the actual cache
-		self._buildability_cache.cache[size] = usable
-
-	def __getattr__(self, name):
-		# required to make set methods such as set.intersect work
-		self._init_size_cache()
-		return getattr(self._cache, name)
-
-	def __contains__(self, key):
-		# required to make the syntax "coords in cache" work efficiently
-		self._init_size_cache()
-		return key in self._cache
-
-	def __iter__(self):
-		# required to make iteration work
-		self._init_size_cache()
-		return iter(self._cache)
+from horizons.world.buildability.rowmasks import (SizeCache, add_row_coords, discard_row_coords,
+                                                  get_fit_mask, get_x_offset)
 
 class BinaryBuildabilityCache(object):
 	"""
@@ -82,39 +37,63 @@ class BinaryBuildabilityCache(object):
 
 	All elements of instance.cache[(width, height)] can be iterated to get a complete list
 	of all such coordinates.
+
+	Internally the area is stored as one bitmask per row (see rowmasks). The set of a size
+	is computed from the bitmasks the first time it is accessed and after that it is kept
+	up to date by recomputing only the rows affected by a change, so any size is supported.
 	"""
 
 	def __init__(self, terrain_cache):
 		self.terrain_cache = terrain_cache
 		self.coords_set = set() # set((x, y), ...)
-		self._row2 = set()
+		self._x_offset = get_x_offset(terrain_cache.land_or_coast)
+		self._rows = {} # {y: bitmask of the area in row y, ...}
+		self._masks = {} # {(width, height): {y: bitmask of the origins in row y, ...}, ...}
 
-		self.cache = {} # {(width, height): set((x, y), ...), ...}
+		self.cache = SizeCache(self._create_size_cache) # {(width, height): set((x, y), ...), ...}
 		self.cache[(1, 1)] = self.coords_set
-		for size in TerrainBuildabilityCache.sizes:
-			if size != (1, 1):
-				self.cache[size] = set()
-				if size[0] != size[1]:
-					self.cache[(size[1], size[0])] = set()
-
-	def _reset_lazy_sets(self):
-		self.cache[(4, 4)] = LazyBinaryBuildabilityCacheElement(self, 4)
-		self.cache[(6, 6)] = LazyBinaryBuildabilityCacheElement(self, 6)
-
-	@classmethod
-	def _extend_set(cls, cur_set, prev_set, prev_set_additions, dx, dy):
-		base_set_additions = set()
-		for coords in prev_set_additions:
-			x, y = coords
-			prev_coords = (x - dx, y - dy)
-			if prev_coords in prev_set:
-				cur_set.add(prev_coords)
-				base_set_additions.add(prev_coords)
-			next_coords = (x + dx, y + dy)
-			if next_coords not in prev_set_additions and next_coords in prev_set:
-				cur_set.add(coords)
-				base_set_additions.add(coords)
-		return base_set_additions
+
+	def _create_size_cache(self, size):
+		width, height = size
+		rows = self._rows
+		x_offset = self._x_offset
+
+		masks = {}
+		coords_set = set()
+		for y in sorted(rows):
+			mask = get_fit_mask(rows, y, width, height)
+			if mask:
+				masks[y] = mask
+				add_row_coords(coords_set, mask, y, x_offset)
+
+		self._masks[size] = masks
+		return coords_set
+
+	def _update_size_caches(self, changed_rows):
+		"""Recompute the origins of every computed size in the rows affected by the changed rows."""
+		rows = self._rows
+		x_offset = self._x_offset
+
+		for size, masks in self._masks.iteritems():
+			width, height = size
+			coords_set = self.cache[size]
+
+			origin_rows = set()
+			for y in changed_rows:
+				origin_rows.update(xrange(y - height + 1, y + 1))
+
+			for y in origin_rows:
+				old_mask = masks.get(y, 0)
+				new_mask = get_fit_mask(rows, y, width, height)
+				if new_mask == old_mask:
+					continue
+
+				add_row_coords(coords_set, new_mask & ~old_mask, y, x_offset)
+				discard_row_coords(coords_set, old_mask & ~new_mask, y, x_offset)
+				if new_mask:
+					masks[y] = new_mask
+				else:
+					del masks[y]
 
 	def add_area(self, new_coords_list):
 		"""
@@ -126,57 +105,32 @@ class BinaryBuildabilityCache(object):
 		now completely part of the area. Similar the things are done for the larger sizes.
 		"""
 
+		rows = self._rows
+		x_offset = self._x_offset
+		changed_rows = set()
 		for coords in new_coords_list:
 			assert coords not in self.coords_set
 			assert coords in self.terrain_cache.land_or_coast
 			self.coords_set.add(coords)
-
-		coords_set = self.coords_set
-		new_coords_set = set(new_coords_list)
-
-		new_row2 = self._extend_set(self._row2, coords_set, new_coords_set, 1, 0)
-		new_r2x2 = self._extend_set(self.cache[(2, 2)], self._row2, new_row2, 0, 1)
-
-		new_r2x3 = self._extend_set(self.cache[(2, 3)], self.cache[(2, 2)], new_r2x2, 0, 1)
-		new_r2x4 = self._extend_set(self.cache[(2, 4)], self.cache[(2, 3)], new_r2x3, 0, 1)
-
-		new_r3x2 = self._extend_set(self.cache[(3, 2)], self.cache[(2, 2)], new_r2x2, 1, 0)
-		new_r4x2 = self._extend_set(self.cache[(4, 2)], self.cache[(3, 2)], new_r3x2, 1, 0)
-
-		self._extend_set(self.cache[(3, 3)], self.cache[(3, 2)], new_r3x2, 0, 1)
-		self._reset_lazy_sets()
-
-	@classmethod
-	def _reduce_set(cls, cur_set, prev_set_removals, dx, dy):
-		base_set_removals = set()
-		for coords in prev_set_removals:
 			x, y = coords
-			prev_coords = (x - dx, y - dy)
-			if prev_coords in cur_set:
-				cur_set.discard(prev_coords)
-				base_set_removals.add(prev_coords)
-			next_coords = (x + dx, y + dy)
-			if next_coords not in prev_set_removals and coords in cur_set:
-				cur_set.discard(coords)
-				base_set_removals.add(coords)
-		return base_set_removals
+			rows[y] = rows.get(y, 0) | (1 << (x - x_offset))
+			changed_rows.add(y)
+
+		self._update_size_caches(changed_rows)
 
 	def remove_area(self, removed_coords_list):
 		"""Remove a list of existing coordinates from the area."""
+		rows = self._rows
+		x_offset = self._x_offset
+		changed_rows = set()
 		for coords in removed_coords_list:
 			assert coords in self.coords_set
 			assert coords in self.terrain_cache.land_or_coast
 			self.coords_set.discard(coords)
-		removed_coords_set = set(removed_coords_list)
-
-		removed_row2 = self._reduce_set(self._row2, removed_coords_set, 1, 0)
-		removed_r2x2 = self._reduce_set(self.cache[(2, 2)], removed_row2, 0, 1)
-
-		removed_r2x3 = self._reduce_set(self.cache[(2, 3)], removed_r2x2, 0, 1)
-		removed_r2x4 = self._reduce_set(self.cache[(2, 4)], removed_r2x3, 0, 1)
-
-		removed_r3x2 = self._reduce_set(self.cache[(3, 2)], removed_r2x2, 1, 0)
-		removed_r4x2 = self._reduce_set(self.cache[(4, 2)], removed_r3x2, 1, 0)
+			x, y = coords
+			rows[y] &= ~(1 << (x - x_offset))
+			if not rows[y]:
+				del rows[y]
+			changed_rows.add(y)
 
-		self._reduce_set(self.cache[(3, 3)], removed_r3x2, 0, 1)
-		self._reset_lazy_sets()
+		self._update_size_caches(changed_rows)
@@ -37,10 +37,24 @@ class ConnectedAreaCache(object):
 
 	__moves = [(-1, 0), (0, -1), (0, 1), (1, 0)]
 
-	def __init__(self):
+	def __init__(self, coords_list=None, moves=None):
+		"""
+		@param coords_list: optional initial coordinates of the area
+		@param moves: optional list of (dx, dy) that connect coordinates, by default
+		              the horizontal and vertical ones
+		"""
 		self.area_numbers = {} # {(x, y): area id, ...}
 		self.areas = {} # {area id: set((x, y), ...), ...}
 		self._next_area_id = 1
+		if moves is not None:
+			self.__moves = moves
+		if coords_list:
+			# label everything at once, that is a lot faster than adding the coordinates one by one
+			for coords in coords_list:
+				self.area_numbers[coords] = 0 # not labeled yet
+			for coords in coords_list:
+				if self.area_numbers[coords] == 0:
+					self._label_area(coords)
 
 	def _label_area(self, seed_coords):
 		area_id = self._next_area_id
@@ -0,0 +1,98 @@
+# ###################################################
+# Copyright (C) 2008-2014 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+
+"""
+Helpers for representing an area on an island as one bitmask per row.
+
+Bit i of the mask of row y is set if and only if (x_offset + i, y) is part of the area.
+This makes it possible to answer "which rectangles of a given size fit entirely into the
+area" for a whole row with a few shifts and ANDs instead of checking every tile.
+"""
+
+def get_x_offset(coords_iterable):
+	"""Return the smallest x coordinate of the given coordinates (0 if there are none)."""
+	return min([x for (x, _) in coords_iterable] or [0])
+
+def get_row_masks(coords_iterable, x_offset):
+	"""Return {y: bitmask, ...} for the given coordinates."""
+	rows = {}
+	for (x, y) in coords_iterable:
+		rows[y] = rows.get(y, 0) | (1 << (x - x_offset))
+	return rows
+
+def get_fit_mask(rows, y, width, height):
+	"""Return the bitmask of the origins in row y where a width x height rectangle is entirely in the area."""
+	mask = rows.get(y, 0)
+	for dy in xrange(1, height):
+		if not mask:
+			return 0
+		mask &= rows.get(y + dy, 0)
+
+	result = mask
+	for dx in xrange(1, width):
+		result &= mask >> dx
+	return result
+
+def get_touch_mask(rows, y, width, height):
+	"""Return the bitmask of the origins in row y where a width x height rectangle contains part of the area."""
+	mask = 0
+	for dy in xrange(height):
+		mask |= rows.get(y + dy, 0)
+
+	result = mask
+	for dx in xrange(1, width):
+		result |= mask >> dx
+	return result
+
+def iter_bits(mask):
+	"""Yield the indices of the set bits of a non-negative bitmask in ascending order."""
+	while mask:
+		lowest = mask & -mask
+		yield lowest.bit_length() - 1
+		mask ^= lowest
+
+def add_row_coords(coords_set, mask, y, x_offset):
+	"""Add the coordinates of the set bits of the mask of row y to the set."""
+	for i in iter_bits(mask):
+		coords_set.add((x_offset + i, y))
+
+def discard_row_coords(coords_set, mask, y, x_offset):
+	"""Remove the coordinates of the set bits of the mask of row y from the set."""
+	for i in iter_bits(mask):
+		coords_set.discard((x_offset + i, y))
+
+class SizeCache(dict):
+	"""
+	A {(width, height): set((x, y), ...), ...} dict that computes missing sizes on demand.
+
+	The given function is called with the size when a size is accessed the first time and
+	its result is stored for later lookups.
+	"""
+
+	def __init__(self, create_function):
+		super(SizeCache, self).__init__()
+		self._create_function = create_function
+
+	def __missing__(self, size):
+		coords_set = self._create_function(size)
+		self[size] = coords_set
+		return coords_set
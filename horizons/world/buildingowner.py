@@ -22,6 +22,7 @@
 from horizons.world.providerhandler import ProviderHandler
 from horizons.util.python import decorators
 from horizons.util.shapes import Point, RadiusRect
+from horizons.util.spatialgrid import SpatialGrid
 
 """
 Simple building management functionality.
@@ -36,6 +37,7 @@ class BuildingOwner(object):
 		super(BuildingOwner, self).__init__(*args, **kwargs)
 		self.provider_buildings = ProviderHandler()
 		self.buildings = []
+		self.building_grid = SpatialGrid() # self.buildings by position
 
 	def add_building(self, building, player, load=False):
 		"""Adds a building to the island at the position x, y with player as the owner.
@@ -47,6 +49,7 @@ class BuildingOwner(object):
 			tile.blocked = True # Set tile blocked
 			tile.object = building # Set tile's object to the building
 		self.buildings.append(building)
+		self.building_grid.add(building)
 		building.init()
 		return building
 
@@ -61,6 +64,7 @@ class BuildingOwner(object):
 
 		# Remove this building from the buildings list
 		self.buildings.remove(building)
+		self.building_grid.remove(building)
 		assert building not in self.buildings
 
 	def get_settlements(self, rect, player=None):
@@ -104,26 +108,30 @@ class BuildingOwner(object):
 		raise NotImplementedError
 
 	@decorators.make_constants()
-	def get_providers_in_range(self, radiusrect, res=None, reslist=None, player=None):
+	def get_providers_in_range(self, radiusrect, res=None, reslist=None, player=None, stocked_only=False):
 		"""Returns all instances of provider within the specified shape.
 		NOTE: Specifing the res parameter is usually a huge speed gain.
 		@param radiusrect: instance of RadiusShape
 		@param res: optional; only return providers that provide res.  conflicts with reslist
 		@param reslist: optionally; list of res to search providers for. conflicts with res
 		@param player: Player instance, only buildings belonging to this player
-		@return: list of providers"""
+		@param stocked_only: only return providers that have res (or one of reslist) in stock.
+		                     Providers using the settlement inventory are always returned.
+		@return: iterable of providers that can only be iterated once. With res or reslist,
+		         they are ordered by resource, owner, map cell and the order they were added in."""
 		assert not (bool(res) and bool(reslist))
+		assert not stocked_only or res is not None or reslist
 		assert isinstance(radiusrect, RadiusRect)
-		# find out relevant providers
-		if res is not None:
-			provider_list = self.provider_buildings.provider_by_resources[res]
-		elif reslist:
-			provider_list = set()
-			for _res in reslist:
-				provider_list = provider_list.union(self.provider_buildings.provider_by_resources[_res])
-		else:
-			# worst case: search all provider buildings
-			provider_list = self.provider_buildings
+		if res is not None or reslist:
+			# only the parts of the map around the shape are searched
+			return self.provider_buildings.get_providers_in_range(radiusrect, [res] if res is not None else reslist,
+			                                                      player=player, stocked_only=stocked_only)
+		return self._get_all_providers_in_range(radiusrect, player)
+
+	@decorators.make_constants()
+	def _get_all_providers_in_range(self, radiusrect, player):
+		# worst case: search all provider buildings
+		provider_list = self.provider_buildings
 		# filter out those that aren't in range
 		r2 = radiusrect.center
 		radius_squared = radiusrect.radius ** 2
@@ -149,3 +157,4 @@ class BuildingOwner(object):
 				self.buildings[-1].remove()
 		self.provider_buildings = None
 		self.buildings = None
+		self.building_grid = None
@@ -26,7 +26,7 @@ from collections import defaultdict
 from horizons.entities import Entities
 from horizons.scheduler import Scheduler
 
-from horizons.util.buildingindexer import BuildingIndexer
+from horizons.util.buildingindexer import CompactBuildingIndexer
 from horizons.util.pathfinding.pathnodes import IslandPathNodes
 from horizons.util.shapes import Circle, Rect
 from horizons.util.worldobject import WorldObject
@@ -91,7 +91,8 @@ class Island(BuildingOwner, WorldObject):
 			# Create building indexers.
 			from horizons.world.units.animal import WildAnimal
 			self.building_indexers = {}
-			self.building_indexers[BUILDINGS.TREE] = BuildingIndexer(WildAnimal.walking_range, self, self.session.random)
+			self.building_indexers[BUILDINGS.TREE] = CompactBuildingIndexer(WildAnimal.walking_range, self.ground_map,
+			                                                                self.session.random)
 
 		# Load settlements.
 		for (settlement_id,) in db("SELECT rowid FROM settlement WHERE island = ?", island_id):
@@ -130,9 +131,14 @@ class Island(BuildingOwner, WorldObject):
 		p_x, p_y, width, height = db("SELECT MIN(x), MIN(y), (1 + MAX(x) - MIN(x)), (1 + MAX(y) - MIN(y)) FROM ground WHERE island_id = ?", island_id - 1001)[0]
 
 		self.ground_map = {}
+		ground_classes = {} # { (ground_id, action_id): ground class }, to look each up once
 		for (x, y, ground_id, action_id, rotation) in db("SELECT x, y, ground_id, action_id, rotation FROM ground WHERE island_id = ?", island_id - 1001): # Load grounds
 			if not preview: # actual game, need actual tiles
-				ground = Entities.grounds[str('%d-%s' % (ground_id, action_id))](self.session, x, y)
+				ground_class = ground_classes.get((ground_id, action_id))
+				if ground_class is None:
+					ground_class = Entities.grounds[str('%d-%s' % (ground_id, action_id))]
+					ground_classes[(ground_id, action_id)] = ground_class
+				ground = ground_class(self.session, x, y)
 				ground.act(rotation)
 			else:
 				ground = MapPreviewTile(x, y, ground_id)
@@ -152,11 +158,7 @@ class Island(BuildingOwner, WorldObject):
 		self.num_trees = 0
 
 		# define the rectangle with the smallest area that contains every island tile its position
-		min_x = min(zip(*self.ground_map.keys())[0])
-		max_x = max(zip(*self.ground_map.keys())[0])
-		min_y = min(zip(*self.ground_map.keys())[1])
-		max_y = max(zip(*self.ground_map.keys())[1])
-		self.position = Rect.init_from_borders(min_x, min_y, max_x, max_y)
+		self.position = Rect.init_from_topleft_and_size(p_x, p_y, width, height)
 
 		if not preview:
 			# This isn't needed for map previews, but it is in actual games.
@@ -266,6 +268,7 @@ class Island(BuildingOwner, WorldObject):
 
 			building.settlement = settlement
 			building.owner = settlement.owner
+			self.provider_buildings.update_owner(building)
 			settlement.add_building(building)
 
 		if not settlement_coords_changed:
@@ -311,6 +314,7 @@ class Island(BuildingOwner, WorldObject):
 			if building is not None:
 				settlement.remove_building(building)
 				building.owner = None
+				self.provider_buildings.update_owner(building)
 				building.settlement = None
 			if coords in land_or_coast:
 				clean_coords.add(coords)
@@ -0,0 +1,112 @@
+# ###################################################
+# Copyright (C) 2008-2014 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+
+from horizons.util.pathfinding.pathgrid import iter_runs
+
+
+def label_rows(rows):
+	"""Finds the connected components of nodes given as bit masks per row.
+
+	Nodes are connected diagonally too. Instead of flood filling node by node, every run
+	of consecutive nodes in a row is joined with the runs of the previous row that touch
+	it, using a union-find structure.
+	@param rows: list of bit masks, bit x of rows[y] is set iff (x, y) is a node
+	@return: list of (y, start, end, label) for every run (end is exclusive). The labels
+	         are numbered in the order in which the components first appear row by row.
+	"""
+	parent = [] # union-find parent of every run
+
+	def find(run):
+		while parent[run] != run:
+			parent[run] = parent[parent[run]]
+			run = parent[run]
+		return run
+
+	runs = [] # [(y, start, end), ...], the index is the id of the run
+	prev_runs = [] # [(start, end, id), ...] of the previous row
+	for y, mask in enumerate(rows):
+		cur_runs = []
+		i = 0
+		for (start, end) in iter_runs(mask):
+			run = len(runs)
+			runs.append((y, start, end))
+			parent.append(run)
+			# a run of the previous row touches this one if it covers start - 1 ... end
+			while i < len(prev_runs) and prev_runs[i][1] < start:
+				i += 1
+			j = i
+			while j < len(prev_runs) and prev_runs[j][0] <= end:
+				parent[find(prev_runs[j][2])] = find(run)
+				j += 1
+			cur_runs.append((start, end, run))
+		prev_runs = cur_runs
+
+	labels = {} # { root run: label }
+	result = []
+	for run, (y, start, end) in enumerate(runs):
+		label = labels.setdefault(find(run), len(labels))
+		result.append((y, start, end, label))
+	return result
+
+
+class MapLayers(object):
+	"""Where the water of the world is, stored as bit masks per row.
+
+	Bit x - left of water_rows[y - top] is set iff (x, y) is water, like in PathGrid.rows.
+	shallow_water_rows additionally contains the tiles of the islands that aren't
+	constructible or are coastline, so it describes the water and coastline ships can
+	use. The path node dicts, their PathGrids and the water bodies are built from these
+	run by run instead of tile by tile.
+	"""
+
+	def __init__(self, left, top, width, height, islands):
+		"""
+		@param left, top, width, height: the rectangle of the world that is filled with water
+		@param islands: list of Island
+		"""
+		self.left = left
+		self.top = top
+
+		island_rows = [0] * height
+		shallow_rows = [0] * height
+		for island in islands:
+			for (x, y), tile in island.ground_map.iteritems():
+				bit = 1 << (x - left)
+				island_rows[y - top] |= bit
+				if 'coastline' in tile.classes or 'constructible' not in tile.classes:
+					shallow_rows[y - top] |= bit
+
+		full_row = (1 << width) - 1
+		self.water_rows = [full_row & ~mask for mask in island_rows]
+		self.shallow_water_rows = [water | shallow for (water, shallow) in zip(self.water_rows, shallow_rows)]
+
+	def get_body_numbers(self, rows):
+		"""Returns { (x, y): number of its water body } for the nodes of rows.
+		@param rows: water_rows or shallow_water_rows"""
+		left = self.left
+		top = self.top
+		body_numbers = {}
+		for (y, start, end, label) in label_rows(rows):
+			y += top
+			for x in xrange(start + left, end + left):
+				body_numbers[(x, y)] = label
+		return body_numbers
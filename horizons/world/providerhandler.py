@@ -22,28 +22,112 @@
 
 from collections import defaultdict
 
+from horizons.component.storagecomponent import StorageComponent
+from horizons.util.python.callback import Callback
+from horizons.util.spatialgrid import SpatialGrid
+
 class ProviderHandler(list):
 	"""Class to keep track of providers of an area, especially an island.
 	It acts as a data structure for quick retrieval of special properties, that only resource
 	providers have.
 
-	Precondition: Provider never change their provided resources."""
+	Besides the providers of each resource, it knows which of them have some of the resource
+	in stock, so collectors don't have to look at empty providers. This is kept up to date
+	by listening to the providers' inventories.
+
+	For range queries, the providers of each resource and owner are kept in a SpatialGrid.
+
+	Precondition: Provider never change their provided resources.
+	If the owner of a provider changes, update_owner() has to be called."""
 
 	def __init__(self):
 		super(ProviderHandler, self).__init__()
 		self.provider_by_resources = defaultdict(list)
+		self.stocked_provider_by_resources = defaultdict(set)
+		self._grids = {} # { (res, owner): SpatialGrid }
+		self._grid_owners = {} # { provider: owner it is indexed with }
+		self._owners_by_resources = defaultdict(list) # owners in the order of their first provider
 
 	def append(self, provider):
 		# NOTE: appended elements need to be removed, else there will be a memory leak
 		for res in provider.provided_resources:
 			self.provider_by_resources[res].append(provider)
+		self._add_to_grids(provider)
 		super(ProviderHandler, self).append(provider)
+		if not provider.provided_resources:
+			return
+		storage = provider.get_component(StorageComponent)
+		if storage.has_own_inventory:
+			storage.inventory.add_change_listener(Callback(self._update_stock, provider))
+			self._update_stock(provider)
+		else:
+			# the settlement inventory changes all the time, such providers count as always stocked
+			for res in provider.provided_resources:
+				self.stocked_provider_by_resources[res].add(provider)
 
 	def remove(self, provider):
 		for res in provider.provided_resources:
 			self.provider_by_resources[res].remove(provider)
+			self.stocked_provider_by_resources[res].discard(provider)
+		self._remove_from_grids(provider)
 		super(ProviderHandler, self).remove(provider)
+		if provider.provided_resources:
+			# the listeners are gone already if the storage component has been removed
+			inventory = provider.get_component(StorageComponent).inventory
+			inventory.discard_change_listener(Callback(self._update_stock, provider))
 
+	def update_owner(self, provider):
+		"""Called when the owner of a building changed, e.g. when a settlement got it."""
+		if provider in self._grid_owners:
+			self._remove_from_grids(provider)
+			self._add_to_grids(provider)
 
+	def _add_to_grids(self, provider):
+		owner = provider.owner
+		for res in provider.provided_resources:
+			key = (res, owner)
+			if key not in self._grids:
+				self._grids[key] = SpatialGrid()
+				self._owners_by_resources[res].append(owner)
+			self._grids[key].add(provider)
+		self._grid_owners[provider] = owner
 
+	def _remove_from_grids(self, provider):
+		owner = self._grid_owners.pop(provider)
+		for res in provider.provided_resources:
+			self._grids[(res, owner)].remove(provider)
+
+	def get_providers_in_range(self, radiusrect, reslist, player=None, stocked_only=False):
+		"""Yields the providers of the resources within the specified shape.
+		@see BuildingOwner.get_providers_in_range"""
+		center = radiusrect.center
+		radius = radiusrect.radius
+		radius_squared = radius ** 2
+		left, top = center.left - radius, center.top - radius
+		right, bottom = center.right + radius, center.bottom + radius
+		seen = set() if len(reslist) > 1 else None
+		for res in reslist:
+			stocked = self.stocked_provider_by_resources[res] if stocked_only else None
+			owners = self._owners_by_resources[res] if player is None else (player, )
+			for owner in owners:
+				grid = self._grids.get((res, owner))
+				if grid is None:
+					continue
+				for provider in grid.get_in_box(left, top, right, bottom):
+					if stocked is not None and provider not in stocked:
+						continue
+					if seen is not None:
+						if provider in seen:
+							continue
+						seen.add(provider)
+					r1 = provider.position
+					if ((max(r1.left - center.right, 0, center.left - r1.right) ** 2) + (max(r1.top - center.bottom, 0, center.top - r1.bottom) ** 2)) <= radius_squared:
+						yield provider
 
+	def _update_stock(self, provider):
+		inventory = provider.get_component(StorageComponent).inventory
+		for res in provider.provided_resources:
+			if inventory[res] > 0:
+				self.stocked_provider_by_resources[res].add(provider)
+			else:
+				self.stocked_provider_by_resources[res].discard(provider)
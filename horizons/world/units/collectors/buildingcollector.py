@@ -155,21 +155,26 @@ class BuildingCollector(Collector):
 			return None
 
 		jobs = JobList(self, self.job_ordering)
-		# iterate all building that provide one of the resources
-		for building in self.get_buildings_in_range(reslist=collectable_res):
-			# check if we can pickup here on principle
-			target_possible = self._target_possible_cache.get(building, None)
-			if target_possible is None: # not in cache, we have to check
-				target_possible = self.check_possible_job_target(building)
-				self._target_possible_cache[building] = target_possible
-
-			if target_possible:
-				# check for res here
-				reslist = ( self.check_possible_job_target_for(building, res) for res in collectable_res )
-				reslist = [i for i in reslist if i]
-
-				if reslist: # we can do something here
-					jobs.append( Job(building, reslist) )
+		# the jobs of the colleagues don't change while searching, only sum them up once
+		self._colleague_job_amounts = self.get_colleague_job_amounts()
+		try:
+			# iterate all building that have one of the resources
+			for building in self.get_buildings_in_range(reslist=collectable_res):
+				# check if we can pickup here on principle
+				target_possible = self._target_possible_cache.get(building, None)
+				if target_possible is None: # not in cache, we have to check
+					target_possible = self.check_possible_job_target(building)
+					self._target_possible_cache[building] = target_possible
+
+				if target_possible:
+					# check for res here
+					reslist = ( self.check_possible_job_target_for(building, res) for res in collectable_res )
+					reslist = [i for i in reslist if i]
+
+					if reslist: # we can do something here
+						jobs.append( Job(building, reslist) )
+		finally:
+			self._colleague_job_amounts = None
 
 		# TODO: find out why order of  self.get_buildings_in_range(..) and therefore order of jobs differs from client to client
 		# TODO: find out why WildAnimal.get_job(..) doesn't have this problem
@@ -228,12 +233,13 @@ class BuildingCollector(Collector):
 		return self.home_building.get_needed_resources()
 
 	def get_buildings_in_range(self, reslist=None):
-		"""Returns all buildings in range .
+		"""Returns all buildings in range that could be a job target.
 		Overwrite in subclasses that need ranges around the pickup.
-		@param res: optional, only search for buildings that provide res"""
+		@param reslist: optional, only search for buildings that have one of these res in stock"""
 		reach = RadiusRect(self.home_building.position, self.home_building.radius)
 		return self.home_building.island.get_providers_in_range(reach, reslist=reslist,
-		                                                        player=self.owner)
+		                                                        player=self.owner,
+		                                                        stocked_only=bool(reslist))
 
 	def handle_path_home_blocked(self):
 		"""Called when we get blocked while trying to move to the job location. """
@@ -359,11 +365,11 @@ class FisherShipCollector(BuildingCollector):
 		return smallest_fisher
 
 	def get_buildings_in_range(self, reslist=None):
-		"""Returns all buildings in range .
-		Overwrite in subclasses that need ranges around the pickup.
-		@param res: optional, only search for buildings that provide res"""
+		"""Returns all buildings in range that could be a job target.
+		@param reslist: optional, only search for buildings that have one of these res in stock"""
 		reach = RadiusRect(self.home_building.position, self.home_building.radius)
-		return self.session.world.get_providers_in_range(reach, reslist=reslist)
+		return self.session.world.get_providers_in_range(reach, reslist=reslist,
+		                                                 stocked_only=bool(reslist))
 
 
 class DisasterRecoveryCollector(StorageCollector):
@@ -21,7 +21,7 @@
 
 import operator
 import logging
-from collections import namedtuple
+from collections import namedtuple, defaultdict
 
 from horizons.scheduler import Scheduler
 from horizons.util.pathfinding import PathBlockedError
@@ -93,6 +93,8 @@ class Collector(Unit):
 			self.hide()
 
 		self.job = None # here we store the current job as Job object
+		# amounts of the colleagues, only set while searching a job, see get_colleague_job_amounts
+		self._colleague_job_amounts = None
 
 	def remove(self):
 		"""Removes the instance. Useful when the home building is destroyed"""
@@ -216,6 +218,18 @@ class Collector(Unit):
 		"""Returns a list of collectors, that work for the same "inventory"."""
 		return []
 
+	def get_colleague_job_amounts(self):
+		"""Returns how much of each res the colleague collectors are about to bring home.
+		@return: dict { res: amount }"""
+		if self._colleague_job_amounts is not None:
+			return self._colleague_job_amounts
+		amounts = defaultdict(int)
+		for collector in self.get_colleague_collectors():
+			if collector.job is not None:
+				for entry in collector.job.reslist:
+					amounts[entry.res] += entry.amount
+		return amounts
+
 	def get_collectable_res(self):
 		"""Return all resources the collector can collect"""
 		raise NotImplementedError
@@ -275,12 +289,7 @@ class Collector(Unit):
 
 		# check if other collectors get this resource, because our inventory could
 		# get full if they arrive.
-		total_registered_amount_consumer = sum(
-		  entry.amount for
-		  collector in self.get_colleague_collectors() if
-		  collector.job is not None for
-		  entry in collector.job.reslist if
-		  entry.res == res )
+		total_registered_amount_consumer = self.get_colleague_job_amounts().get(res, 0)
 
 		inventory = self.get_home_inventory()
 
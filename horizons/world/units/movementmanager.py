@@ -0,0 +1,119 @@
+# ###################################################
+# Copyright (C) 2008-2014 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+
+import logging
+from array import array
+
+from horizons.scheduler import Scheduler
+from horizons.util.python.callback import Callback
+
+
+class MovementManager(object):
+	"""Advances the movement of all units that are due in a tick as one batch.
+
+	Instead of scheduling their own _move_tick, moving units are queued here. For every tick
+	with due units, there is exactly one call in the Scheduler, which executes the move steps
+	of these units in the order they have been queued.
+
+	This changes the order of the move steps relative to other scheduled calls of the same
+	tick: all of them run at the scheduler position of the batch, which is where the first
+	unit for the tick was queued. A step that was queued after some other call of its tick
+	can therefore run before it.
+
+	Units only store their index (slot) into the arrays of this class. A unit can have at
+	most one pending move step, queueing it again replaces the old one.
+	"""
+	log = logging.getLogger("world.units.movement")
+
+	NOT_QUEUED = -1
+
+	def __init__(self, headless=False):
+		"""
+		@param headless: whether nothing is rendered, units then skip all fife route handling
+		"""
+		self.headless = headless
+		self._units = [] # slot -> unit or None
+		self._due_ticks = array('l') # slot -> tick of the pending move step or NOT_QUEUED
+		self._free_slots = []
+		self._batches = {} # tick -> array of slots that have been queued for this tick
+
+	def end(self):
+		Scheduler().rem_all_classinst_calls(self)
+		self._units = None
+		self._batches = None
+
+	def register(self, unit):
+		"""Assigns a slot to unit.
+		@return: int, the slot"""
+		if self._free_slots:
+			slot = self._free_slots.pop()
+			self._units[slot] = unit
+			self._due_ticks[slot] = self.NOT_QUEUED
+		else:
+			slot = len(self._units)
+			self._units.append(unit)
+			self._due_ticks.append(self.NOT_QUEUED)
+		return slot
+
+	def unregister(self, unit):
+		"""Frees the slot of unit, a pending move step is dropped."""
+		slot = unit._move_slot
+		assert self._units[slot] is unit
+		self._units[slot] = None
+		self._due_ticks[slot] = self.NOT_QUEUED
+		self._free_slots.append(slot)
+
+	def queue(self, unit, run_in=1):
+		"""Executes unit._move_tick() in run_in ticks.
+		@param run_in: 0 has the same meaning as for Scheduler.add_new_object"""
+		tick = Scheduler().cur_tick + run_in
+		slot = unit._move_slot
+		self._due_ticks[slot] = tick
+		batch = self._batches.get(tick)
+		if batch is None:
+			batch = self._batches[tick] = array('l')
+			Scheduler().add_new_object(Callback(self._run_batch, tick), self, run_in=run_in)
+		batch.append(slot)
+
+	def cancel(self, unit):
+		"""Drops the pending move step of unit.
+		@return: bool, whether there was one"""
+		slot = unit._move_slot
+		if self._due_ticks[slot] == self.NOT_QUEUED:
+			return False
+		self._due_ticks[slot] = self.NOT_QUEUED
+		return True
+
+	def is_queued(self, unit):
+		return self._due_ticks[unit._move_slot] != self.NOT_QUEUED
+
+	def _run_batch(self, tick):
+		# steps queued for this tick while running the batch (run_in=0) get a new batch
+		batch = self._batches.pop(tick)
+		due_ticks = self._due_ticks
+		units = self._units
+		for slot in batch:
+			# skip units that have been cancelled, requeued or removed in the meantime
+			if due_ticks[slot] != tick:
+				continue
+			due_ticks[slot] = self.NOT_QUEUED
+			units[slot]._move_tick()
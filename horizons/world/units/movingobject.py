@@ -47,6 +47,11 @@ class MovingObject(ComponentHolder, ConcreteObject):
 	- position, last_position: Point
 	- path: Pather
 
+	The move steps are executed by the MovementManager of the world, which handles
+	all units that are due in a tick at once. They therefore run at the position in the
+	tick of the batch, i.e. where the first unit for this tick was queued, and not at the
+	position where each unit queued its step.
+
 	*moving methods:
 	- move
 	- stop
@@ -77,9 +82,14 @@ class MovingObject(ComponentHolder, ConcreteObject):
 		self._conditional_callbacks = {}
 
 		self.__is_moving = False
+		# units inside buildings are hidden, their movement doesn't need to be displayed
+		self._visible = True
 
 		self.path = self.pather_class(self, session=self.session)
 
+		self._movement_manager = self.session.world.movement_manager
+		self._move_slot = self._movement_manager.register(self)
+
 		self._exact_model_coords1 = fife.ExactModelCoordinate() # save instance since construction is expensive (no other purpose)
 		self._exact_model_coords2 = fife.ExactModelCoordinate() # save instance since construction is expensive (no other purpose)
 		self._fife_location1 = None
@@ -149,25 +159,23 @@ class MovingObject(ComponentHolder, ConcreteObject):
 			# start moving in 1 tick
 			# this assures that a movement takes at least 1 tick, which is sometimes subtly
 			# assumed e.g. in the collector code
-			Scheduler().add_new_object(self._move_tick, self)
+			self._movement_manager.queue(self)
 
 	def _movement_finished(self):
 		self.log.debug("%s: movement finished. calling callbacks %s", self, self.move_callbacks)
 		self._next_target = self.position
 		self.__is_moving = False
+		if not self._visible and not self._movement_manager.headless:
+			# the movement wasn't displayed, so the fife instance is still somewhere on the way
+			self._sync_instance_location()
 		self.move_callbacks.execute()
 
 	@decorators.make_constants()
 	def _move_tick(self, resume=False):
-		"""Called by the scheduler, moves the unit one step for this tick.
+		"""Called by the movement manager, moves the unit one step for this tick.
 		"""
 		assert self._next_target is not None
 
-		if self._fife_location1 is None:
-			# this data structure is needed multiple times, only create once
-			self._fife_location1 = fife.Location(self._instance.getLocationRef().getLayer())
-			self._fife_location2 = fife.Location(self._instance.getLocationRef().getLayer())
-
 		if resume:
 			self.__is_moving = True
 		else:
@@ -198,8 +206,7 @@ class MovingObject(ComponentHolder, ConcreteObject):
 					# technically, the ship doesn't move, but it is in the process of moving,
 					# as it will continue soon in general. Needed in border cases for add_move_callback
 					self.__is_moving = True
-					Scheduler().add_new_object(self._move_tick, self,
-					                           GAME_SPEED.TICKS_PER_SECOND * 2)
+					self._movement_manager.queue(self, GAME_SPEED.TICKS_PER_SECOND * 2)
 				self.log.debug("Unit %s: path is blocked, no way around", self)
 				return
 
@@ -211,6 +218,31 @@ class MovingObject(ComponentHolder, ConcreteObject):
 
 		#setup movement
 		move_time = self.get_unit_velocity()
+		self.act(self._move_action)
+		if self._visible and not self._movement_manager.headless:
+			self._follow_route(move_time)
+		diagonal = self._next_target.x != self.position.x and self._next_target.y != self.position.y
+
+		#self.log.debug("%s registering move tick in %s ticks", self, move_time[int(diagonal)])
+		self._movement_manager.queue(self, move_time[int(diagonal)])
+
+		# check if a conditional callback becomes true
+		if self._conditional_callbacks:
+			for cond in self._conditional_callbacks.keys(): # iterate of copy of keys to be able to delete
+				if cond():
+					# start callback when this function is done
+					Scheduler().add_new_object(self._conditional_callbacks[cond], self)
+					del self._conditional_callbacks[cond]
+
+	def _follow_route(self, move_time):
+		"""Makes the fife instance walk from position to the next target.
+		This is only about displaying the movement, the unit itself is moved by _move_tick.
+		@param move_time: return value of get_unit_velocity()"""
+		if self._fife_location1 is None:
+			# this data structure is needed multiple times, only create once
+			self._fife_location1 = fife.Location(self._instance.getLocationRef().getLayer())
+			self._fife_location2 = fife.Location(self._instance.getLocationRef().getLayer())
+
 		UnitClass.ensure_action_loaded(self._action_set_id, self._move_action) # lazy load move action
 
 		self._exact_model_coords1.set(self.position.x, self.position.y, 0)
@@ -228,21 +260,26 @@ class MovingObject(ComponentHolder, ConcreteObject):
 			self._route.thisown = 0
 		self._route.setPath(location_list)
 
-		self.act(self._move_action)
-		diagonal = self._next_target.x != self.position.x and self._next_target.y != self.position.y
 		speed = float(self.session.timer.get_ticks(1)) / move_time[0]
 		action = self._instance.getCurrentAction().getId()
 		self._instance.follow(action, self._route, speed)
 
-		#self.log.debug("%s registering move tick in %s ticks", self, move_time[int(diagonal)])
-		Scheduler().add_new_object(self._move_tick, self, move_time[int(diagonal)])
-
-		# check if a conditional callback becomes true
-		for cond in self._conditional_callbacks.keys(): # iterate of copy of keys to be able to delete
-			if cond():
-				# start callback when this function is done
-				Scheduler().add_new_object(self._conditional_callbacks[cond], self)
-				del self._conditional_callbacks[cond]
+	def _sync_instance_location(self):
+		"""Puts the fife instance at the position of the unit without displaying a movement."""
+		location = self._instance.getLocation()
+		location.setExactLayerCoordinates(fife.ExactModelCoordinate(self.position.x, self.position.y, 0))
+		self._instance.setLocation(location)
+
+	def _set_visible(self, visible):
+		"""Called when the unit is hidden or shown. Hidden units don't display their movement,
+		so when showing a unit, the fife instance has to catch up with the unit."""
+		was_visible = self._visible
+		self._visible = visible
+		if not visible or was_visible or self._movement_manager.headless:
+			return
+		self._sync_instance_location()
+		if self.is_moving() and self._next_target is not None and self._next_target != self.position:
+			self._follow_route(self.get_unit_velocity())
 
 	def teleport(self, destination, callback=None, destination_in_building=False):
 		"""Like move, but nearly instantaneous"""
@@ -283,6 +320,10 @@ class MovingObject(ComponentHolder, ConcreteObject):
 	def get_move_target(self):
 		return self.path.get_move_target()
 
+	def remove(self):
+		self._movement_manager.unregister(self)
+		super(MovingObject, self).remove()
+
 	def save(self, db):
 		super(MovingObject, self).save(db)
 		# NOTE: _move_action is currently not yet saved and neither is blocked_callback.
@@ -296,6 +337,6 @@ class MovingObject(ComponentHolder, ConcreteObject):
 		if path_loaded:
 			self.__is_moving = True
 			self._setup_move()
-			Scheduler().add_new_object(self._move_tick, self, run_in=0)
+			self._movement_manager.queue(self, run_in=0)
 
 decorators.bind_all(MovingObject)
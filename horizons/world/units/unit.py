@@ -169,10 +169,12 @@ class Unit(MovingObject, ResourceTransferHandler):
 		"""Hides the unit."""
 		vis = self._instance.get2dGfxVisual()
 		vis.setVisible(False)
+		self._set_visible(False)
 
 	def show(self):
 		vis = self._instance.get2dGfxVisual()
 		vis.setVisible(True)
+		self._set_visible(True)
 
 	def save(self, db):
 		super(Unit, self).save(db)
@@ -464,8 +464,8 @@ class MovingWeaponHolder(WeaponHolder):
 		Delays movement for a number of ticks.
 		Used when shooting in specialized unit code.
 		"""
-		if Scheduler().rem_call(self, self._move_tick):
-			Scheduler().add_new_object(Callback(self._move_tick, resume=False), self, ticks)
+		if self._movement_manager.cancel(self):
+			self._movement_manager.queue(self, ticks)
 
 	def _move_and_attack(self, destination, not_possible_action=None, in_range_callback=None):
 		"""
@@ -510,7 +510,7 @@ class MovingWeaponHolder(WeaponHolder):
 				# finish the move before removing the move tick
 				self._movement_finished()
 				# do not execute the next move tick
-				Scheduler().rem_call(self, self._move_tick)
+				self._movement_manager.cancel(self)
 
 			distance = self.position.distance(self._target.position.center)
 			dest = self._target.position.center
@@ -22,7 +22,7 @@
 import contextlib
 import os
 import tempfile
-from functools import wraps
+from functools import partial, wraps
 
 import mock
 
@@ -35,6 +35,7 @@ from horizons.scheduler import Scheduler
 from horizons.spsession import SPSession
 from horizons.util.dbreader import DbReader
 from horizons.util.difficultysettings import DifficultySettings
+from horizons.util.random_map import generate_map_from_seed
 from horizons.util.savegameaccessor import SavegameAccessor
 from horizons.util.startgameoptions import StartGameOptions
 from horizons.util.color import Color
@@ -87,6 +88,8 @@ def _dbreader_convert_dummy_objects():
 
 class SPTestSession(SPSession):
 
+	headless = True
+
 	@mock.patch('horizons.session.View', Dummy)
 	def __init__(self, rng_seed=None):
 		ExtScheduler.create_instance(Dummy)
@@ -105,6 +108,12 @@ class SPTestSession(SPSession):
 			with _dbreader_convert_dummy_objects():
 				return super(SPTestSession, self).save(*args, **kwargs)
 
+	def _do_background_save(self, *args, **kwargs):
+		"""Same fixes as in save, for the snapshot."""
+		with mock.patch('horizons.session.SavegameManager._write_screenshot'):
+			with _dbreader_convert_dummy_objects():
+				return super(SPTestSession, self)._do_background_save(*args, **kwargs)
+
 	def load(self, savegame, players, is_ai_test, is_map):
 		# keep a reference on the savegame, so we can cleanup in `end`
 		self.savegame = savegame
@@ -279,6 +288,28 @@ def game_test(timeout=15*60, mapgen=create_map, human_player=True, ai_players=0,
 game_test.__test__ = False
 
 
+def ai_settlement_test(func):
+	"""
+	Decorator for tests that need an AI settlement. The only player is an AI that plays
+	the random map of seed 5 until it has founded its first settlement, then the test is
+	called with the session and the settlement manager of that settlement.
+	"""
+
+	@game_test(mapgen=partial(generate_map_from_seed, 5), human_player=False, ai_players=1)
+	@wraps(func)
+	def wrapped(session, _, *args):
+		player = session.world.players[0]
+		for _ in xrange(30):
+			if player.settlement_managers:
+				break
+			session.run(seconds=10)
+		assert player.settlement_managers
+		return func(session, player.settlement_managers[0], *args)
+	return wrapped
+
+ai_settlement_test.__test__ = False
+
+
 def set_trace():
 	"""
 	Use this function instead of directly importing if from pdb. The test run
@@ -0,0 +1,48 @@
+# ###################################################
+# Copyright (C) 2008-2014 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+from tests.game import ai_settlement_test, saveload
+
+
+@ai_settlement_test
+def test_tick_budget(session, settlement_manager):
+	"""An AI player whose ticks are spread over several game ticks still builds its settlement."""
+	player = settlement_manager.owner
+	player.tick_budget = 2
+	session.run(seconds=60)
+
+	settlement = settlement_manager.settlement
+	assert len(settlement.buildings) > 10
+	assert player.deferred_ticks > 0
+	assert player.deferred_tick_steps > player.deferred_ticks
+	assert player.max_tick_delay > 0
+
+	# unfinished ticks are dropped on saving, the loaded player continues with the next one
+	session = saveload(session)
+	player = session.world.players[0]
+	player.tick_budget = 2
+	buildings = len(player.settlement_managers[0].settlement.buildings)
+	session.run(seconds=60)
+	assert len(player.settlement_managers[0].settlement.buildings) > buildings
+
+# this disables the test in general and only makes it being run when
+# called like this: run_tests.py -a long
+test_tick_budget.long = True
@@ -0,0 +1,140 @@
+# ###################################################
+# Copyright (C) 2008-2014 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+
+from horizons.ai.aiplayer.basicbuilder import BasicBuilder
+from horizons.ai.aiplayer.building import AbstractBuilding
+from horizons.ai.aiplayer.buildingevaluator import BuildingEvaluator, BuildingEvaluatorCache
+from horizons.ai.aiplayer.constants import BUILDING_PURPOSE
+from horizons.constants import BUILDINGS, RES
+from horizons.entities import Entities
+from horizons.util.shapes import Rect
+
+from tests.game import ai_settlement_test
+
+
+# building types with evaluators that use the BuildingEvaluatorCache
+BUILDING_IDS = [BUILDINGS.BOAT_BUILDER, BUILDINGS.BRICKYARD, BUILDINGS.CHARCOAL_BURNER, BUILDINGS.DISTILLERY,
+                BUILDINGS.LUMBERJACK, BUILDINGS.SALT_PONDS, BUILDINGS.SIGNAL_FIRE, BUILDINGS.SMELTERY,
+                BUILDINGS.TOBACCONIST, BUILDINGS.TOOLMAKER, BUILDINGS.WEAVER]
+
+# the building types that need a farm with a field of the given type
+FARM_FIELDS = {BUILDINGS.DISTILLERY: BUILDINGS.SUGARCANE_FIELD, BUILDINGS.TOBACCONIST: BUILDINGS.TOBACCO_FIELD,
+               BUILDINGS.WEAVER: BUILDINGS.PASTURE}
+
+
+def get_evaluations(settlement_manager):
+	"""Return {building id: [(position, value), ...]} of the building types."""
+	result = {}
+	for building_id in BUILDING_IDS:
+		evaluators = AbstractBuilding.buildings[building_id].get_evaluators(settlement_manager, RES.FOOD)
+		result[building_id] = [(evaluator.builder.position, evaluator.value) for evaluator in evaluators]
+	return result
+
+
+def compute_alignment(area_builder, outline_coords_list):
+	"""Return the alignment value of the outline by looking at every tile."""
+	personality = area_builder.owner.personality_manager.get('BuildingEvaluator')
+	alignment = 0
+	for coords in outline_coords_list:
+		if coords in area_builder.land_manager.roads:
+			alignment += personality.alignment_road
+		elif coords in area_builder.plan:
+			if area_builder.plan[coords][0] != BUILDING_PURPOSE.NONE:
+				alignment += personality.alignment_production_building
+		elif coords in area_builder.settlement.ground_map:
+			object = area_builder.settlement.ground_map[coords].object
+			if object is not None and not object.buildable_upon:
+				alignment += personality.alignment_other_building
+		else:
+			alignment += personality.alignment_edge
+	return alignment
+
+
+def compute_distance_to_nearest_farm(area_builder, builder, field_building_id):
+	"""Return the shortest distance to a farm with the field type in range by looking at every farm."""
+	field_class = Entities.buildings[field_building_id]
+	shortest_distance = None
+	for building in area_builder.settlement.buildings_by_id.get(BUILDINGS.FARM, []):
+		distance = builder.position.distance(building.position)
+		if distance <= Entities.buildings[builder.building_id].radius:
+			if any(isinstance(provider, field_class) for provider in building.get_providers()):
+				if shortest_distance is None or distance < shortest_distance:
+					shortest_distance = distance
+	return shortest_distance
+
+
+def check_cache(production_builder):
+	"""
+	Compare the lookups of a new BuildingEvaluatorCache with simple computations.
+	Return the number of checked positions that have a farm in range.
+	"""
+	farm_positions = 0
+	cache = BuildingEvaluatorCache(production_builder)
+	weights = ((BUILDING_PURPOSE.NONE, 3), (BUILDING_PURPOSE.TREE, 1))
+	coastline = production_builder.land_manager.coastline
+	for (x, y), (purpose, _) in sorted(production_builder.plan.iteritems())[::50]:
+		position = Rect.init_from_topleft_and_size(x, y, 2, 2)
+		expected_distance = None
+		for building in production_builder.collector_buildings:
+			distance = position.distance(building.position)
+			if distance <= 12 and (expected_distance is None or distance < expected_distance):
+				expected_distance = distance
+		assert cache.get_distance_to_nearest_collector(position, 12) == expected_distance
+
+		coords_runs = [(column_x, y - 8, y + 9) for column_x in xrange(x - 8, x + 10)]
+		expected_value = 0
+		for column_x, first_y, last_y in coords_runs:
+			for row_y in xrange(first_y, last_y + 1):
+				coords = (column_x, row_y)
+				if coords in production_builder.plan and coords not in coastline:
+					expected_value += dict(weights).get(production_builder.plan[coords][0], 0)
+		assert cache.get_plan_value(weights, coords_runs) == expected_value
+
+		# the second lookup of an outline uses the cached tiles
+		outline = BuildingEvaluator._get_outline_coords_list(position.tuple_iter())
+		for _ in xrange(2):
+			assert cache.get_alignment(outline) == compute_alignment(production_builder, outline)
+
+		# the shared cache of the evaluators is up to date as well
+		for building_id, field_building_id in FARM_FIELDS.iteritems():
+			builder = BasicBuilder.create(building_id, (x, y), 0)
+			distance = compute_distance_to_nearest_farm(production_builder, builder, field_building_id)
+			assert BuildingEvaluator._distance_to_nearest_farm(production_builder, builder, field_building_id) == distance
+			if distance is not None:
+				farm_positions += 1
+	return farm_positions
+
+
+@ai_settlement_test
+def test_evaluator_cache(session, settlement_manager):
+	"""The cached data of the building evaluators matches the current state of the settlement."""
+	for _ in xrange(4):
+		session.run(seconds=120)
+		farm_positions = check_cache(settlement_manager.production_builder)
+		cached_evaluations = get_evaluations(settlement_manager)
+		BuildingEvaluator.clear_cache()
+		assert get_evaluations(settlement_manager) == cached_evaluations
+	assert farm_positions # the AI has built a farm by now
+
+# this disables the test in general and only makes it being run when
+# called like this: run_tests.py -a long
+test_evaluator_cache.long = True
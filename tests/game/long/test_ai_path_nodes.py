@@ -0,0 +1,77 @@
+# ###################################################
+# Copyright (C) 2008-2014 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+
+from horizons.ai.aiplayer.constants import BUILDING_PURPOSE
+from horizons.command.building import Build
+from horizons.constants import BUILDINGS
+
+from tests.game import ai_settlement_test
+
+
+def get_path_nodes(builder):
+	"""Return the cached path nodes of the AreaBuilder after checking them against a full recomputation."""
+	path_nodes = builder.get_path_nodes()
+	assert path_nodes == builder._compute_path_nodes()
+	return path_nodes
+
+
+@ai_settlement_test
+def test_path_nodes_cache(session, settlement_manager):
+	"""The cached path nodes of the AI are updated when the plans or the island change."""
+	player = settlement_manager.owner
+	settlement = settlement_manager.settlement
+	production_builder = settlement_manager.production_builder
+	builders = (production_builder, settlement_manager.village_builder)
+
+	for builder in builders:
+		path_nodes = get_path_nodes(builder)
+		assert builder.get_path_nodes() is path_nodes
+
+		x, y = min(coords for coords, (purpose, _) in builder.plan.iteritems()
+		           if purpose != BUILDING_PURPOSE.ROAD and coords in settlement.ground_map)
+		builder.register_change(x, y, BUILDING_PURPOSE.ROAD, builder.plan[(x, y)][1])
+		assert get_path_nodes(builder) is not path_nodes
+
+	# a building that makes tiles unwalkable
+	path_nodes_change_id = settlement.island.path_nodes.last_change_id
+	for x, y in sorted(production_builder.plan, reverse=True):
+		if Build(BUILDINGS.LUMBERJACK, x, y, settlement.island, settlement=settlement)(player):
+			break
+	assert settlement.island.path_nodes.last_change_id != path_nodes_change_id
+	for builder in builders:
+		get_path_nodes(builder)
+
+	# another player takes planned land outside of the settlement
+	lost_coords = sorted(coords for coords in production_builder.plan if coords not in settlement.ground_map)[:20]
+	path_nodes = production_builder.get_path_nodes()
+	settlement_manager.handle_lost_area(lost_coords)
+	assert get_path_nodes(production_builder) is not path_nodes
+	get_path_nodes(settlement_manager.village_builder)
+
+	# the AI goes on with its plans
+	session.run(seconds=60)
+	for builder in builders:
+		get_path_nodes(builder)
+
+# this disables the test in general and only makes it being run when
+# called like this: run_tests.py -a long
+test_path_nodes_cache.long = True
@@ -0,0 +1,59 @@
+# ###################################################
+# Copyright (C) 2008-2014 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+from horizons.scheduler import Scheduler
+from horizons.util.python.callback import Callback
+
+from tests.game import game_test
+
+
+@game_test(human_player=False, ai_players=1)
+def test_tick_budget_counters(session, _):
+	"""The deferred work is counted exactly, also if the budget fits the last step."""
+	player = session.world.players[0]
+	steps = []
+	def get_tick_steps():
+		# 4 steps like AIPlayer._get_tick_steps: no yield after the last one
+		for step in xrange(4):
+			steps.append(step)
+			if step < 3:
+				yield
+	player._get_tick_steps = get_tick_steps
+	continue_tick = Callback(player._continue_tick)
+
+	player.tick_budget = 4
+	session.run(ticks=100) # the player ticks every 32 ticks
+	assert len(steps) % 4 == 0 and steps
+	assert not Scheduler().get_classinst_calls(player, continue_tick)
+	assert (player.deferred_ticks, player.deferred_tick_steps, player.max_tick_delay) == (0, 0, 0)
+
+	del steps[:]
+	player.tick_budget = 3
+	session.run(ticks=100)
+	ticks = len(steps) // 4
+	assert ticks
+	assert (player.deferred_ticks, player.deferred_tick_steps, player.max_tick_delay) == (ticks, ticks, 1)
+
+	del steps[:]
+	player.tick_budget = 2
+	session.run(ticks=100)
+	assert (player.deferred_ticks, player.deferred_tick_steps, player.max_tick_delay) == \
+	       (ticks + len(steps) // 4, ticks + len(steps) // 2, 1)
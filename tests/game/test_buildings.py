@@ -192,3 +192,24 @@ def test_tree_production(s, p):
 		inv.alter(RES.TREES, -1)
 
 	# here, n tons of wood have been produced
+
+@game_test()
+def test_water_tiles_of_world_building(s, p):
+	"""Water tiles are shared by big tiles, a building in the water must only change its own tiles."""
+	world = s.world
+	coords = (31, 18)
+	neighbor_coords = (33, 19) # inside of the same big tile, next to the fish deposit
+	assert world.full_map[coords] is world.full_map[neighbor_coords]
+
+	school = Build(BUILDINGS.FISH_DEPOSIT, coords[0], coords[1], world, ownerless=True)(None)
+	assert school
+	for tile_coords in school.position.tuple_iter():
+		tile = world.full_map[tile_coords]
+		assert tile.object is school and tile.blocked
+		assert world.ground_map[tile_coords] is tile
+	assert world.full_map[neighbor_coords].object is None
+	assert not world.full_map[neighbor_coords].blocked
+
+	school.remove()
+	assert world.full_map[coords].object is None
+	assert not world.full_map[coords].blocked
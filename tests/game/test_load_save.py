@@ -22,11 +22,16 @@
 import os
 import bz2
 import tempfile
+import time
+
+import mock
 
 from horizons.command.building import Build
 from horizons.command.production import ToggleActive
 from horizons.command.unit import CreateUnit
-from horizons.constants import BUILDINGS, GAME, PRODUCTION, RES, TIER, UNITS
+from horizons.constants import BUILDINGS, GAME, PRODUCTION, RES, SAVEGAME, TIER, UNITS
+from horizons.extscheduler import ExtScheduler
+from horizons.savegamemanager import SavegameManager
 from horizons.util.shapes import Point
 from horizons.util.worldobject import WorldObject
 from horizons.world.production.producer import Producer
@@ -201,6 +206,103 @@ def test_settler_save_load():
 	session.end()
 
 
+def wait_for_background_save(results):
+	"""Runs the ExtScheduler until the background save has passed its result to results.append"""
+	for _ in xrange(100):
+		if results:
+			break
+		time.sleep(0.1)
+		ExtScheduler().tick()
+
+
+@game_test(manual_session=True)
+def test_background_save():
+	"""Save in the background while the game goes on, then load the savegame"""
+	session, player = new_session()
+	settlement, island = settle(session)
+	lj = Build(BUILDINGS.LUMBERJACK, 30, 30, island, settlement=settlement)(player)
+	worldid = lj.worldid
+
+	fd, filename = tempfile.mkstemp()
+	os.close(fd)
+	results = []
+	assert session._do_background_save(filename, results.append)
+	# not part of the snapshot
+	fisher = Build(BUILDINGS.FISHER, 25, 20, island, settlement=settlement)(player)
+	assert fisher
+	session.run(seconds=1)
+	wait_for_background_save(results)
+	assert results == [True]
+	assert not os.path.exists(filename + '.part')
+	session.end(keep_map=True)
+
+	session = load_session(filename)
+	assert WorldObject.get_object_by_id(worldid).id == BUILDINGS.LUMBERJACK
+	tiles = [island.get_tile(Point(25, 20)) for island in session.world.islands]
+	assert all(tile is None or tile.object is None for tile in tiles)
+	session.end()
+
+
+@game_test()
+def test_background_autosave(session, _):
+	"""Old autosaves are only deleted after the new one has been written"""
+	results = []
+	autosave_done = session._autosave_done
+	def record_autosave_done(success):
+		results.append(success)
+		autosave_done(success)
+	session._autosave_done = record_autosave_done
+
+	with mock.patch.object(SavegameManager, 'delete_dispensable_savegames') as delete:
+		# the savegame can't replace a directory, the writer fails after writing the .part file
+		directory = tempfile.mkdtemp()
+		with mock.patch.object(SavegameManager, 'create_autosave_filename', return_value=directory):
+			session.autosave()
+			wait_for_background_save(results)
+		assert results == [False]
+		assert not delete.called
+		assert not os.path.exists(directory + '.part')
+		os.rmdir(directory)
+
+		fd, filename = tempfile.mkstemp()
+		os.close(fd)
+		del results[:]
+		with mock.patch.object(SavegameManager, 'create_autosave_filename', return_value=filename):
+			session.autosave()
+			wait_for_background_save(results)
+		assert results == [True]
+		delete.assert_called_once_with(autosaves=True)
+		os.remove(filename)
+@game_test(manual_session=True)
+def test_lazy_loading():
+	"""Loads a savegame with the rows preloaded and lazily, the game has to be the same"""
+	def get_state(session):
+		state = []
+		for settlement in session.world.settlements:
+			for building in settlement.buildings:
+				storage = building.get_component(StorageComponent) if building.has_component(StorageComponent) else None
+				productions = building.get_component(Producer).get_productions() if building.has_component(Producer) else []
+				state.append((building.worldid, building.id, building.position.origin.to_tuple(),
+				              storage and sorted(storage.inventory.itercontents()),
+				              sorted((p.get_production_line_id(), p.get_state()) for p in productions)))
+		for ship in session.world.ships:
+			state.append((ship.worldid, ship.id, ship.position.to_tuple(), ship.owner and ship.owner.worldid,
+			              sorted(ship.get_component(StorageComponent).inventory.itercontents())))
+		return sorted(state)
+
+	path = os.path.join(TEST_FIXTURES_DIR, 'traderoute.sqlite')
+	states = []
+	for lazy in (False, True):
+		with mock.patch.object(SAVEGAME, 'LAZY_LOADING', lazy):
+			session = load_session(path)
+		session.run(seconds=10)
+		states.append(get_state(session))
+		session.end(remove_savegame=False, keep_map=True)
+
+	assert states[0]
+	assert states[0] == states[1]
+
+
 @game_test(manual_session=True)
 def test_savegame_upgrade():
 	"""Loads an old savegame and keeps it running for a while"""
@@ -0,0 +1,52 @@
+# ###################################################
+# Copyright (C) 2008-2014 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+
+from horizons.command.building import Build, Tear
+from horizons.constants import BUILDINGS
+from horizons.util.pathfinding.pather import StaticPather
+from horizons.util.shapes import Point
+
+from tests.game import game_test, settle
+
+
+@game_test()
+def test_path_cache_invalidation(s, p):
+	"""
+	Cached road paths must be dropped when the roads change.
+	"""
+	settlement, island = settle(s)
+	cache = island.path_nodes.path_cache
+	source, destination = Point(25, 26), Point(31, 26)
+
+	trails = [Build(BUILDINGS.TRAIL, x, 26, island, settlement=settlement)(p) for x in xrange(26, 31)]
+	assert all(trails)
+	path = StaticPather.get_path_on_roads(island, source, destination)
+	assert path == [(x, 26) for x in xrange(25, 32)]
+	assert StaticPather.get_path_on_roads(island, source, destination) == path
+	assert (cache.hits, cache.misses) == (1, 1)
+
+	Tear(trails[2])(p)
+	assert StaticPather.get_path_on_roads(island, source, destination) is None
+
+	assert Build(BUILDINGS.TRAIL, 28, 26, island, settlement=settlement)(p)
+	assert StaticPather.get_path_on_roads(island, source, destination) == path
+	assert (cache.hits, cache.misses) == (1, 2)
@@ -0,0 +1,72 @@
+# ###################################################
+# Copyright (C) 2008-2014 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+
+
+from horizons.command.building import Build, Tear
+from horizons.component.storagecomponent import StorageComponent
+from horizons.constants import BUILDINGS, RES
+from horizons.util.shapes import Rect, RadiusRect
+
+from tests.game import game_test, settle
+
+
+@game_test()
+def test_stocked_providers(s, p):
+	"""
+	The providers that have a res in stock are kept track of.
+	"""
+	settlement, island = settle(s)
+	stocked = island.provider_buildings.stocked_provider_by_resources
+	warehouse = settlement.buildings_by_id[BUILDINGS.WAREHOUSE][0]
+	# the warehouse uses the settlement inventory, it is always considered
+	assert warehouse in stocked[RES.BOARDS]
+
+	lj = Build(BUILDINGS.LUMBERJACK, 30, 30, island, settlement=settlement)(p)
+	inventory = lj.get_component(StorageComponent).inventory
+	assert lj not in stocked[RES.BOARDS]
+
+	inventory.alter(RES.BOARDS, 1)
+	assert lj in stocked[RES.BOARDS]
+	inventory.alter(RES.BOARDS, -1)
+	assert lj not in stocked[RES.BOARDS]
+
+	inventory.alter(RES.BOARDS, 2)
+	Tear(lj)(p)
+	assert lj not in stocked[RES.BOARDS]
+
+
+@game_test()
+def test_providers_in_range(s, p):
+	"""
+	Providers are found by resource and owner in the range.
+	"""
+	settlement, island = settle(s)
+	lj = Build(BUILDINGS.LUMBERJACK, 30, 30, island, settlement=settlement)(p)
+	reach = RadiusRect(Rect.init_from_topleft_and_size(26, 30, 2, 2), 3)
+
+	assert list(island.get_providers_in_range(reach, res=RES.BOARDS, player=p)) == [lj]
+	assert list(island.get_providers_in_range(reach, reslist=[RES.TREES, RES.BOARDS])) == [lj]
+	assert not list(island.get_providers_in_range(reach, res=RES.BOARDS, stocked_only=True))
+
+	# just out of range
+	reach = RadiusRect(Rect.init_from_topleft_and_size(26, 30, 2, 2), 2)
+	assert not list(island.get_providers_in_range(reach, res=RES.BOARDS))
@@ -0,0 +1,68 @@
+# ###################################################
+# Copyright (C) 2008-2014 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+from horizons.command.building import Build
+from horizons.component.storagecomponent import StorageComponent
+from horizons.constants import BUILDINGS, RES
+from horizons.scenario import CONDITIONS, ScenarioEventHandler
+
+from tests.game import game_test, settle
+
+
+def start_scenario(session, condition, *arguments):
+	"""Start a scenario with an event that sets the variable 'done' when the condition is true."""
+	handler = ScenarioEventHandler(session)
+	handler._apply_data({'events': [{
+		'actions': [{'type': 'set_var', 'arguments': ['done', True]}],
+		'conditions': [{'type': condition, 'arguments': list(arguments)}],
+	}]})
+	session.scenario_eventhandler = handler
+	handler.start()
+	return handler
+
+
+@game_test()
+def test_inhabitants_condition(s, p):
+	"""Conditions on the inhabitants are checked after the inhabitants changed."""
+	assert CONDITIONS.player_inhabitants_greater not in CONDITIONS.check_periodically
+	settlement, island = settle(s)
+	handler = start_scenario(s, CONDITIONS.player_inhabitants_greater, settlement.inhabitants)
+	s.run(ticks=2)
+	assert 'done' not in handler._scenario_variables
+
+	Build(BUILDINGS.RESIDENTIAL, 22, 22, island, settlement=settlement)(p)
+	# much sooner than the periodic check
+	s.run(ticks=2)
+	assert handler._scenario_variables.get('done')
+
+
+@game_test()
+def test_res_stored_condition(s, p):
+	"""Conditions on the stored resources are checked after the inventories changed."""
+	settlement, island = settle(s)
+	inventory = settlement.get_component(StorageComponent).inventory
+	handler = start_scenario(s, CONDITIONS.player_res_stored_greater, RES.FOOD, inventory[RES.FOOD] + 10)
+	s.run(ticks=10)
+	assert 'done' not in handler._scenario_variables
+
+	inventory.alter(RES.FOOD, 20)
+	s.run(ticks=10)
+	assert handler._scenario_variables.get('done')
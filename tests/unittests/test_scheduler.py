@@ -216,3 +216,93 @@ class TestScheduler(TestCase):
 		self.assertEqual(2, self.scheduler.get_remaining_ticks(instance, self.callback))
 		self.scheduler.tick(Scheduler.FIRST_TICK_ID+2)
 		self.assertEqual(1, self.scheduler.get_remaining_ticks(instance, self.callback))
+
+	def test_same_tick_callbacks_run_in_order_of_adding(self):
+		self.scheduler.before_ticking()
+		calls = []
+		target_tick = 300 # the far call is in a higher level of the timing wheel at first
+		self.scheduler.add_new_object(lambda: calls.append('far'), None, run_in=target_tick + 1)
+		for i in xrange(Scheduler.FIRST_TICK_ID, 100):
+			self.scheduler.tick(i)
+		self.scheduler.add_new_object(lambda: calls.append('near'), None, run_in=target_tick - 99)
+		for i in xrange(100, target_tick + 1):
+			self.scheduler.tick(i)
+		self.assertEqual(['far', 'near'], calls)
+
+	def test_callback_in_far_future(self):
+		self.scheduler.before_ticking()
+		instance = Mock()
+		self.scheduler.add_new_object(self.callback, instance, run_in=20000)
+		for i in xrange(Scheduler.FIRST_TICK_ID, 19999):
+			self.scheduler.tick(i)
+		self.assertFalse(self.callback.called)
+		self.assertEqual(1, self.scheduler.get_remaining_ticks(instance, self.callback))
+		self.scheduler.tick(19999)
+		self.callback.assert_called_once_with()
+		self.assertEqual({}, self.scheduler.get_classinst_calls(instance))
+
+	def test_remove_call_then_reschedule(self):
+		self.scheduler.before_ticking()
+		instance = Mock()
+		self.scheduler.add_new_object(self.callback, instance, run_in=2)
+		self.assertEqual(1, self.scheduler.rem_call(instance, self.callback))
+		self.assertEqual(0, self.scheduler.rem_call(instance, self.callback))
+		self.scheduler.add_new_object(self.callback, instance, run_in=1)
+		self.scheduler.tick(Scheduler.FIRST_TICK_ID)
+		self.scheduler.tick(Scheduler.FIRST_TICK_ID+1)
+		self.callback.assert_called_once_with()
+
+	def test_removed_calls_are_compacted(self):
+		self.scheduler.before_ticking()
+		instances = [Mock() for i in xrange(Scheduler.COMPACTION_MIN_INVALID + 1)]
+		for instance in instances:
+			self.scheduler.add_new_object(self.callback, instance, run_in=10)
+		self.scheduler.add_new_object(self.callback, None, run_in=10)
+		for instance in instances:
+			self.scheduler.rem_all_classinst_calls(instance)
+		self.assertEqual(len(instances), self.scheduler.num_invalid_calls)
+
+		self.scheduler.tick(Scheduler.FIRST_TICK_ID)
+		self.assertEqual(0, self.scheduler.num_invalid_calls)
+		self.assertEqual(1, len(self.scheduler.schedule))
+		for i in xrange(Scheduler.FIRST_TICK_ID+1, 10):
+			self.scheduler.tick(i)
+		self.callback.assert_called_once_with()
+
+	def test_remove_own_call_while_executing(self):
+		self.scheduler.before_ticking()
+		instance = Mock()
+		def remove():
+			self.scheduler.rem_call(instance, self.callback)
+		self.callback.side_effect = remove
+		self.scheduler.add_new_object(self.callback, instance, run_in=1, loops=-1)
+		self.scheduler.tick(Scheduler.FIRST_TICK_ID)
+		self.scheduler.tick(Scheduler.FIRST_TICK_ID+1)
+		self.callback.assert_called_once_with()
+		self.assertEqual(0, self.scheduler.num_invalid_calls)
+
+	def test_remove_own_call_while_executing_still_finishes(self):
+		self.scheduler.before_ticking()
+		instance = Mock()
+		finish_callback = Mock()
+		def remove():
+			self.scheduler.rem_call(instance, self.callback)
+		self.callback.side_effect = remove
+		self.scheduler.add_new_object(self.callback, instance, run_in=1, finish_callback=finish_callback)
+		self.scheduler.tick(Scheduler.FIRST_TICK_ID)
+		self.scheduler.tick(Scheduler.FIRST_TICK_ID+1)
+		self.callback.assert_called_once_with()
+		finish_callback.assert_called_once_with()
+
+	def test_remove_all_own_calls_while_executing_doesnt_finish(self):
+		self.scheduler.before_ticking()
+		instance = Mock()
+		finish_callback = Mock()
+		def remove():
+			self.scheduler.rem_all_classinst_calls(instance)
+		self.callback.side_effect = remove
+		self.scheduler.add_new_object(self.callback, instance, run_in=1, finish_callback=finish_callback)
+		self.scheduler.tick(Scheduler.FIRST_TICK_ID)
+		self.scheduler.tick(Scheduler.FIRST_TICK_ID+1)
+		self.callback.assert_called_once_with()
+		self.assertFalse(finish_callback.called)
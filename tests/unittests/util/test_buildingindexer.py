@@ -0,0 +1,68 @@
+# ###################################################
+# Copyright (C) 2008-2014 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+
+
+import random
+import unittest
+
+from horizons.util.buildingindexer import BuildingIndexer, CompactBuildingIndexer
+from horizons.util.shapes import Rect
+
+
+class Building(object):
+	def __init__(self, x, y, width, height):
+		self.position = Rect.init_from_topleft_and_size(x, y, width, height)
+
+
+class TestCompactBuildingIndexer(unittest.TestCase):
+	"""CompactBuildingIndexer has to give exactly the same answers as BuildingIndexer."""
+
+	def setUp(self):
+		rng = random.Random(7)
+		self.coords_list = dict.fromkeys((x, y) for x in xrange(40) for y in xrange(30))
+		self.buildings = [Building(rng.randint(-3, 42), rng.randint(-3, 32), rng.randint(1, 3), rng.randint(1, 3))
+		                  for _ in xrange(150)]
+		self.indexer = BuildingIndexer(5, self.coords_list, random.Random(1), buildings=self.buildings[:100])
+		self.compact = CompactBuildingIndexer(5, self.coords_list, random.Random(1), buildings=self.buildings[:100])
+
+	def check_equal(self):
+		for coords in sorted(self.coords_list) + [(-1, 0), (100, 100)]:
+			self.assertEqual(list(self.indexer.get_buildings_in_range(coords)),
+			                 list(self.compact.get_buildings_in_range(coords)))
+			num = self.indexer.get_num_buildings_in_range(coords) or 0
+			self.assertEqual(num, self.compact.get_num_buildings_in_range(coords))
+			for _ in xrange(min(3, num)):
+				self.assertIs(self.indexer.get_random_building_in_range(coords),
+				              self.compact.get_random_building_in_range(coords))
+
+	def test_same_results(self):
+		self.check_equal()
+
+	def test_changes(self):
+		self.check_equal()
+		for building in self.buildings[100:]:
+			self.indexer.add(building)
+			self.compact.add(building)
+		for building in self.buildings[:50]:
+			self.indexer.remove(building)
+			self.compact.remove(building)
+		self.check_equal()
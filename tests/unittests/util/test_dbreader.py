@@ -0,0 +1,66 @@
+# ###################################################
+# Copyright (C) 2008-2014 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import unittest
+
+from horizons.util.dbreader import DbReader
+
+
+class TestDbReader(unittest.TestCase):
+
+	def setUp(self):
+		self.db = DbReader(':memory:')
+		self.db("CREATE TABLE a (value INT)")
+		self.db("CREATE TABLE b (value INT, other INT)")
+
+	def tearDown(self):
+		self.db.close()
+
+	def test_batched_inserts_keep_rowids(self):
+		self.db("BEGIN")
+		self.db.start_batching_inserts()
+		self.assertEqual(self.db("INSERT INTO a(value) VALUES(?)", 1), [])
+		self.db("INSERT INTO b(value, other) VALUES(?, ?)", 2, 0)
+		self.db("INSERT INTO a (value) VALUES (?)", 3) # another command for the same table
+		self.db("INSERT INTO a(value) VALUES(?)", 4)
+		self.db("INSERT INTO b(other, value) VALUES(?, ?)", 0, 5)
+		# rows are only written when the command of their table changes or another kind
+		# of command is executed
+		self.assertEqual(self.db.cur.execute("SELECT COUNT(*) FROM a").fetchone()[0], 2)
+		self.assertEqual(self.db.cur.execute("SELECT COUNT(*) FROM b").fetchone()[0], 1)
+		self.db.stop_batching_inserts()
+		self.db("COMMIT")
+
+		self.assertEqual(self.db("SELECT rowid, value FROM a"), [(1, 1), (2, 3), (3, 4)])
+		self.assertEqual(self.db("SELECT rowid, value FROM b"), [(1, 2), (2, 5)])
+
+	def test_other_commands_see_batched_inserts(self):
+		self.db.start_batching_inserts()
+		self.db("INSERT INTO a(value) VALUES(?)", 1)
+		self.db("INSERT INTO a(value) VALUES(?)", 2)
+		self.assertEqual(self.db("SELECT value FROM a"), [(1, ), (2, )])
+		self.db("UPDATE a SET value = 3 WHERE value = 2")
+		self.db("INSERT INTO a(value) VALUES(?)", 4)
+		self.db.stop_batching_inserts()
+
+		self.assertEqual(self.db("SELECT value FROM a"), [(1, ), (3, ), (4, )])
+		self.db("INSERT INTO a(value) VALUES(?)", 5)
+		self.assertEqual(self.db("SELECT COUNT(*) FROM a"), [(4, )])
@@ -0,0 +1,83 @@
+# ###################################################
+# Copyright (C) 2008-2014 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+
+import unittest
+
+from horizons.util.pathfinding.pathcache import PathCache
+from horizons.util.shapes import Point, Rect
+
+
+class TestPathCache(unittest.TestCase):
+
+	def setUp(self):
+		self.searches = []
+
+	def find_path(self, path):
+		def search():
+			self.searches.append(path)
+			return path
+		return search
+
+	def test_hits_and_misses(self):
+		cache = PathCache()
+		path = [(0, 0), (1, 0)]
+		self.assertEqual(cache.get_path(Point(0, 0), Point(1, 0), 'a', self.find_path(path)), path)
+		self.assertEqual(cache.get_path(Point(0, 0), Point(1, 0), 'a', self.find_path(path)), path)
+		# other points with the same coordinates
+		self.assertEqual(cache.get_path((0, 0), Point(1, 0), 'a', self.find_path(path)), path)
+		self.assertEqual(len(self.searches), 1)
+		self.assertEqual((cache.hits, cache.misses), (2, 1))
+
+		# different pather type
+		cache.get_path(Point(0, 0), Point(1, 0), 'b', self.find_path(path))
+		self.assertEqual(len(self.searches), 2)
+
+	def test_failed_search(self):
+		cache = PathCache()
+		self.assertEqual(cache.get_path(Point(0, 0), Rect(5, 5, 2, 2), 'a', self.find_path(None)), None)
+		self.assertEqual(cache.get_path(Point(0, 0), Rect(5, 5, 2, 2), 'a', self.find_path(None)), None)
+		self.assertEqual(len(self.searches), 1)
+
+	def test_copies(self):
+		cache = PathCache()
+		path = cache.get_path(Point(0, 0), Point(1, 0), 'a', self.find_path([(0, 0), (1, 0)]))
+		path.append((2, 0))
+		self.assertEqual(cache.get_path(Point(0, 0), Point(1, 0), 'a', self.find_path(None)), [(0, 0), (1, 0)])
+
+	def test_eviction(self):
+		cache = PathCache(size=2)
+		cache.get_path(Point(0, 0), Point(1, 0), 'a', self.find_path([1]))
+		cache.get_path(Point(0, 0), Point(2, 0), 'a', self.find_path([2]))
+		cache.get_path(Point(0, 0), Point(1, 0), 'a', self.find_path([1])) # now (2, 0) is the oldest
+		cache.get_path(Point(0, 0), Point(3, 0), 'a', self.find_path([3]))
+		self.assertEqual(len(cache), 2)
+		cache.get_path(Point(0, 0), Point(1, 0), 'a', self.find_path([1]))
+		self.assertEqual(self.searches, [[1], [2], [3]])
+		cache.get_path(Point(0, 0), Point(2, 0), 'a', self.find_path([2]))
+		self.assertEqual(self.searches, [[1], [2], [3], [2]])
+
+	def test_clear(self):
+		cache = PathCache()
+		cache.get_path(Point(0, 0), Point(1, 0), 'a', self.find_path([1]))
+		cache.clear()
+		cache.get_path(Point(0, 0), Point(1, 0), 'a', self.find_path([1]))
+		self.assertEqual(len(self.searches), 2)
@@ -0,0 +1,192 @@
+# ###################################################
+# Copyright (C) 2008-2014 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+
+import random
+import unittest
+from heapq import heappush, heappop
+
+from horizons.util.pathfinding.gridpathfinding import GridFindPath
+from horizons.util.pathfinding.jumppointsearch import JumpPointSearch
+from horizons.util.pathfinding.pathfinding import FindPath
+from horizons.util.pathfinding.pathgrid import PathGrid
+from horizons.util.shapes import Circle, Point, Rect
+
+
+def create_nodes(rng, rect, walkable_share):
+	nodes = {}
+	for x in xrange(rect.left, rect.right + 1):
+		for y in xrange(rect.top, rect.bottom + 1):
+			if rng.random() < walkable_share:
+				nodes[(x, y)] = 1.0
+	return nodes
+
+
+def travel_distance(path):
+	"""Length of a path with sqrt(2) per diagonal step."""
+	return sum( (2 ** 0.5 if a[0] != b[0] and a[1] != b[1] else 1) for a, b in zip(path, path[1:]) )
+
+
+def shortest_travel_distance(source, dest, nodes, blocked_coords):
+	"""Reference Dijkstra on single points with sqrt(2) per diagonal step."""
+	distances = {source: 0}
+	heap = [(0, source)]
+	while heap:
+		dist, (x, y) = heappop(heap)
+		if (x, y) == dest:
+			return dist
+		if dist > distances[(x, y)]:
+			continue
+		for dx in (-1, 0, 1):
+			for dy in (-1, 0, 1):
+				coords = (x + dx, y + dy)
+				if coords not in nodes or coords in blocked_coords:
+					continue
+				new_dist = dist + (2 ** 0.5 if dx and dy else 1)
+				if new_dist < distances.get(coords, float('inf')):
+					distances[coords] = new_dist
+					heappush(heap, (new_dist, coords))
+	return None
+
+
+class GridFindPathTest(unittest.TestCase):
+
+	def setUp(self):
+		self.rng = random.Random(23)
+		self.rect = Rect.init_from_borders(-5, 3, 34, 37)
+
+	def assert_same_paths(self, nodes, queries, blocked_coords=None):
+		grid = PathGrid(self.rect, nodes)
+		for diagonal in (False, True):
+			for make_target_walkable in (False, True):
+				for source, destination in queries:
+					args = (source, destination, nodes, blocked_coords, diagonal, make_target_walkable)
+					self.assertEqual(FindPath()(*args), GridFindPath(grid)(*args))
+
+	def random_point(self):
+		return Point(self.rng.randint(self.rect.left, self.rect.right),
+		             self.rng.randint(self.rect.top, self.rect.bottom))
+
+	def test_same_paths_as_find_path(self):
+		for walkable_share in (0.55, 0.7, 0.9, 1.0):
+			nodes = create_nodes(self.rng, self.rect, walkable_share)
+			queries = [ (self.random_point(), self.random_point()) for i in xrange(20) ]
+			queries += [ (self.random_point(), Rect(self.random_point(), 2, 1)) for i in xrange(5) ]
+			queries += [ (self.random_point(), Circle(self.random_point(), 2)) for i in xrange(5) ]
+			self.assert_same_paths(nodes, queries)
+
+	def test_same_paths_with_blocked_coords(self):
+		nodes = create_nodes(self.rng, self.rect, 0.9)
+		blocked_coords = dict.fromkeys(create_nodes(self.rng, self.rect, 0.1))
+		queries = [ (self.random_point(), self.random_point()) for i in xrange(20) ]
+		self.assert_same_paths(nodes, queries, blocked_coords)
+
+	def test_target_outside_of_grid(self):
+		nodes = create_nodes(self.rng, self.rect, 1.0)
+		queries = [ (Point(0, 5), Point(self.rect.right + 1, 5)),
+		            (Point(self.rect.left - 1, 20), Point(3, 20)) ]
+		self.assert_same_paths(nodes, queries)
+
+	def test_grid_updates(self):
+		nodes = create_nodes(self.rng, self.rect, 1.0)
+		grid = PathGrid(self.rect, nodes)
+		for coords in [ (x, 20) for x in xrange(self.rect.left, self.rect.right + 1) ]:
+			del nodes[coords]
+			grid.remove(coords)
+		self.assertEqual(len(nodes), grid.num_nodes)
+		self.assertFalse(GridFindPath(grid)(Point(0, 10), Point(0, 30), nodes, make_target_walkable=False))
+		nodes[(self.rect.right, 20)] = 1.0
+		grid.add((self.rect.right, 20))
+		self.assertEqual(FindPath()(Point(0, 10), Point(0, 30), nodes),
+		                 GridFindPath(grid)(Point(0, 10), Point(0, 30), nodes))
+
+
+class JumpPointSearchTest(unittest.TestCase):
+
+	def setUp(self):
+		self.rng = random.Random(42)
+		self.rect = Rect.init_from_borders(3, -2, 52, 41)
+
+	def random_node(self, nodes):
+		return Point(*self.rng.choice(sorted(nodes)))
+
+	def assert_valid_path(self, path, source, dest, nodes, blocked_coords):
+		self.assertEqual(path[0], source.to_tuple())
+		self.assertEqual(path[-1], dest.to_tuple())
+		for a, b in zip(path, path[1:]):
+			self.assertEqual(max(abs(a[0] - b[0]), abs(a[1] - b[1])), 1)
+			self.assertTrue(b in nodes)
+			self.assertFalse(b in blocked_coords)
+
+	def test_open_water(self):
+		nodes = create_nodes(self.rng, self.rect, 1.0)
+		grid = PathGrid(self.rect, nodes)
+		for i in xrange(30):
+			source, dest = self.random_node(nodes), self.random_node(nodes)
+			path = JumpPointSearch(grid)(source, dest, nodes, None, True, False)
+			reference = FindPath()(source, dest, nodes, None, True, False)
+			self.assertEqual(len(path), len(reference))
+			self.assertAlmostEqual(travel_distance(path), travel_distance(reference))
+			self.assert_valid_path(path, source, dest, nodes, {})
+
+	def test_path_lengths(self):
+		for walkable_share in (0.6, 0.8, 0.95):
+			nodes = create_nodes(self.rng, self.rect, walkable_share)
+			blocked_coords = dict.fromkeys(create_nodes(self.rng, self.rect, 0.05))
+			grid = PathGrid(self.rect, nodes)
+			for i in xrange(20):
+				source, dest = self.random_node(nodes), self.random_node(nodes)
+				path = JumpPointSearch(grid)(source, dest, nodes, blocked_coords, True, False)
+				reference = FindPath()(source, dest, nodes, blocked_coords, True, False)
+				shortest = shortest_travel_distance(source.to_tuple(), dest.to_tuple(), nodes, blocked_coords)
+				if shortest is None:
+					self.assertEqual(path, None)
+					self.assertEqual(reference, None)
+					continue
+				self.assert_valid_path(path, source, dest, nodes, blocked_coords)
+				# A* on the step costs isn't always optimal here, JPS is
+				self.assertAlmostEqual(travel_distance(path), shortest)
+				self.assertTrue(travel_distance(path) <= travel_distance(reference) + 1e-9)
+
+	def test_area_destination(self):
+		nodes = create_nodes(self.rng, self.rect, 0.9)
+		grid = PathGrid(self.rect, nodes)
+		for i in xrange(10):
+			source = self.random_node(nodes)
+			dest = Rect(self.random_node(nodes), 3, 2)
+			path = JumpPointSearch(grid)(source, dest, nodes, None, True, False)
+			reference = FindPath()(source, dest, nodes, None, True, False)
+			self.assertEqual(path is None, reference is None)
+			if path is not None:
+				self.assertTrue(dest.contains_tuple(path[-1]))
+				self.assertTrue(travel_distance(path) <= travel_distance(reference) + 1e-9)
+
+	def test_uniform_cost(self):
+		grid = PathGrid(self.rect, create_nodes(self.rng, self.rect, 0.5))
+		self.assertTrue(grid.has_uniform_cost())
+		grid.add((10, 10), 0.5)
+		self.assertFalse(grid.has_uniform_cost())
+		grid.add((10, 10), 1.0)
+		self.assertTrue(grid.has_uniform_cost())
+		grid.add((11, 11), 2.0)
+		grid.remove((11, 11))
+		self.assertTrue(grid.has_uniform_cost())
+
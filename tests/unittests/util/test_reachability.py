@@ -0,0 +1,79 @@
+# ###################################################
+# Copyright (C) 2008-2014 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+
+import random
+import unittest
+
+from horizons.util.pathfinding.pathfinding import FindPath
+from horizons.util.pathfinding.reachability import ConnectedComponents, IncrementalConnectedComponents
+from horizons.util.shapes import Point, Rect
+
+
+class TestConnectedComponents(unittest.TestCase):
+
+	def setUp(self):
+		self.rng = random.Random(5)
+		self.rect = Rect.init_from_borders(0, 0, 29, 29)
+
+	def create_nodes(self, walkable_share):
+		return dict( (coords, 1.0) for coords in self.rect.tuple_iter() if self.rng.random() < walkable_share )
+
+	def random_shape(self):
+		point = Point(self.rng.randint(0, 29), self.rng.randint(0, 29))
+		if self.rng.random() < 0.5:
+			return point
+		return Rect(point, self.rng.randint(0, 2), self.rng.randint(0, 2))
+
+	def assert_same_as_find_path(self, components, nodes, diagonal):
+		for i in xrange(100):
+			source, destination = self.random_shape(), self.random_shape()
+			for make_target_walkable in (False, True):
+				path = FindPath()(source, destination, nodes, diagonal=diagonal,
+				                  make_target_walkable=make_target_walkable)
+				self.assertEqual(components.is_reachable(source, destination, make_target_walkable),
+				                 path is not None)
+
+	def test_static(self):
+		for diagonal in (False, True):
+			for walkable_share in (0.4, 0.6):
+				nodes = self.create_nodes(walkable_share)
+				components = IncrementalConnectedComponents(nodes, diagonal)
+				static = ConnectedComponents(components.area_numbers, diagonal)
+				self.assert_same_as_find_path(static, nodes, diagonal)
+
+	def test_incremental(self):
+		for diagonal in (False, True):
+			nodes = self.create_nodes(0.5)
+			components = IncrementalConnectedComponents(nodes, diagonal)
+			for round in xrange(5):
+				for coords in self.rng.sample(list(self.rect.tuple_iter()), 60):
+					if coords in nodes:
+						del nodes[coords]
+						components.remove(coords)
+					else:
+						nodes[coords] = 1.0
+						components.add(coords)
+				# changes that cancel each other out
+				coords = self.rng.choice(sorted(nodes))
+				components.remove(coords)
+				components.add(coords)
+				self.assert_same_as_find_path(components, nodes, diagonal)
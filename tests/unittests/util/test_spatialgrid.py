@@ -0,0 +1,70 @@
+# ###################################################
+# Copyright (C) 2008-2014 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+
+
+import random
+import unittest
+
+from horizons.util.shapes import Rect
+from horizons.util.spatialgrid import SpatialGrid
+
+
+class Building(object):
+	def __init__(self, x, y, width, height):
+		self.position = Rect.init_from_topleft_and_size(x, y, width, height)
+
+
+class TestSpatialGrid(unittest.TestCase):
+
+	def intersecting(self, buildings, left, top, right, bottom):
+		return set(b for b in buildings if b.position.left <= right and b.position.right >= left and
+		           b.position.top <= bottom and b.position.bottom >= top)
+
+	def test_box_queries(self):
+		rng = random.Random(42)
+		grid = SpatialGrid(cell_size=8)
+		buildings = []
+		for _ in xrange(200):
+			building = Building(rng.randint(-20, 80), rng.randint(-20, 80), rng.randint(1, 6), rng.randint(1, 6))
+			grid.add(building)
+			buildings.append(building)
+		for building in buildings[::3]:
+			grid.remove(building)
+		buildings = [b for i, b in enumerate(buildings) if i % 3]
+		self.assertEqual(len(grid), len(buildings))
+
+		for _ in xrange(100):
+			left, top = rng.randint(-30, 90), rng.randint(-30, 90)
+			right, bottom = left + rng.randint(0, 30), top + rng.randint(0, 30)
+			found = list(grid.get_in_box(left, top, right, bottom))
+			self.assertEqual(len(found), len(set(found)))
+			self.assertEqual(set(found), self.intersecting(buildings, left, top, right, bottom))
+
+	def test_border(self):
+		grid = SpatialGrid(cell_size=4)
+		building = Building(3, 3, 3, 3) # covers 3..5, its origin is in the first cell
+		grid.add(building)
+		self.assertEqual([building], list(grid.get_in_box(5, 5, 5, 5)))
+		self.assertEqual([building], list(grid.get_in_box(0, 0, 3, 3)))
+		self.assertEqual([], list(grid.get_in_box(6, 0, 9, 9)))
+		grid.remove(building)
+		self.assertEqual([], list(grid.get_in_box(0, 0, 9, 9)))
@@ -0,0 +1,106 @@
+# ###################################################
+# Copyright (C) 2008-2014 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+
+import os
+import tempfile
+from unittest import TestCase
+
+from mock import Mock, patch
+
+from horizons.scheduler import Scheduler
+from horizons.util.python.callback import Callback
+from horizons.util.tickprofiler import TickProfiler, get_callback_name
+
+
+class Producer(object):
+	def __init__(self, clock):
+		self.clock = clock
+
+	def produce(self, seconds):
+		self.clock[0] += seconds
+
+
+class TestTickProfiler(TestCase):
+
+	def setUp(self):
+		Scheduler.create_instance(Mock())
+		Scheduler().before_ticking()
+		# fake wall time, the calls advance it
+		self.clock = [0.0]
+		self.time_patcher = patch('horizons.scheduler.time')
+		self.time_patcher.start().time.side_effect = lambda: self.clock[0]
+		self.profiler = TickProfiler(Scheduler(), num_ticks=3, slow_tick=None)
+		self.profiler.start()
+
+	def tearDown(self):
+		self.time_patcher.stop()
+		self.profiler.stop()
+		Scheduler.destroy_instance()
+
+	def tick(self):
+		Scheduler().tick(Scheduler().cur_tick + 1)
+
+	def test_callback_name(self):
+		producer = Producer(self.clock)
+		self.assertEqual('Producer.produce', get_callback_name(producer.produce))
+		self.assertEqual('Producer.produce', get_callback_name(Callback(producer.produce, 1)))
+
+	def test_times_per_tick(self):
+		producer = Producer(self.clock)
+		Scheduler().add_new_object(Callback(producer.produce, 0.01), producer, 1, -1)
+		Scheduler().add_new_object(Callback(producer.produce, 0.03), None, 2, 1)
+		for _ in xrange(3):
+			self.tick()
+		self.profiler.stop()
+
+		ticks = [(tick, round(total, 3)) for tick, total, _ in self.profiler.ticks]
+		first = Scheduler().FIRST_TICK_ID
+		self.assertEqual([(first, 0.01), (first + 1, 0.04), (first + 2, 0.01)], ticks)
+		self.assertEqual((first + 1, 0.04), tuple(round(x, 3) for x in self.profiler.get_slowest_ticks(1)[0]))
+
+		by_type = dict((name, round(secs, 3)) for name, secs in self.profiler.get_times(by_type=True))
+		self.assertEqual({'Producer': 0.03, 'NoneType': 0.03}, by_type)
+
+	def test_ring_buffer(self):
+		producer = Producer(self.clock)
+		Scheduler().add_new_object(Callback(producer.produce, 0.01), producer, 1, -1)
+		for _ in xrange(5):
+			self.tick()
+		self.profiler.stop()
+		self.assertEqual(3, len(self.profiler.ticks))
+		self.assertEqual(Scheduler().cur_tick, self.profiler.ticks[-1][0])
+
+	def test_flamegraph(self):
+		producer = Producer(self.clock)
+		Scheduler().add_new_object(Callback(producer.produce, 0.25), producer, 1, 2)
+		for _ in xrange(3):
+			self.tick()
+		self.profiler.stop()
+
+		fd, filename = tempfile.mkstemp()
+		os.close(fd)
+		try:
+			self.profiler.export_flamegraph(filename)
+			with open(filename) as f:
+				self.assertEqual('tick;Producer;Producer.produce 500000\n', f.read())
+		finally:
+			os.remove(filename)
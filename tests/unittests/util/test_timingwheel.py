@@ -0,0 +1,50 @@
+# ###################################################
+# Copyright (C) 2008-2014 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import random
+import unittest
+
+from horizons.util.python.timingwheel import TimingWheel
+
+
+class TimingWheelTest(unittest.TestCase):
+
+	def test_matches_dict_of_lists(self):
+		rng = random.Random(42)
+		wheel = TimingWheel(-1)
+		expected = {}
+		item = 0
+		for tick in xrange(0, 40000):
+			for i in xrange(rng.randint(0, 3)):
+				delay = rng.choice([1, 2, 17, 255, 256, 257, 5000, 16384, 30000])
+				wheel.add(tick - 1 + delay, item)
+				expected.setdefault(tick - 1 + delay, []).append(item)
+				item += 1
+			self.assertEqual(expected.pop(tick, []), wheel.advance())
+		self.assertEqual(sum(len(items) for items in expected.itervalues()), len(wheel))
+
+	def test_overflow(self):
+		wheel = TimingWheel(2**32 - 3)
+		wheel.add(2**32 + 5, 'a')
+		wheel.add(2**32 - 1, 'b')
+		popped = [ (wheel.cur_tick + 1, wheel.advance()) for i in xrange(8) ]
+		self.assertEqual([(2**32 - 1, ['b']), (2**32 + 5, ['a'])],
+		                 [ (tick, items) for tick, items in popped if items ])
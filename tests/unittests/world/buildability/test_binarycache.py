@@ -0,0 +1,89 @@
+# ###################################################
+# Copyright (C) 2008-2014 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+
+import random
+
+from tests.unittests import TestCase
+
+from horizons.world.buildability.binarycache import BinaryBuildabilityCache
+
+class MockTerrainBuildabilityCache(object):
+	def __init__(self, land_or_coast):
+		self.land_or_coast = land_or_coast
+
+class TestBinaryBuildabilityCache(TestCase):
+	def setUp(self):
+		super(TestBinaryBuildabilityCache, self).setUp()
+		coords_list = []
+		for x in xrange(3, 15):
+			for y in xrange(10):
+				coords_list.append((x, y))
+		self.terrain_cache = MockTerrainBuildabilityCache(set(coords_list))
+		self.buildability_cache = BinaryBuildabilityCache(self.terrain_cache)
+
+	def _get_expected(self, area, width, height):
+		result = set()
+		for (x, y) in area:
+			if all((x + dx, y + dy) in area for dx in xrange(width) for dy in xrange(height)):
+				result.add((x, y))
+		return result
+
+	def test_simple(self):
+		bc = self.buildability_cache
+		bc.add_area([(4, 1), (5, 1), (4, 2), (5, 2), (6, 2)])
+		self.assertEquals(bc.cache[(1, 1)], set([(4, 1), (5, 1), (4, 2), (5, 2), (6, 2)]))
+		self.assertEquals(bc.cache[(2, 1)], set([(4, 1), (4, 2), (5, 2)]))
+		self.assertEquals(bc.cache[(2, 2)], set([(4, 1)]))
+		self.assertEquals(bc.cache[(3, 2)], set())
+
+		bc.add_area([(6, 1)])
+		self.assertEquals(bc.cache[(3, 2)], set([(4, 1)]))
+		self.assertEquals(bc.cache[(2, 2)], set([(4, 1), (5, 1)]))
+
+		bc.remove_area([(4, 2)])
+		self.assertEquals(bc.cache[(3, 2)], set())
+		self.assertEquals(bc.cache[(2, 2)], set([(5, 1)]))
+		self.assertEquals(bc.cache[(2, 1)], set([(4, 1), (5, 1), (5, 2)]))
+
+	def test_random_changes(self):
+		bc = self.buildability_cache
+		sizes = [(2, 2), (3, 3), (4, 4), (6, 6), (2, 3), (3, 2), (5, 7)]
+		# compute some of the sizes before and some after the changes start
+		for size in sizes[:3]:
+			bc.cache[size]
+
+		rand = random.Random(42)
+		all_coords = sorted(self.terrain_cache.land_or_coast)
+		area = set()
+		for _ in xrange(100):
+			if area and rand.random() < 0.4:
+				coords_list = rand.sample(sorted(area), min(len(area), rand.randint(1, 10)))
+				area.difference_update(coords_list)
+				bc.remove_area(coords_list)
+			else:
+				coords_list = [coords for coords in rand.sample(all_coords, 15) if coords not in area]
+				area.update(coords_list)
+				bc.add_area(coords_list)
+
+			self.assertEquals(bc.cache[(1, 1)], area)
+			for width, height in sizes:
+				self.assertEquals(bc.cache[(width, height)], self._get_expected(area, width, height))
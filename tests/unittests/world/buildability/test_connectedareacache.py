@@ -59,3 +59,13 @@ class TestConnectedAreaCache(TestCase):
 
 		cache.remove_area([(1, 1), (1, 4)])
 		self.assertEquals(0, len(cache.areas))
+
+	def test_initial_area_and_moves(self):
+		diagonal_moves = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
+		cache = ConnectedAreaCache([(0, 0), (1, 1), (5, 5), (5, 6)], diagonal_moves)
+		self.assertEquals(2, len(cache.areas))
+		self.assertEquals(set([(0, 0), (1, 1)]), cache.areas[cache.area_numbers[(0, 0)]])
+		self.assertEquals(set([(5, 5), (5, 6)]), cache.areas[cache.area_numbers[(5, 6)]])
+
+		cache.add_area([(2, 2), (3, 3), (4, 4)])
+		self.assertEquals(1, len(cache.areas))
@@ -0,0 +1,99 @@
+# ###################################################
+# Copyright (C) 2008-2014 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+
+import random
+import unittest
+
+from horizons.util.pathfinding.pathgrid import PathGrid, iter_runs
+from horizons.util.pathfinding.reachability import IncrementalConnectedComponents
+from horizons.util.shapes import Rect
+from horizons.world.maplayers import MapLayers
+
+
+class Tile(object):
+	def __init__(self, classes):
+		self.classes = classes
+
+
+class Island(object):
+	def __init__(self, ground_map):
+		self.ground_map = ground_map
+
+
+class TestMapLayers(unittest.TestCase):
+
+	def setUp(self):
+		self.rng = random.Random(3)
+		self.rect = Rect.init_from_borders(-5, 2, 34, 31)
+
+	def create_islands(self, land_share):
+		ground_map = {}
+		for coords in self.rect.tuple_iter():
+			if self.rng.random() < land_share:
+				ground_map[coords] = Tile(self.rng.choice([['constructible'], ['coastline'], []]))
+		# one island is enough, the layers don't distinguish them
+		return [Island(ground_map)]
+
+	def create_layers(self, islands):
+		return MapLayers(self.rect.left, self.rect.top, self.rect.width, self.rect.height, islands)
+
+	def get_partition(self, numbers):
+		components = {}
+		for coords, number in numbers.iteritems():
+			components.setdefault(number, set()).add(coords)
+		return sorted(sorted(component) for component in components.itervalues())
+
+	def test_iter_runs(self):
+		self.assertEqual(list(iter_runs(0)), [])
+		self.assertEqual(list(iter_runs(0b1)), [(0, 1)])
+		self.assertEqual(list(iter_runs(0b1110110100)), [(2, 3), (4, 6), (7, 10)])
+		self.assertEqual(list(iter_runs((1 << 200) - 2)), [(1, 200)])
+
+	def test_water_rows(self):
+		islands = self.create_islands(0.5)
+		layers = self.create_layers(islands)
+		water = set(coords for coords in self.rect.tuple_iter() if coords not in islands[0].ground_map)
+		shallow = water.union(coords for coords, tile in islands[0].ground_map.iteritems()
+		                      if 'constructible' not in tile.classes)
+		grid = PathGrid(self.rect, rows=layers.water_rows)
+		self.assertEqual(set(coords for coords in self.rect.tuple_iter() if coords in grid), water)
+		self.assertEqual(set(layers.get_body_numbers(layers.water_rows)), water)
+		self.assertEqual(set(layers.get_body_numbers(layers.shallow_water_rows)), shallow)
+
+	def test_same_bodies_as_flood_fill(self):
+		for land_share in (0.3, 0.5, 0.7):
+			layers = self.create_layers(self.create_islands(land_share))
+			for rows in (layers.water_rows, layers.shallow_water_rows):
+				numbers = layers.get_body_numbers(rows)
+				expected = IncrementalConnectedComponents(numbers.keys(), diagonal=True).area_numbers
+				self.assertEqual(self.get_partition(numbers), self.get_partition(expected))
+
+	def test_grid_from_rows(self):
+		layers = self.create_layers(self.create_islands(0.4))
+		water = layers.get_body_numbers(layers.water_rows)
+		grid = PathGrid(self.rect, rows=layers.water_rows)
+		expected = PathGrid(self.rect, water.keys())
+		self.assertEqual(list(grid.cost), list(expected.cost))
+		self.assertEqual(grid.rows, expected.rows)
+		self.assertEqual(grid.columns, expected.columns)
+		self.assertEqual(grid.num_nodes, expected.num_nodes)
+		self.assertTrue(grid.has_uniform_cost())
@@ -0,0 +1,97 @@
+#!/usr/bin/env python2
+
+# ###################################################
+# Copyright (C) 2008-2014 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+
+from unittest import TestCase
+
+from mock import Mock
+
+from horizons.scheduler import Scheduler
+from horizons.world.units.movementmanager import MovementManager
+
+
+class TestMovementManager(TestCase):
+
+	def setUp(self):
+		Scheduler.create_instance(Mock())
+		Scheduler().before_ticking()
+		self.manager = MovementManager(headless=True)
+		self.calls = []
+		self.units = [self.create_unit(i) for i in xrange(3)]
+
+	def tearDown(self):
+		self.manager.end()
+		Scheduler.destroy_instance()
+
+	def create_unit(self, name):
+		unit = Mock()
+		unit._move_tick.side_effect = lambda: self.calls.append(name)
+		unit._move_slot = self.manager.register(unit)
+		return unit
+
+	def tick(self):
+		Scheduler().tick(Scheduler().cur_tick + 1)
+
+	def test_units_move_in_queue_order(self):
+		self.manager.queue(self.units[2])
+		self.manager.queue(self.units[0])
+		self.manager.queue(self.units[1], run_in=2)
+		self.tick()
+		self.assertEqual([2, 0], self.calls)
+		self.tick()
+		self.assertEqual([2, 0, 1], self.calls)
+
+	def test_cancel(self):
+		self.manager.queue(self.units[0])
+		self.assertTrue(self.manager.cancel(self.units[0]))
+		self.assertFalse(self.manager.cancel(self.units[0]))
+		self.tick()
+		self.assertEqual([], self.calls)
+
+	def test_requeue_replaces_pending_step(self):
+		self.manager.queue(self.units[0])
+		self.manager.queue(self.units[0], run_in=3)
+		self.tick()
+		self.tick()
+		self.assertEqual([], self.calls)
+		self.assertTrue(self.manager.is_queued(self.units[0]))
+		self.tick()
+		self.assertEqual([0], self.calls)
+		self.assertFalse(self.manager.is_queued(self.units[0]))
+
+	def test_unregister_drops_pending_step(self):
+		self.manager.queue(self.units[1])
+		self.manager.unregister(self.units[1])
+		unit = self.create_unit(3) # reuses the slot
+		self.assertEqual(self.units[1]._move_slot, unit._move_slot)
+		self.tick()
+		self.assertEqual([], self.calls)
+
+	def test_unit_queues_next_step_while_moving(self):
+		unit = self.units[0]
+		def move_tick():
+			self.calls.append(0)
+			self.manager.queue(unit, run_in=2)
+		unit._move_tick.side_effect = move_tick
+		self.manager.queue(unit)
+		for i in xrange(5):
+			self.tick()
+		self.assertEqual([0, 0, 0], self.calls)